@@ -8,6 +8,8 @@ from flask_login import login_user, logout_user, login_required, current_user
 from auth.decorators import admin_required
 from auth.forms import LoginForm, ChangePasswordForm, CreateAdminForm
 from auth.utils import check_password, update_last_login, create_admin_user, hash_password, User
+from services.data_handler import DataHandler
+from services.container import get_forecast_service
 from database import db, AdminUser, IPHData, CommodityData, ForecastHistory, AlertHistory, ModelPerformance, ActivityLog
 from datetime import datetime, timedelta
 import os
@@ -96,7 +98,9 @@ def dashboard():
     # 1. Statistik Dasar
     total_records = IPHData.query.count()
     active_alerts = AlertHistory.query.filter_by(is_active=True).count()
-    trained_models = ModelPerformance.query.distinct(ModelPerformance.model_name).count()
+    trained_models = ModelPerformance.query.filter(
+        ModelPerformance.excluding_backtest()
+    ).distinct(ModelPerformance.model_name).count()
     
     # 2. Aktivitas Terbaru
     recent_activities = ActivityLog.query.order_by(ActivityLog.created_at.desc()).limit(10).all()
@@ -343,6 +347,8 @@ def api_data_update():
         
         record.updated_at = datetime.utcnow()
         db.session.commit()
+        DataHandler().refresh_features(record.tanggal)
+        DataHandler.notify_data_changed()
         
         return jsonify({'success': True, 'message': 'Data berhasil diperbarui'})
         
@@ -356,8 +362,11 @@ def api_delete_data(data_id):
     """API untuk delete data"""
     try:
         data = IPHData.query.get_or_404(data_id)
+        deleted_date = data.tanggal
         db.session.delete(data)
         db.session.commit()
+        DataHandler().refresh_features(deleted_date)
+        DataHandler.notify_data_changed()
         return jsonify({'success': True, 'message': 'Data deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -369,7 +378,9 @@ def api_models_list():
     """API untuk list models performance"""
     try:
         latest_performances = {}
-        models_query = ModelPerformance.query.order_by(ModelPerformance.trained_at.desc()).all()
+        models_query = ModelPerformance.query.filter(
+            ModelPerformance.excluding_backtest()
+        ).order_by(ModelPerformance.trained_at.desc()).all()
         
         for model in models_query:
             model_name = model.model_name
@@ -385,25 +396,84 @@ def api_models_list():
 @admin_bp.route('/api/models/performance-history')
 @admin_required
 def api_models_performance_history():
-    """API untuk chart performance history"""
+    """API untuk chart performance history (?days=30&bucket=day|week|month&max_points=N)"""
+    from models.performance_series import BUCKETS, load_performance_series, series_to_lists
+
     try:
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
-        performances = ModelPerformance.query.filter(
-            ModelPerformance.trained_at >= cutoff_date
-        ).order_by(ModelPerformance.trained_at.asc()).all()
-        
-        chart_data = {}
-        for perf in performances:
-            m_name = perf.model_name
-            if m_name not in chart_data:
-                chart_data[m_name] = {'dates': [], 'mae': [], 'rmse': [], 'r2': []}
-            
-            chart_data[m_name]['dates'].append(perf.trained_at.isoformat())
-            chart_data[m_name]['mae'].append(float(perf.mae) if perf.mae else None)
-            chart_data[m_name]['rmse'].append(float(perf.rmse) if perf.rmse else None)
-            chart_data[m_name]['r2'].append(float(perf.r2_score) if perf.r2_score else None)
-        
-        return jsonify({'success': True, 'chart_data': chart_data})
+        days = request.args.get('days', 30, type=int)
+        bucket = request.args.get('bucket') or None
+        max_points = request.args.get('max_points', type=int)
+        if bucket is not None and bucket not in BUCKETS:
+            return jsonify({'success': False, 'error': f'bucket harus salah satu dari {BUCKETS}'}), 400
+
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        series = series_to_lists(load_performance_series(
+            bucket=bucket, since=cutoff_date, max_points=max_points
+        ))
+
+        chart_data = {
+            m_name: {'dates': data['timestamps'], 'mae': data['mae'], 'rmse': data['rmse'], 'r2': data['r2']}
+            for m_name, data in series.items()
+        }
+        return jsonify({'success': True, 'bucket': bucket, 'chart_data': chart_data})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/models/backtest', methods=['POST'])
+@admin_required
+def api_models_backtest():
+    """Rolling-origin backtest semua model ONNX; simpan ringkasan & metrik per horizon"""
+    from models.backtester import Backtester
+
+    try:
+        data = request.get_json(silent=True) or {}
+        model_name = data.get('model_name')
+        horizon = data.get('horizon')
+
+        result = Backtester().run(
+            models=[model_name] if model_name else None,
+            horizon=int(horizon) if horizon else None
+        )
+
+        summaries = {name: r['summary'] for name, r in result['results'].items()}
+        best_model = min(summaries, key=lambda name: summaries[name]['mae']) if summaries else None
+
+        return jsonify({
+            'success': True,
+            'message': f"Backtest selesai untuk {len(summaries)} model",
+            'batch_id': result['batch_id'],
+            'best_model': best_model,
+            'summary': {
+                'best_mae': summaries[best_model]['mae'] if best_model else None,
+                'origins': result['origins'],
+                'horizon': result['horizon'],
+                'session_calls': result['session_calls']
+            },
+            'models': {
+                name: {
+                    'summary': r['summary'],
+                    'per_horizon': {str(h): m for h, m in r['per_horizon'].items()}
+                }
+                for name, r in result['results'].items()
+            }
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@admin_bp.route('/api/models/compact-history', methods=['POST'])
+@admin_required
+def api_models_compact_history():
+    """Lipat history ModelPerformance lama ke rollup harian/mingguan"""
+    from models.performance_retention import compact_performance_history
+
+    try:
+        data = request.get_json(silent=True) or {}
+        keep_latest = data.get('keep_latest')
+
+        result = compact_performance_history(
+            keep_latest=int(keep_latest) if keep_latest is not None else None
+        )
+        return jsonify(result), (200 if result.get('success') else 500)
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -411,19 +481,20 @@ def api_models_performance_history():
 @admin_required
 def generate_forecast():
     """Generate forecast on demand (Admin Button)"""
-    from services.forecast_service import ForecastService
-    forecast_service = ForecastService()
+    forecast_service = get_forecast_service()
     
     try:
         data = request.get_json()
         model_name = data.get('model_name')
         weeks = int(data.get('weeks', 8))
+        interval_method = data.get('interval_method', 'heuristic')
         
         # Panggil dengan save_history=True
         result = forecast_service.get_current_forecast(
             model_name=model_name, 
             forecast_weeks=weeks, 
-            save_history=True 
+            save_history=True,
+            interval_method=interval_method
         )
         
         if result['success']:
@@ -13,12 +13,11 @@ import plotly.graph_objs as go
 from werkzeug.utils import secure_filename
 import numpy as np
 import pytz
-from services.visualization_service import VisualizationService
-from services.forecast_service import ForecastService
-from services.commodity_insight_service import CommodityInsightService
+from services.container import get_forecast_service, get_visualization_service, get_commodity_service
 from services.debugger import init_debugger, debugger
 from database import db, IPHData, CommodityData, AdminUser, AlertRule
 from services.data_handler import DataHandler
+from services.warmup import start_warmup, get_warmup_status
 
 from auth.decorators import admin_required, login_required
 
@@ -260,10 +259,10 @@ def _get_month_number(bulan_str):
 
 # SUCCESS: CALL INITIALIZATION
 
-# Initialize services
-forecast_service = ForecastService()
-visualization_service = VisualizationService(forecast_service.data_handler)
-commodity_service = CommodityInsightService()
+# Initialize services (satu instance per proses, dibagi dengan blueprint admin)
+forecast_service = get_forecast_service()
+visualization_service = get_visualization_service()
+commodity_service = get_commodity_service()
 
 # Initialize centralized debugger
 init_debugger(app)
@@ -557,6 +556,8 @@ def add_manual_record():
         
         db.session.add(commodity_record)
         db.session.commit()
+        forecast_service.data_handler.refresh_features(target_date.date())
+        DataHandler.notify_data_changed()
         
         return jsonify({
             'success': True,
@@ -699,9 +700,7 @@ def forecast_chart_data():
                 
                 historical_data = []
                 try:
-                    from services.data_handler import DataHandler
-                    data_handler = DataHandler()
-                    df = data_handler.load_historical_data()
+                    df = forecast_service.data_handler.load_historical_data()
                     
                     if not df.empty:
                         for _, row in df.iterrows():
@@ -735,16 +734,14 @@ def forecast_chart_data():
                 # Continue to fallback
         
         try:
-            from services.data_handler import DataHandler
-            data_handler = DataHandler()
-            df = data_handler.load_data()
+            df = forecast_service.data_handler.load_historical_data()
             
             historical_data = []
             if not df.empty:
                 for _, row in df.iterrows():
                     historical_data.append({
                         'date': row['Tanggal'].strftime('%Y-%m-%d') if hasattr(row['Tanggal'], 'strftime') else str(row['Tanggal']),
-                        'value': float(row['IPH'])
+                        'value': float(row['Indikator_Harga'])
                     })
             
             return jsonify({
@@ -802,13 +799,10 @@ def model_comparison_chart():
         
         models_list = []
         for model_name, summary in model_summary.items():
-            latest_performance = summary.get('performances', [])
-            latest_perf = latest_performance[-1] if latest_performance else {}
-
             mae_val = safe_float(summary.get('latest_mae', 0.0))
-            rmse_val = safe_float(latest_perf.get('rmse', 0.0))
+            rmse_val = safe_float(summary.get('latest_rmse', 0.0))
             r2_val = safe_float(summary.get('latest_r2', 0.0))
-            mape_val = safe_float(latest_perf.get('mape', 0.0))
+            mape_val = safe_float(summary.get('latest_mape', 0.0))
 
             overall_score = calculate_overall_model_score(
                 mae=mae_val,
@@ -851,6 +845,25 @@ def model_comparison_chart():
             'models': []
         })
 
+@app.route('/api/forecast-comparison')
+def forecast_comparison():
+    """API endpoint untuk membandingkan forecast semua model (satu kali load data)"""
+    try:
+        weeks = request.args.get('weeks', app.config.get('DEFAULT_FORECAST_WEEKS', 8), type=int)
+        models_param = request.args.get('models')
+        models = [m.strip() for m in models_param.split(',') if m.strip()] if models_param else None
+
+        result = forecast_service.get_all_forecasts(forecast_weeks=weeks, models=models)
+        return jsonify(clean_for_json(result))
+
+    except Exception as e:
+        logger.error(f"Error in forecast comparison API: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'forecasts': {}
+        })
+
 @app.route('/api/economic-alerts')
 def get_economic_alerts():
     """Get real-time economic alerts"""
@@ -1535,12 +1548,6 @@ def api_commodity_data_status():
 def economic_alerts():
     """API endpoint untuk mendapatkan economic alerts dan insights dinamis"""
     try:
-        from services.forecast_service import ForecastService
-        from services.data_handler import DataHandler
-        
-        forecast_service = ForecastService()
-        data_handler = DataHandler()
-        
         # Get real alerts
         alerts_data = forecast_service.get_real_economic_alerts()
         
@@ -1908,6 +1915,7 @@ def generate_forecast():
         
         model_name = data.get('model_name')
         weeks = int(data.get('weeks', 4))
+        interval_method = data.get('interval_method', 'heuristic')
         
         if not model_name:
             return jsonify({
@@ -1915,9 +1923,9 @@ def generate_forecast():
                 'message': 'Model name is required'
             })
         
-        # Load historical data
-        df = forecast_service.data_handler.load_historical_data()
-        if df.empty:
+        # Pastikan ada data historis (cukup cek satu baris terbaru)
+        _, latest_values = forecast_service.data_handler.load_recent(1)
+        if len(latest_values) == 0:
             return jsonify({
                 'success': False,
                 'message': 'No historical data available for forecasting'
@@ -1927,7 +1935,8 @@ def generate_forecast():
         forecast_result = forecast_service.get_current_forecast(
             model_name=model_name,
             forecast_weeks=weeks,
-            save_history=True
+            save_history=True,
+            interval_method=interval_method
         )
         
         if forecast_result['success']:
@@ -2038,6 +2047,8 @@ def health_check_detailed():
     memory = psutil.virtual_memory()
     disk = psutil.disk_usage('/')
     
+    warmup = get_warmup_status()
+    
     return jsonify({
         'status': 'healthy',
         'service': 'IPH Forecasting',
@@ -2045,7 +2056,11 @@ def health_check_detailed():
         'components': {
             'database': db_status,
             'api': {'status': 'healthy'},
-            'forecast_engine': {'status': 'healthy'}
+            'forecast_engine': {
+                'status': 'healthy' if warmup['ready'] else 'warming_up',
+                'ready': warmup['ready'],
+                'warmup': warmup
+            }
         },
         'system': {
             'memory_used_percent': memory.percent,
@@ -2082,15 +2097,22 @@ def health_check():
         'timestamp': current_time.isoformat(),
         'database': db_status,
         'working_hours': is_working_hours,
-        'uptime': 'healthy'
+        'uptime': 'healthy',
+        'ready': get_warmup_status()['ready']
     }), 200
-    
+
 # APPLICATION STARTUP
+# Warm-up tidak dimulai saat modul diimpor: gunicorn memulainya per worker lewat
+# post_worker_init (gunicorn.conf.py), server dev di bawah ini.
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5001))
     debug = os.environ.get('FLASK_ENV') == 'development'
     
+    # Dengan reloader, hanya proses anak (WERKZEUG_RUN_MAIN) yang melayani request
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warmup(app, forecast_service)
+    
     logger.debug("Starting IPH Forecasting Dashboard...")
     logger.debug(f"Dashboard will be available at: http://localhost:{port}")
     logger.debug("Data will be stored in: data/historical_data.csv")
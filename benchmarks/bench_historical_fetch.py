@@ -0,0 +1,179 @@
+"""
+Benchmark DataHandler.load_historical_data: fetch kolumnar vs materialisasi ORM.
+
+Mengisi database SQLite sementara dengan N baris IPHData sintetis (10 kab/kota
+per tanggal harian agar 1M baris tetap dalam rentang datetime64[ns]; indeks
+unik tanggal diganti indeks biasa, kolom fitur terisi), lalu membandingkan:
+- lama: IPHData.query.all() -> to_dict() per baris -> DataFrame -> pd.to_datetime,
+- baru: load_historical_data() tanpa cache (select Core tanggal +
+  indikator_harga, langsung ke array datetime64/float64 per blok),
+- cache: load_historical_data() dengan HistoryFrameCache terisi, tanpa probe
+  (dalam HISTORY_CACHE_PROBE_INTERVAL) dan dengan probe setiap panggilan.
+Setiap jalur diukur di proses anak baru: waktu = median beberapa ulangan,
+memori = kenaikan puncak RSS (VmHWM, direset lewat /proc/self/clear_refs,
+khusus Linux) di atas RSS sebelum load; tracemalloc terlalu berat untuk jalur
+lama pada 1M baris. Juga memastikan kolom Tanggal dan Indikator_Harga
+kedua jalur identik.
+
+Jalankan dari root repo:
+    python benchmarks/bench_historical_fetch.py [--rows 1000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from sqlalchemy import insert, text
+
+from config import Config
+from database import db, IPHData
+from services.data_handler import DataHandler
+
+
+def _create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+N_REGIONS = 10
+
+
+def _seed(n_rows):
+    db.session.execute(text('DROP INDEX ix_iph_data_tanggal'))
+    db.session.execute(text('CREATE INDEX ix_iph_data_tanggal ON iph_data (tanggal)'))
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 1.5, n_rows)
+    start = date(1950, 1, 1)
+    for offset in range(0, n_rows, 50000):
+        rows = []
+        for i in range(offset, min(offset + 50000, n_rows)):
+            day = start + timedelta(days=i // N_REGIONS)
+            value = float(values[i])
+            rows.append({
+                'tanggal': day, 'indikator_harga': value, 'bulan': day.strftime('%B'),
+                'minggu': 'M1', 'tahun': day.year, 'bulan_numerik': day.month, 'kab_kota': f'KAB_{i % N_REGIONS}',
+                'lag_1': value, 'lag_2': value, 'lag_3': value, 'lag_4': value, 'ma_3': value, 'ma_7': value,
+            })
+        db.session.execute(insert(IPHData), rows)
+    db.session.commit()
+
+
+def _old_load():
+    """Implementasi sebelumnya (objek ORM + to_dict + parse ulang tanggal)."""
+    query = IPHData.query.order_by(IPHData.tanggal).all()
+    df = pd.DataFrame([record.to_dict() for record in query])
+    df['tanggal'] = pd.to_datetime(df['tanggal'])
+    df['indikator_harga'] = pd.to_numeric(df['indikator_harga'], errors='coerce')
+    return df.rename(columns={'tanggal': 'Tanggal', 'indikator_harga': 'Indikator_Harga'})
+
+
+def _status_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} tidak tersedia")
+
+
+def _reset_peak_rss():
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def _measure(db_path, path, repeat):
+    """Dijalankan di proses anak: (median ms, kenaikan puncak RSS MB)."""
+    Config.HISTORY_CACHE_ENABLED = path == 'cached'
+    app = _create_app(db_path)
+    with app.app_context():
+        load = _old_load if path == 'old' else DataHandler().load_historical_data
+        samples, peaks = [], []
+        for _ in range(repeat):
+            db.session.expunge_all()
+            _reset_peak_rss()
+            before = _status_mb('VmRSS')
+            start = time.perf_counter()
+            load()
+            samples.append((time.perf_counter() - start) * 1000)
+            peaks.append(_status_mb('VmHWM') - before)
+        return statistics.median(samples), max(peaks)
+
+
+def _measure_cached(db_path, repeat):
+    """Dijalankan di proses anak: (ms hit tanpa probe, ms hit dengan probe)."""
+    app = _create_app(db_path)
+    with app.app_context():
+        load = DataHandler().load_historical_data
+        load()
+        results = []
+        for interval in (3600, 0):
+            Config.HISTORY_CACHE_PROBE_INTERVAL = interval
+            start = time.perf_counter()
+            for _ in range(repeat):
+                load()
+            results.append((time.perf_counter() - start) * 1000 / repeat)
+        return tuple(results)
+
+
+def _check(db_path):
+    """Dijalankan di proses anak: kolom hasil kedua jalur identik."""
+    app = _create_app(db_path)
+    with app.app_context():
+        new_df = DataHandler().load_historical_data()
+        old_df = _old_load()
+        return (
+            np.array_equal(old_df['Tanggal'].to_numpy('datetime64[D]'), new_df['Tanggal'].to_numpy('datetime64[D]'))
+            and np.array_equal(old_df['Indikator_Harga'].to_numpy(), new_df['Indikator_Harga'].to_numpy())
+        )
+
+
+def _in_child(fn, *args):
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(fn, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'old ms':>11}{'new ms':>11}{'speedup':>9}{'old MB':>10}{'new MB':>10}"
+          f"{'hit ms':>9}{'probe ms':>10}{'same':>6}")
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, 'bench.db')
+            app = _create_app(db_path)
+            with app.app_context():
+                db.create_all()
+                _seed(n_rows)
+                db.session.remove()
+
+            repeat = 1 if n_rows >= 1000000 else args.repeat
+            same = _in_child(_check, db_path)
+            old_ms, old_mb = _in_child(_measure, db_path, 'old', repeat)
+            new_ms, new_mb = _in_child(_measure, db_path, 'new', repeat)
+            hit_ms, probe_ms = _in_child(_measure_cached, db_path, 100)
+
+        print(f"{n_rows:>8}{old_ms:>11.1f}{new_ms:>11.1f}{old_ms / new_ms:>8.1f}x"
+              f"{old_mb:>10.1f}{new_mb:>10.1f}{hit_ms:>9.3f}{probe_ms:>10.3f}{str(same):>6}")
+        if not same:
+            print("GAGAL: hasil load kedua jalur berbeda")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark backend NumPy KNN vs onnxruntime.
+
+1. KNN.onnx: cek paritas output (input acak dan titik latih sendiri) dengan
+   toleransi 1e-5, lalu bandingkan waktu load dan latensi batch 1, 1k, 100k.
+2. Data latih sintetis besar (--reference-points): brute force blok vs
+   KD-tree (jika scipy terpasang), termasuk kesamaan tetangga.
+
+Jalankan dari root repo:
+    python benchmarks/bench_knn_backend.py [--repeat 10] [--rows 1 1000 100000] [--reference-points 100000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from config import Config
+from models.knn import KNNIndex, load_knn_session
+from models.session_factory import create_inference_session
+
+TOLERANCE = 1e-5
+
+
+def _time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _repeat_for(n_rows, repeat):
+    # Batch besar cukup beberapa ulangan
+    return max(3, repeat // 5) if n_rows >= 100000 else repeat
+
+
+def bench_onnx_model(path, rows, repeat, rng):
+    load_ort = _time_ms(lambda: create_inference_session(path), 3)
+    load_np = _time_ms(lambda: load_knn_session(path), 3)
+    ort_session = create_inference_session(path)
+    np_session = load_knn_session(path)
+    input_name = ort_session.get_inputs()[0].name
+    n_features = np_session.index.n_features
+
+    X = np.concatenate([
+        rng.normal(0, 1.5, (5000, n_features)).astype(np.float32),
+        np_session.index.train.astype(np.float32),
+    ])
+    diff = float(np.max(np.abs(
+        ort_session.run(None, {input_name: X})[0] - np_session.run(None, {input_name: X})[0]
+    )))
+
+    index = np_session.index
+    print(f"{os.path.basename(path)}: {index.n_train} titik latih, k={index.k}, metode={index.method}")
+    print(f"max |diff| = {diff:.2e}, load ort {load_ort:.1f} ms, load numpy {load_np:.1f} ms\n")
+    print(f"{'rows':>8}{'ort ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for n in rows:
+        batch = rng.normal(0, 1.5, (n, n_features)).astype(np.float32)
+        r = _repeat_for(n, repeat)
+        ort_ms = _time_ms(lambda: ort_session.run(None, {input_name: batch}), r)
+        np_ms = _time_ms(lambda: np_session.run(None, {input_name: batch}), r)
+        print(f"{n:>8}{ort_ms:>12.3f}{np_ms:>12.3f}{ort_ms / np_ms:>9.1f}x")
+    return diff <= TOLERANCE
+
+
+def bench_large_reference(n_points, rows, repeat, rng):
+    train = rng.normal(0, 1, (n_points, 6))
+    targets = rng.normal(0, 1, n_points).astype(np.float32)
+
+    Config.KNN_KDTREE_MIN_POINTS = n_points + 1
+    brute = KNNIndex(train, targets, 7, np.float32(1), np.float32(1e-6))
+    Config.KNN_KDTREE_MIN_POINTS = 0
+    kdtree = KNNIndex(train, targets, 7, np.float32(1), np.float32(1e-6))
+
+    print(f"\nData latih sintetis {n_points} titik x 6 fitur, k=7")
+    if kdtree.method != 'kdtree':
+        print("scipy tidak terpasang: KD-tree dilewati")
+        kdtree = None
+    print(f"{'rows':>8}{'brute ms':>12}{'kdtree ms':>12}{'same nbrs':>11}")
+    for n in rows:
+        batch = rng.normal(0, 1, (n, 6))
+        r = 3 if n * n_points >= 1e8 else repeat
+        # Brute force 100k x 100k terlalu lama untuk benchmark
+        run_brute = n * n_points <= 1e9
+        line = f"{n:>8}" + (f"{_time_ms(lambda: brute.predict(batch), r):>12.3f}" if run_brute else f"{'-':>12}")
+        if kdtree is not None:
+            line += f"{_time_ms(lambda: kdtree.predict(batch), r):>12.3f}"
+            if run_brute:
+                same = np.mean(np.sort(brute.neighbors(batch)[1], axis=1) == np.sort(kdtree.neighbors(batch)[1], axis=1))
+                line += f"{same:>11.4f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--model', default=os.path.join(Config.MODELS_PATH, 'KNN.onnx'))
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 1000, 100000])
+    parser.add_argument('--reference-points', type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    ok = bench_onnx_model(args.model, args.rows, args.repeat, rng)
+    if args.reference_points:
+        bench_large_reference(args.reference_points, args.rows, args.repeat, rng)
+
+    if not ok:
+        print(f"\nGAGAL: selisih melebihi {TOLERANCE}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
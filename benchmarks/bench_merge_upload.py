@@ -0,0 +1,210 @@
+"""
+Benchmark DataHandler.merge_and_save_data: bulk upsert vs loop per baris.
+
+Untuk setiap ukuran upload, dua database SQLite sementara diisi riwayat yang
+sama (--existing baris mingguan + CommodityData), lalu file upload sintetis
+(sebagian tanggal sudah ada, sebagian baru, sebagian duplikat dalam upload,
+sebagian dengan kolom komoditas) disimpan dengan:
+- lama: loop iterrows (query per baris + flush per insert + CommodityData per baris),
+- baru: merge_and_save_data (prefetch IN + bulk upsert + insert komoditas batch).
+Dilaporkan rows/s, jumlah statement SQL (proksi round trip ke database), dan
+dipastikan isi iph_data, commodity_data dan merge_info kedua jalur identik.
+
+Jalankan dari root repo:
+    python benchmarks/bench_merge_upload.py [--rows 100 1000 10000] [--existing 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from sqlalchemy import event, insert, select
+
+from database import db, IPHData, CommodityData
+from services.data_handler import DataHandler
+
+START = date(1900, 1, 1)
+
+
+class LegacyDataHandler(DataHandler):
+    """merge_and_save_data sebelum bulk upsert (loop per baris), untuk pembanding."""
+
+    def merge_and_save_data(self, new_data_df):
+        validated_df = self.validate_new_data(new_data_df.copy())
+        existing_count = IPHData.query.count()
+        new_records = 0
+        updated_records = 0
+        duplicate_dates = []
+        changed_dates = []
+
+        with db.session.no_autoflush:
+            for _, row in validated_df.iterrows():
+                date_value = self._anchor_date(row['Tanggal'].date())
+                changed_dates.append(date_value)
+
+                bulan_val = str(row['Bulan']) if 'Bulan' in row and pd.notna(row['Bulan']) else None
+                minggu_val = str(row['Minggu']) if 'Minggu' in row and pd.notna(row['Minggu']) else None
+                kab_kota_val = str(row.get('Kab/Kota', 'BATU'))
+
+                existing_record = IPHData.query.filter_by(tanggal=date_value).first()
+                if existing_record:
+                    existing_record.indikator_harga = float(row['Indikator_Harga'])
+                    existing_record.updated_at = datetime.utcnow()
+                    if bulan_val: existing_record.bulan = bulan_val
+                    if minggu_val: existing_record.minggu = minggu_val
+                    if 'Tahun' in row and pd.notna(row['Tahun']): existing_record.tahun = int(row['Tahun'])
+                    if kab_kota_val: existing_record.kab_kota = kab_kota_val
+                    updated_records += 1
+                    duplicate_dates.append(date_value)
+                else:
+                    tahun_val = int(row['Tahun']) if 'Tahun' in row and pd.notna(row['Tahun']) else date_value.year
+                    new_record = IPHData(
+                        tanggal=date_value, indikator_harga=float(row['Indikator_Harga']),
+                        bulan=bulan_val, minggu=minggu_val, tahun=tahun_val,
+                        bulan_numerik=date_value.month, kab_kota=kab_kota_val, data_source='uploaded'
+                    )
+                    db.session.add(new_record)
+                    db.session.flush()
+                    if 'Komoditas Andil Perubahan Harga' in row and pd.notna(row['Komoditas Andil Perubahan Harga']):
+                        db.session.add(CommodityData(
+                            tanggal=date_value, bulan=bulan_val, minggu=minggu_val, tahun=tahun_val,
+                            kab_kota=kab_kota_val, iph_id=new_record.id,
+                            iph_value=float(row['Indikator_Harga']),
+                            komoditas_andil=str(row['Komoditas Andil Perubahan Harga']),
+                            komoditas_fluktuasi=str(row['Komoditas Fluktuasi Harga Tertinggi']) if 'Komoditas Fluktuasi Harga Tertinggi' in row and pd.notna(row['Komoditas Fluktuasi Harga Tertinggi']) else None,
+                            nilai_fluktuasi=float(row['Fluktuasi Harga']) if 'Fluktuasi Harga' in row and pd.notna(row['Fluktuasi Harga']) else 0.0
+                        ))
+                    new_records += 1
+
+        db.session.commit()
+        if changed_dates:
+            self.refresh_features(min(changed_dates), max(changed_dates))
+        self.notify_data_changed()
+        merge_info = {
+            'existing_records': existing_count,
+            'new_records': new_records,
+            'updated_records': updated_records,
+            'total_records': IPHData.query.count(),
+            'duplicates_removed': updated_records,
+            'date_overlap': len(duplicate_dates) > 0,
+            'overlap_count': len(duplicate_dates),
+            'backup_created': False
+        }
+        return self.load_historical_data(), merge_info
+
+
+def _create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def _seed(n_existing):
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(n_existing):
+        day = START + timedelta(weeks=i)
+        rows.append({
+            'tanggal': day, 'indikator_harga': float(rng.normal(0, 1.5)), 'bulan': day.strftime('%B'),
+            'minggu': 'M1', 'tahun': day.year, 'bulan_numerik': day.month, 'kab_kota': 'BATU'
+        })
+    db.session.execute(insert(IPHData), rows)
+    db.session.commit()
+    DataHandler().refresh_features()
+
+
+def _upload_frame(n_rows, n_existing):
+    """Upload: ~1/3 tanggal lama, sisanya baru; tanggal harian sehingga beberapa baris jatuh ke anchor yang sama."""
+    rng = np.random.default_rng(1)
+    first_day = START + timedelta(weeks=n_existing * 2 // 3)
+    days = [first_day + timedelta(days=int(d)) for d in np.sort(rng.integers(0, n_rows * 3, n_rows))]
+    has_commodity = rng.random(n_rows) < 0.7
+    return pd.DataFrame({
+        'Tanggal': [d.isoformat() for d in days],
+        'Indikator_Harga': np.round(rng.normal(0, 1.5, n_rows), 2),
+        'Bulan': [d.strftime('%B') for d in days],
+        'Minggu': [f'M{rng.integers(1, 5)}' for _ in days],
+        'Kab/Kota': 'BATU',
+        'Komoditas Andil Perubahan Harga': [f'BERAS({i % 7 * 0.1:.1f})' if c else None for i, c in enumerate(has_commodity)],
+        'Komoditas Fluktuasi Harga Tertinggi': ['CABAI' if c else None for c in has_commodity],
+        'Fluktuasi Harga': np.where(has_commodity, np.round(rng.random(n_rows), 3), np.nan),
+    })
+
+
+def _snapshot():
+    iph = db.session.execute(select(
+        IPHData.tanggal, IPHData.indikator_harga, IPHData.bulan, IPHData.minggu, IPHData.tahun,
+        IPHData.bulan_numerik, IPHData.kab_kota, IPHData.data_source,
+        IPHData.lag_1, IPHData.lag_4, IPHData.ma_3, IPHData.ma_7
+    ).order_by(IPHData.tanggal)).all()
+    commodity = db.session.execute(select(
+        CommodityData.tanggal, CommodityData.bulan, CommodityData.minggu, CommodityData.tahun,
+        CommodityData.kab_kota, IPHData.tanggal, CommodityData.iph_value, CommodityData.komoditas_andil,
+        CommodityData.komoditas_fluktuasi, CommodityData.nilai_fluktuasi
+    ).join(IPHData, IPHData.id == CommodityData.iph_id).order_by(CommodityData.tanggal)).all()
+    return [tuple(row) for row in iph], [tuple(row) for row in commodity]
+
+
+def _run(handler_class, db_path, upload, n_existing):
+    app = _create_app(db_path)
+    with app.app_context():
+        db.create_all()
+        _seed(n_existing)
+        statements = []
+        listener = lambda *args: statements.append(1)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            start = time.perf_counter()
+            _, merge_info = handler_class().merge_and_save_data(upload)
+            elapsed = time.perf_counter() - start
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        snapshot = _snapshot()
+        db.session.remove()
+    return elapsed, len(statements), merge_info, snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--existing', type=int, default=2000)
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    print(f"existing={args.existing}\n")
+    print(f"{'rows':>7}{'new':>6}{'upd':>6}{'old rows/s':>12}{'new rows/s':>12}{'speedup':>9}"
+          f"{'old stmts':>11}{'new stmts':>11}{'same':>6}")
+    ok = True
+    for n_rows in args.rows:
+        upload = _upload_frame(n_rows, args.existing)
+        with tempfile.TemporaryDirectory() as tmp:
+            old_s, old_stmts, old_info, old_snapshot = _run(
+                LegacyDataHandler, os.path.join(tmp, 'old.db'), upload, args.existing)
+            new_s, new_stmts, new_info, new_snapshot = _run(
+                DataHandler, os.path.join(tmp, 'new.db'), upload, args.existing)
+
+        same = old_info == new_info and old_snapshot == new_snapshot
+        ok &= same
+        print(f"{n_rows:>7}{new_info['new_records']:>6}{new_info['updated_records']:>6}"
+              f"{n_rows / old_s:>12.0f}{n_rows / new_s:>12.0f}{old_s / new_s:>8.1f}x"
+              f"{old_stmts:>11}{new_stmts:>11}{str(same):>6}")
+
+    if not ok:
+        print("\nGAGAL: hasil kedua jalur berbeda")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark throughput predict satu baris dengan dan tanpa micro-batching.
+
+Setiap caller (thread) menjalankan --calls prediksi satu baris berturut-turut
+pada model yang sama; diukur total prediksi/detik dan jumlah session.run.
+Tidak memerlukan database (baris fitur dari data/historical_data.csv).
+
+Jalankan dari root repo:
+    python benchmarks/bench_microbatch.py [--model LightGBM] [--callers 1 8 32] [--calls 200] [--max-wait-ms 2]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from models.forecasting_engine import ForecastingEngine
+from models.micro_batcher import MicroBatcher
+
+
+def _run_callers(n_callers, calls, predict_one, rows):
+    barrier = threading.Barrier(n_callers + 1)
+
+    def worker(offset):
+        barrier.wait()
+        for i in range(calls):
+            predict_one(rows[(offset + i) % len(rows)][None, :])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n_callers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return n_callers * calls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'historical_data.csv'))
+    parser.add_argument('--model', default='LightGBM')
+    parser.add_argument('--callers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--max-wait-ms', type=float, default=Config.INFERENCE_MICROBATCH_MAX_WAIT_MS)
+    parser.add_argument('--max-rows', type=int, default=Config.INFERENCE_MICROBATCH_MAX_ROWS)
+    args = parser.parse_args()
+
+    engine = ForecastingEngine(models_path=Config.MODELS_PATH)
+    df = pd.read_csv(args.data, usecols=['Tanggal', 'Indikator_Harga'])
+    rows = engine.prepare_features(df)[engine.feature_cols].to_numpy(dtype=np.float32)
+
+    session = engine._load_model_session(args.model)
+    input_name, output_name = engine._get_io_names(session)
+
+    def direct(x):
+        return session.run([output_name], {input_name: x})[0]
+
+    # Paritas hasil batched vs langsung
+    batcher = MicroBatcher(max_wait_ms=args.max_wait_ms, max_rows=args.max_rows)
+    expected = direct(rows)
+    got = np.concatenate([batcher.predict(args.model, session, rows[i:i + 1]) for i in range(len(rows))])
+    assert np.array_equal(expected, got), "hasil micro-batch berbeda dari session.run langsung"
+
+    print(f"model={args.model} calls/caller={args.calls} max_wait_ms={args.max_wait_ms} max_rows={args.max_rows}\n")
+    print(f"{'callers':>8}{'direct pred/s':>16}{'batched pred/s':>16}{'speedup':>9}{'runs/call':>11}")
+
+    for n_callers in args.callers:
+        direct_tput = _run_callers(n_callers, args.calls, direct, rows)
+
+        batcher = MicroBatcher(max_wait_ms=args.max_wait_ms, max_rows=args.max_rows)
+        batched_tput = _run_callers(
+            n_callers, args.calls, lambda x: batcher.predict(args.model, session, x), rows
+        )
+        runs_per_call = batcher.stats['session_runs'] / max(batcher.stats['calls'], 1)
+
+        print(f"{n_callers:>8}{direct_tput:>16.0f}{batched_tput:>16.0f}"
+              f"{batched_tput / direct_tput:>8.2f}x{runs_per_call:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark latensi ringkasan performa model sebelum/sesudah kompaksi history.
+
+Mengisi database SQLite sementara dengan N baris ModelPerformance sintetis
+(dibagi rata ke 5 model, satu run per jam), lalu mengukur
+get_model_performance_summary() dan get_training_history_chart_data()
+sebelum dan sesudah compact_performance_history() melipat baris lama ke rollup.
+
+Jalankan dari root repo:
+    python benchmarks/bench_performance_summary.py [--rows 10000 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from flask import Flask
+
+from config import Config
+from database import db, ModelPerformance
+from models.model_manager import ModelManager
+from models.performance_retention import compact_performance_history
+
+MODEL_NAMES = ['KNN', 'LightGBM', 'Random Forest', 'XGBoost', 'XGBoost Advanced']
+
+
+def _create_app(db_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def _seed(n_rows):
+    rng = random.Random(0)
+    start = datetime.utcnow() - timedelta(hours=n_rows // len(MODEL_NAMES) + 1)
+    rows = [
+        {
+            'model_name': MODEL_NAMES[i % len(MODEL_NAMES)],
+            'batch_id': f'bench_{i // len(MODEL_NAMES)}',
+            'mae': rng.uniform(0.5, 2.0),
+            'rmse': rng.uniform(1.0, 3.0),
+            'r2_score': rng.uniform(-1.0, 1.0),
+            'mape': rng.uniform(1.0, 50.0),
+            'training_time': rng.uniform(0.1, 5.0),
+            'is_best': False,
+            'trained_at': start + timedelta(hours=i // len(MODEL_NAMES))
+        }
+        for i in range(n_rows)
+    ]
+    for i in range(0, len(rows), 10000):
+        db.session.bulk_insert_mappings(ModelPerformance, rows[i:i + 10000])
+    db.session.commit()
+
+
+def _time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        db.session.expire_all()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _measure(manager, repeat):
+    return (
+        _time_ms(manager.get_model_performance_summary, repeat),
+        _time_ms(manager.get_training_history_chart_data, repeat)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--keep', type=int, default=Config.MAX_PERFORMANCE_HISTORY_PER_MODEL)
+    args = parser.parse_args()
+
+    Config.PERFORMANCE_CLEANUP_ENABLED = True
+    print(f"keep_latest={args.keep} repeat={args.repeat}\n")
+    print(f"{'rows':>8}{'summary ms':>14}{'-> after':>10}{'chart ms':>12}{'-> after':>10}"
+          f"{'compact ms':>12}{'rollups':>9}")
+
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _create_app(os.path.join(tmp, 'bench.db'))
+            with app.app_context():
+                db.create_all()
+                _seed(n_rows)
+                manager = ModelManager(
+                    data_path=os.path.join(ROOT, 'data', 'historical_data.csv'),
+                    models_path=os.path.join(ROOT, 'data', 'models')
+                )
+
+                summary_before, chart_before = _measure(manager, args.repeat)
+
+                start = time.perf_counter()
+                result = compact_performance_history(keep_latest=args.keep)
+                compact_ms = (time.perf_counter() - start) * 1000
+                if not result.get('success'):
+                    raise RuntimeError(result.get('error'))
+
+                summary_after, chart_after = _measure(manager, args.repeat)
+                db.session.remove()
+
+        print(f"{n_rows:>8}{summary_before:>14.1f}{summary_after:>10.1f}{chart_before:>12.1f}"
+              f"{chart_after:>10.1f}{compact_ms:>12.1f}{result['rollups_written']:>9}")
+
+
+if __name__ == '__main__':
+    main()
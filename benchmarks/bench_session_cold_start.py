@@ -0,0 +1,64 @@
+"""
+Benchmark cold start sesi ONNX: load default vs. load dari cache model teroptimasi.
+
+Jalankan dari root repo:
+    python benchmarks/bench_session_cold_start.py [--repeat 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import onnxruntime as rt
+
+from config import Config
+from models.session_factory import create_inference_session
+
+
+def _first_run(session):
+    """Buat sesi + satu inference (alokasi pertama termasuk dalam cold start)."""
+    x = np.zeros((1, 6), dtype=np.float32)
+    session.run(None, {session.get_inputs()[0].name: x})
+
+
+def _time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models-path', default=Config.MODELS_PATH)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    model_files = sorted(f for f in os.listdir(args.models_path) if f.endswith('.onnx'))
+    print(f"onnxruntime {rt.__version__} | repeat={args.repeat} | median ms (session + first run)\n")
+    print(f"{'Model':<24}{'default':>12}{'cached':>12}{'speedup':>10}")
+
+    for filename in model_files:
+        path = os.path.join(args.models_path, filename)
+
+        # Pastikan cache teroptimasi sudah ada sebelum mengukur jalur "after"
+        create_inference_session(path)
+
+        before = _time_ms(
+            lambda: _first_run(rt.InferenceSession(path, providers=['CPUExecutionProvider'])),
+            args.repeat
+        )
+        after = _time_ms(lambda: _first_run(create_inference_session(path)), args.repeat)
+
+        print(f"{filename:<24}{before:>12.2f}{after:>12.2f}{before / after:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark latensi prediction interval Monte-Carlo (batched) per model.
+
+Membandingkan simulasi batched (n_steps panggilan ONNX berukuran n_paths)
+dengan baseline tanpa batching (n_paths * n_steps panggilan satu baris).
+Data diambil dari data/historical_data.csv sehingga tidak memerlukan database.
+
+Jalankan dari root repo:
+    python benchmarks/bench_simulation_latency.py [--paths 1000] [--steps 12] [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from models.forecasting_engine import ForecastingEngine
+from test_feature_spec import run_single_step, update_features_deterministic
+
+
+def _unbatched_ms(engine, session, last_features, n_steps, n_paths, residuals):
+    """Baseline: setiap path dijalankan sendiri, satu baris per panggilan ONNX."""
+    input_name, output_name = engine._get_io_names(session)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(n_paths):
+        features = engine._prepare_last_features(last_features)
+        preds = []
+        for step in range(n_steps):
+            pred = run_single_step(session, input_name, output_name, features) + rng.choice(residuals)
+            preds.append(pred)
+            features = update_features_deterministic(features, pred, preds, step)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'historical_data.csv'))
+    parser.add_argument('--paths', type=int, default=1000)
+    parser.add_argument('--steps', type=int, default=Config.FORECAST_MAX_WEEKS)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    engine = ForecastingEngine(models_path=Config.MODELS_PATH)
+    df = pd.read_csv(args.data, usecols=['Tanggal', 'Indikator_Harga'])
+    df_features = engine.prepare_features(df)
+    last_features = df_features[engine.feature_cols].iloc[-1].values
+
+    print(f"paths={args.paths} steps={args.steps} repeat={args.repeat}\n")
+    print(f"{'Model':<20}{'p50 ms':>10}{'p95 ms':>10}{'calls':>8}{'unbatched ms':>15}{'unbatched calls':>17}")
+
+    for model in engine.get_available_models():
+        session = engine._load_model_session(model['name'])
+        residuals = engine.compute_residuals(session, df_features)
+
+        # Warm-up (alokasi pertama ORT)
+        engine.forecast_multistep_simulation(session, last_features, args.steps, residuals, n_paths=args.paths)
+
+        samples = []
+        for i in range(args.repeat):
+            start = time.perf_counter()
+            engine.forecast_multistep_simulation(
+                session, last_features, args.steps, residuals, n_paths=args.paths, seed=i
+            )
+            samples.append((time.perf_counter() - start) * 1000)
+
+        p50, p95 = np.percentile(samples, [50, 95])
+        unbatched = _unbatched_ms(engine, session, last_features, args.steps, args.paths, residuals)
+        print(f"{model['name']:<20}{p50:>10.2f}{p95:>10.2f}{args.steps:>8}"
+              f"{unbatched:>15.1f}{args.paths * args.steps:>17}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Microbenchmark loop forecast rekursif: ns per langkah dan alokasi per langkah.
+
+Membandingkan loop lama (`run_single_step` + `update_features_deterministic`
+dari tests/test_feature_spec.py, array/list baru setiap langkah) dengan
+FEATURE_SPEC.updater + StepRunner (buffer input/output tetap, IO binding untuk
+sesi onnxruntime). Diukur untuk update
+fitur saja dan untuk langkah penuh (inference + update). Alokasi sementara
+diukur dengan tracemalloc: puncak memori ter-trace di atas kondisi awal selama
+satu loop forecast (objek Python + data array NumPy). Juga memastikan prediksi
+kedua loop identik.
+
+Jalankan dari root repo:
+    python benchmarks/bench_step_loop.py [--steps 12] [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from models.feature_spec import FEATURE_SPEC
+from models.forecasting_engine import ForecastingEngine
+from models.step_loop import StepRunner
+from test_feature_spec import run_single_step, update_features_deterministic
+
+
+def _old_loop(session, input_name, output_name, last_features, n_steps, infer=True):
+    features = last_features.copy()
+    predictions = []
+    for step in range(n_steps):
+        if infer:
+            pred = run_single_step(session, input_name, output_name, features)
+        else:
+            pred = float(features[0]) * 0.5
+        predictions.append(pred)
+        features = update_features_deterministic(features, pred, predictions, step)
+    return np.array(predictions)
+
+
+def _new_loop(runner, features, predictions, n_steps, infer=True):
+    for step in range(n_steps):
+        if infer:
+            preds = runner.run()
+        else:
+            preds = runner.predictions
+            np.multiply(features.X[:, 0], 0.5, out=preds)
+        predictions[step] = preds[0]
+        features.advance(preds)
+    return predictions
+
+
+def _ns_per_step(fn, n_steps, repeat):
+    fn()
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter_ns() - start) / (repeat * n_steps)
+
+
+def _peak_bytes(fn):
+    """Puncak memori ter-trace di atas kondisi awal selama satu loop."""
+    fn()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'historical_data.csv'))
+    parser.add_argument('--steps', type=int, default=Config.FORECAST_MAX_WEEKS)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = ForecastingEngine(models_path=Config.MODELS_PATH)
+    df = pd.read_csv(args.data, usecols=['Tanggal', 'Indikator_Harga'])
+    last_features = engine._prepare_last_features(
+        engine.prepare_features(df)[engine.feature_cols].iloc[-1].values
+    )
+    n = args.steps
+
+    print(f"steps={n} repeat={args.repeat} io_binding={Config.ONNX_IO_BINDING_ENABLED}\n")
+    print(f"{'Model':<18}{'binding':>8}{'update old':>12}{'update new':>12}"
+          f"{'step old':>11}{'step new':>11}{'speedup':>9}{'peak B old':>12}{'peak B new':>12}  (ns/step)")
+
+    for model in engine.get_available_models():
+        session = engine._load_model_session(model['name'])
+        input_name, output_name = engine._get_io_names(session)
+
+        # State dibuat di luar fungsi terukur: yang diukur hanya langkah rekursif.
+        # Ulangan berikutnya melanjutkan state yang sama (biaya per langkah konstan).
+        def new_fn(infer=True):
+            features = FEATURE_SPEC.updater(last_features)
+            runner = StepRunner(session, features.X, input_name, output_name)
+            predictions = np.empty(n, dtype=np.float64)
+            return lambda: _new_loop(runner, features, predictions, n, infer)
+
+        def old_fn(infer=True):
+            return lambda: _old_loop(session, input_name, output_name, last_features, n, infer)
+
+        assert np.array_equal(old_fn()(), new_fn()()), f"{model['name']}: prediksi loop baru berbeda"
+
+        runner = StepRunner(session, FEATURE_SPEC.updater(last_features).X, input_name, output_name)
+        update_old = _ns_per_step(old_fn(False), n, args.repeat)
+        update_new = _ns_per_step(new_fn(False), n, args.repeat)
+        step_old = _ns_per_step(old_fn(), n, args.repeat)
+        step_new = _ns_per_step(new_fn(), n, args.repeat)
+        bytes_old = _peak_bytes(old_fn())
+        bytes_new = _peak_bytes(new_fn())
+
+        print(f"{model['name']:<18}{str(runner.io_binding):>8}{update_old:>12.0f}{update_new:>12.0f}"
+              f"{step_old:>11.0f}{step_new:>11.0f}{step_old / step_new:>8.2f}x"
+              f"{bytes_old:>12.0f}{bytes_new:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
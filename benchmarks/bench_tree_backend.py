@@ -0,0 +1,109 @@
+"""
+Benchmark backend NumPy (TreeEnsembleRegressor) vs onnxruntime.
+
+Untuk setiap model tree ensemble: cek paritas output (fitur asli, input acak
+ber-NaN, dan input tepat di threshold) dengan toleransi 1e-5, lalu bandingkan
+waktu load sesi dan latensi batch 1 dan 10k baris. Juga mengukur waktu import
+onnxruntime di proses baru (biaya cold start yang dihilangkan backend numpy).
+
+Jalankan dari root repo:
+    python benchmarks/bench_tree_backend.py [--repeat 20] [--rows 1 10000]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from config import Config
+from models.onnx_proto import load_onnx_graph
+from models.session_factory import create_inference_session
+from models.tree_ensemble import is_tree_ensemble_graph, load_tree_ensemble_session
+
+TOLERANCE = 1e-5
+
+
+def _time_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _import_ms(module):
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    return float(subprocess.check_output([sys.executable, '-c', code], cwd=ROOT).decode().strip())
+
+
+def _parity_inputs(session, rng):
+    ensemble = session.ensemble
+    n_features = 6
+    random = rng.normal(0, 1.5, (5000, n_features)).astype(np.float32)
+    random[::37, rng.integers(0, n_features)] = np.nan
+
+    # Nilai tepat di threshold menguji batas <= vs <
+    split = ensemble.modes != 0
+    on_threshold = rng.normal(0, 1.5, (len(ensemble.threshold[split]), n_features)).astype(np.float32)
+    on_threshold[np.arange(len(on_threshold)), ensemble.feature[split]] = ensemble.threshold[split]
+    return np.concatenate([random, on_threshold])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models-path', default=Config.MODELS_PATH)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1, 10000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"import onnxruntime: {_import_ms('onnxruntime'):.1f} ms "
+          f"(numpy backend: import numpy {_import_ms('numpy'):.1f} ms)\n")
+
+    header = f"{'Model':<18}{'max |diff|':>12}{'load ort':>10}{'load np':>9}"
+    for n in args.rows:
+        header += f"{f'ort {n}r':>12}{f'np {n}r':>12}"
+    print(header + "  (ms, median)")
+
+    failed = False
+    for filename in sorted(os.listdir(args.models_path)):
+        if not filename.endswith('.onnx'):
+            continue
+        path = os.path.join(args.models_path, filename)
+        if not is_tree_ensemble_graph(load_onnx_graph(path)):
+            continue
+
+        load_ort = _time_ms(lambda: create_inference_session(path), 3)
+        load_np = _time_ms(lambda: load_tree_ensemble_session(path), 3)
+        ort_session = create_inference_session(path)
+        np_session = load_tree_ensemble_session(path)
+        input_name = ort_session.get_inputs()[0].name
+
+        X = _parity_inputs(np_session, rng)
+        diff = float(np.max(np.abs(
+            ort_session.run(None, {input_name: X})[0] - np_session.run(None, {input_name: X})[0]
+        )))
+        failed |= diff > TOLERANCE
+
+        line = f"{filename[:-5]:<18}{diff:>12.2e}{load_ort:>10.1f}{load_np:>9.1f}"
+        for n in args.rows:
+            batch = rng.normal(0, 1.5, (n, X.shape[1])).astype(np.float32)
+            ort_ms = _time_ms(lambda: ort_session.run(None, {input_name: batch}), args.repeat)
+            np_ms = _time_ms(lambda: np_session.run(None, {input_name: batch}), args.repeat)
+            line += f"{ort_ms:>12.3f}{np_ms:>12.3f}"
+        print(line)
+
+    if failed:
+        print(f"\nGAGAL: selisih melebihi {TOLERANCE}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
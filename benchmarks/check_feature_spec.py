@@ -0,0 +1,160 @@
+"""
+Cek paritas dan waktu FeatureSpec (models/feature_spec.py).
+
+1. Bulk: FEATURE_SPEC.compute vs definisi pandas lama (shift + rolling
+   min_periods=1), termasuk posisi NaN, pada data historis dan deret acak
+   dengan NaN. Waktu dibandingkan untuk 1k dan 100k baris.
+2. Inkremental: IncrementalFeatures (batch 1 dan batch > 1) vs helper
+   referensi update_features_deterministic / update_features_batch
+   (tests/test_feature_spec.py), dari baris training terakhir, harus identik bit.
+3. Spec diperluas (lag musiman 52, MA_14) melewati cek bulk dan cek
+   inkremental terhadap aturan rekursi yang sama yang ditulis ulang per langkah.
+
+Keluar dengan kode 1 jika ada yang gagal.
+
+Jalankan dari root repo:
+    python benchmarks/check_feature_spec.py [--rows 1000 100000] [--steps 12]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+import numpy as np
+import pandas as pd
+
+from models.feature_spec import FEATURE_SPEC, FeatureSpec
+from test_feature_spec import update_features_batch, update_features_deterministic
+
+TOLERANCE = 1e-12
+
+
+def _pandas_features(spec, values):
+    series = pd.Series(values, dtype='float64')
+    columns = [series.shift(lag) for lag in spec.lags]
+    columns += [series.rolling(window=window, min_periods=1).mean() for window in spec.windows]
+    return np.column_stack(columns)
+
+
+def _time_ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _reference_rows(spec, origin, history, predictions):
+    """Aturan rekursi IncrementalFeatures, dihitung ulang dari awal untuk setiap langkah."""
+    origin = np.asarray(origin, dtype=np.float32).astype(np.float64)
+    n_lags = len(spec.lags)
+    series = dict(enumerate(np.asarray(history, dtype=np.float64)[:-1][::-1], start=1))
+    series.update({lag: origin[i] for i, lag in enumerate(spec.lags)})
+    rows = []
+    for step in range(len(predictions)):
+        preds = predictions[:step + 1]
+        row = [preds[-lag] if lag <= len(preds) else series.get(lag - len(preds), np.nan) for lag in spec.lags]
+        for window in spec.windows:
+            if step == 0:
+                terms = [preds[0]] + list(origin[:window - 1]) if window - 1 <= n_lags else list(origin[:n_lags])
+            else:
+                terms = preds[-min(window, len(preds)):]
+            total = terms[0]
+            for term in terms[1:]:
+                total += term
+            row.append(total / len(terms))
+        rows.append(np.asarray(row, dtype=np.float32))
+    return rows
+
+
+def check_bulk(spec, values, label):
+    expected = _pandas_features(spec, values)
+    actual = spec.compute(values)
+    same_nan = np.array_equal(np.isnan(expected), np.isnan(actual))
+    finite = ~np.isnan(expected)
+    diff = float(np.max(np.abs(expected[finite] - actual[finite]))) if finite.any() else 0.0
+    ok = same_nan and diff <= TOLERANCE
+    print(f"  bulk {label:<28} max |diff| = {diff:.1e}, NaN sama: {same_nan}  {'OK' if ok else 'GAGAL'}")
+    return ok
+
+
+def check_helpers(origin, n_steps, batch, rng):
+    """IncrementalFeatures vs helper referensi loop lama (hanya spec 6 fitur)."""
+    origins = np.tile(origin.astype(np.float32), (batch, 1))
+    features = FEATURE_SPEC.updater(origins)
+    current = origins.copy()
+    history = np.empty((batch, 0))
+    ok = np.array_equal(features.X, current)
+    for step in range(n_steps):
+        preds = rng.normal(0, 1, batch)
+        history = np.column_stack([history, preds])
+        if batch == 1:
+            current = update_features_deterministic(current[0], preds[0], list(history[0]), step)[None, :]
+        else:
+            current = update_features_batch(current, preds, history, step)
+        features.advance(preds)
+        ok &= np.array_equal(features.X, current)
+    print(f"  inkremental vs helper referensi batch={batch:<4} langkah={n_steps}  {'OK' if ok else 'GAGAL'}")
+    return ok
+
+
+def check_incremental(spec, values, n_steps, batch, rng, label):
+    origin = spec.compute(values)[-1]
+    features = spec.updater(origin, batch=batch, history=values)
+    predictions = rng.normal(0, 1, (batch, n_steps))
+    expected = [_reference_rows(spec, origin, values, list(predictions[b])) for b in range(batch)]
+    ok = True
+    for step in range(n_steps):
+        features.advance(predictions[:, step])
+        for b in range(batch):
+            ok &= np.array_equal(features.X[b], expected[b][step], equal_nan=True)
+    print(f"  inkremental {label:<21} batch={batch:<4} langkah={n_steps}  {'OK' if ok else 'GAGAL'}")
+    return ok
+
+
+def run_checks(spec, values, n_steps, rng):
+    print(f"{spec.columns}")
+    noisy = rng.normal(0, 1, 2000)
+    noisy[rng.choice(len(noisy), 100, replace=False)] = np.nan
+    ok = check_bulk(spec, values, 'data historis')
+    ok &= check_bulk(spec, noisy, 'acak + NaN')
+    for batch in (1, 8):
+        ok &= check_incremental(spec, values, n_steps, batch, rng, 'data historis')
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default=os.path.join(ROOT, 'data', 'historical_data.csv'))
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--steps', type=int, default=12)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    values = pd.read_csv(args.data, usecols=['Indikator_Harga'])['Indikator_Harga'].to_numpy(dtype=np.float64)
+
+    ok = run_checks(FEATURE_SPEC, values, args.steps, rng)
+    for batch in (1, 8):
+        ok &= check_helpers(FEATURE_SPEC.compute(values)[-1], args.steps, batch, rng)
+    ok &= run_checks(FeatureSpec(lags=(1, 2, 3, 4, 52), windows=(3, 7, 14)), values, args.steps, rng)
+
+    print(f"\n{'rows':>8}{'pandas ms':>12}{'spec ms':>12}{'speedup':>10}")
+    for n in args.rows:
+        series = rng.normal(0, 1, n)
+        pandas_ms = _time_ms(lambda: _pandas_features(FEATURE_SPEC, series))
+        spec_ms = _time_ms(lambda: FEATURE_SPEC.compute(series))
+        print(f"{n:>8}{pandas_ms:>12.3f}{spec_ms:>12.3f}{pandas_ms / spec_ms:>9.1f}x")
+
+    if not ok:
+        print("\nGAGAL: fitur FeatureSpec berbeda dari referensi")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,9 @@ class Config:
         'pool_pre_ping': True,
         'max_overflow': 20
     }
+    DB_FETCH_CHUNK_ROWS = int(os.environ.get('DB_FETCH_CHUNK_ROWS', 10000))  # baris per blok fetch kolumnar iph_data
+    HISTORY_CACHE_ENABLED = os.environ.get('HISTORY_CACHE_ENABLED', 'true').lower() == 'true'  # data historis read-only per proses
+    HISTORY_CACHE_PROBE_INTERVAL = float(os.environ.get('HISTORY_CACHE_PROBE_INTERVAL', 5))  # detik antar probe count/max(updated_at) iph_data (cache history & forecast)
     
     # File Upload Configuration
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
@@ -38,12 +41,34 @@ class Config:
     FORECAST_MIN_WEEKS = 4
     FORECAST_MAX_WEEKS = 12
     DEFAULT_FORECAST_WEEKS = 8
+    FORECAST_SIMULATION_PATHS = int(os.environ.get('FORECAST_SIMULATION_PATHS', 1000))
+    FORECAST_RESIDUAL_WINDOW = int(os.environ.get('FORECAST_RESIDUAL_WINDOW', 104))  # baris terakhir untuk residual
+    ENSEMBLE_MAX_WORKERS = int(os.environ.get('ENSEMBLE_MAX_WORKERS', 8))  # thread pool anggota ensemble
+    INFERENCE_MICROBATCH_MODELS = os.environ.get('INFERENCE_MICROBATCH_MODELS', '')  # model yang predict bersamaannya digabung, mis. "KNN"
+    INFERENCE_MICROBATCH_MAX_WAIT_MS = float(os.environ.get('INFERENCE_MICROBATCH_MAX_WAIT_MS', 2))  # jendela tunggu batch
+    INFERENCE_MICROBATCH_MAX_ROWS = int(os.environ.get('INFERENCE_MICROBATCH_MAX_ROWS', 256))  # batas baris per batch
+    
+    # ONNX Runtime Session Configuration
+    ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', 1))
+    ONNX_INTER_OP_THREADS = int(os.environ.get('ONNX_INTER_OP_THREADS', 1))
+    ONNX_GRAPH_OPTIMIZATION = os.environ.get('ONNX_GRAPH_OPTIMIZATION', 'extended')  # disable|basic|extended|all
+    ONNX_ENABLE_MEM_PATTERN = os.environ.get('ONNX_ENABLE_MEM_PATTERN', 'true').lower() == 'true'
+    ONNX_IO_BINDING_ENABLED = os.environ.get('ONNX_IO_BINDING_ENABLED', 'true').lower() == 'true'  # buffer input/output tetap di loop rekursif
+    ONNX_OPTIMIZED_CACHE_ENABLED = os.environ.get('ONNX_OPTIMIZED_CACHE_ENABLED', 'true').lower() == 'true'
+    MODEL_REGISTRY_MAX_SESSIONS = int(os.environ.get('MODEL_REGISTRY_MAX_SESSIONS', 8))  # LRU sesi ONNX hidup
+    MODEL_REGISTRY_POLL_INTERVAL = float(os.environ.get('MODEL_REGISTRY_POLL_INTERVAL', 5))  # detik antar scan folder models
+    WARMUP_ENABLED = os.environ.get('WARMUP_ENABLED', 'true').lower() == 'true'  # preload sesi ONNX saat worker start
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'onnxruntime')  # onnxruntime|numpy (default semua model)
+    INFERENCE_BACKEND_OVERRIDES = os.environ.get('INFERENCE_BACKEND_OVERRIDES', '')  # mis. "LightGBM=numpy,XGBoost=numpy"
+    KNN_KDTREE_MIN_POINTS = int(os.environ.get('KNN_KDTREE_MIN_POINTS', 4096))  # backend numpy: KD-tree (scipy) mulai ukuran data latih ini
     
     # Performance Configuration
     MODEL_PERFORMANCE_THRESHOLD = 0.1
     AUTO_RETRAIN_THRESHOLD = 50
     MAX_PERFORMANCE_HISTORY_PER_MODEL = 50
     PERFORMANCE_CLEANUP_ENABLED = True
+    PERFORMANCE_CHART_MAX_POINTS = int(os.environ.get('PERFORMANCE_CHART_MAX_POINTS', 500))  # titik per model
+    BEST_MODEL_CACHE_TTL = int(os.environ.get('BEST_MODEL_CACHE_TTL', 300))  # detik, untuk penulisan dari proses lain
     
     # Dashboard Configuration
     CHART_HEIGHT = 500
@@ -63,6 +88,8 @@ class Config:
     # Cache Configuration
     CACHE_TYPE = 'simple'
     CACHE_DEFAULT_TIMEOUT = 300
+    FORECAST_CACHE_MAX_ENTRIES = int(os.environ.get('FORECAST_CACHE_MAX_ENTRIES', 64))
+    FORECAST_CACHE_TTL = int(os.environ.get('FORECAST_CACHE_TTL', 300))  # detik
     
     @staticmethod
     def init_app(app):
@@ -448,6 +448,25 @@ INSERT INTO `iph_data` (`id`, `tanggal`, `indikator_harga`, `bulan`, `minggu`, `
 
 -- --------------------------------------------------------
 
+--
+-- Table structure for table `model_backtest_horizon`
+--
+
+CREATE TABLE `model_backtest_horizon` (
+  `id` int NOT NULL,
+  `model_name` varchar(100) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `batch_id` varchar(200) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `horizon` int NOT NULL,
+  `mae` float NOT NULL,
+  `rmse` float DEFAULT NULL,
+  `mape` float DEFAULT NULL,
+  `r2_score` float DEFAULT NULL,
+  `n_samples` int DEFAULT NULL,
+  `created_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Table structure for table `model_performance`
 --
@@ -492,6 +511,33 @@ INSERT INTO `model_performance` (`id`, `model_name`, `batch_id`, `mae`, `rmse`,
 (15, 'LightGBM', 'training_20251029_103131', 0.972012, 1.36788, 0.564753, 0, 63.8575, 0.026484, 91, 19, 0, '[305.0, 277.0, 255.0, 256.0, 500.0, 283.0]', '2025-10-29 10:31:32', '2025-10-29 10:31:32'),
 (16, 'KNN', 'training_20251029_103131', 0.970398, 1.29608, 0.609243, 0, 57.694, 0.0021, 91, 19, 0, NULL, '2025-10-29 10:31:32', '2025-10-29 10:31:32');
 
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `model_performance_rollup`
+--
+
+CREATE TABLE `model_performance_rollup` (
+  `id` int NOT NULL,
+  `model_name` varchar(100) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `period` varchar(10) COLLATE utf8mb4_unicode_ci NOT NULL,
+  `period_start` date NOT NULL,
+  `n_runs` int NOT NULL,
+  `mae_min` float DEFAULT NULL,
+  `mae_max` float DEFAULT NULL,
+  `mae_sum` float DEFAULT NULL,
+  `rmse_min` float DEFAULT NULL,
+  `rmse_max` float DEFAULT NULL,
+  `rmse_sum` float DEFAULT NULL,
+  `rmse_count` int DEFAULT NULL,
+  `r2_min` float DEFAULT NULL,
+  `r2_max` float DEFAULT NULL,
+  `r2_sum` float DEFAULT NULL,
+  `r2_count` int DEFAULT NULL,
+  `created_at` datetime DEFAULT NULL,
+  `updated_at` datetime DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 --
 -- Indexes for dumped tables
 --
@@ -567,6 +613,14 @@ ALTER TABLE `iph_data`
   ADD KEY `ix_iph_data_bulan` (`bulan`),
   ADD KEY `ix_iph_data_minggu` (`minggu`);
 
+--
+-- Indexes for table `model_backtest_horizon`
+--
+ALTER TABLE `model_backtest_horizon`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_model_backtest_horizon` (`batch_id`,`model_name`,`horizon`),
+  ADD KEY `ix_model_backtest_horizon_model_name` (`model_name`);
+
 --
 -- Indexes for table `model_performance`
 --
@@ -577,6 +631,15 @@ ALTER TABLE `model_performance`
   ADD KEY `idx_model_performance` (`model_name`,`trained_at`),
   ADD KEY `ix_model_performance_model_name` (`model_name`);
 
+--
+-- Indexes for table `model_performance_rollup`
+--
+ALTER TABLE `model_performance_rollup`
+  ADD PRIMARY KEY (`id`),
+  ADD UNIQUE KEY `uq_model_performance_rollup` (`model_name`,`period`,`period_start`),
+  ADD KEY `idx_model_performance_rollup` (`period`,`model_name`,`period_start`),
+  ADD KEY `ix_model_performance_rollup_model_name` (`model_name`);
+
 --
 -- AUTO_INCREMENT for dumped tables
 --
@@ -623,12 +686,24 @@ ALTER TABLE `forecast_history`
 ALTER TABLE `iph_data`
   MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=119;
 
+--
+-- AUTO_INCREMENT for table `model_backtest_horizon`
+--
+ALTER TABLE `model_backtest_horizon`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
 --
 -- AUTO_INCREMENT for table `model_performance`
 --
 ALTER TABLE `model_performance`
   MODIFY `id` int NOT NULL AUTO_INCREMENT, AUTO_INCREMENT=17;
 
+--
+-- AUTO_INCREMENT for table `model_performance_rollup`
+--
+ALTER TABLE `model_performance_rollup`
+  MODIFY `id` int NOT NULL AUTO_INCREMENT;
+
 --
 -- Constraints for dumped tables
 --
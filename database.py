@@ -147,9 +147,25 @@ class ModelPerformance(db.Model):
         db.Index('idx_best_models', 'is_best', 'mae'),
     )
     
+    # batch_id baris hasil Backtester in-app (bukan hasil training)
+    BACKTEST_BATCH_PREFIX = 'backtest_'
+    
     def __repr__(self):
         return f'<ModelPerformance {self.model_name}: MAE {self.mae:.4f}>'
     
+    @classmethod
+    def is_backtest(cls):
+        """Ekspresi SQL 1/0: baris hasil Backtester (batch_id backtest_*)"""
+        return db.case(
+            (cls.batch_id.startswith(cls.BACKTEST_BATCH_PREFIX, autoescape=True), 1),
+            else_=0
+        )
+    
+    @classmethod
+    def excluding_backtest(cls):
+        """Filter baris hasil training (tanpa baris backtest) untuk pemilihan model & dashboard"""
+        return cls.is_backtest() == 0
+    
     def to_dict(self):
         """Convert to dictionary"""
 
@@ -180,6 +196,100 @@ class ModelPerformance(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class ModelPerformanceRollup(db.Model):
+    """Ringkasan harian/mingguan ModelPerformance lama (hasil compaction)"""
+    __tablename__ = 'model_performance_rollup'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model_name = db.Column(db.String(100), nullable=False, index=True)
+    period = db.Column(db.String(10), nullable=False)  # day, week
+    period_start = db.Column(db.Date, nullable=False)
+    n_runs = db.Column(db.Integer, nullable=False, default=0)
+    
+    # Agregat yang bisa digabung (mean = sum / count)
+    mae_min = db.Column(db.Float)
+    mae_max = db.Column(db.Float)
+    mae_sum = db.Column(db.Float)
+    rmse_min = db.Column(db.Float)
+    rmse_max = db.Column(db.Float)
+    rmse_sum = db.Column(db.Float)
+    rmse_count = db.Column(db.Integer, default=0)
+    r2_min = db.Column(db.Float)
+    r2_max = db.Column(db.Float)
+    r2_sum = db.Column(db.Float)
+    r2_count = db.Column(db.Integer, default=0)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('model_name', 'period', 'period_start', name='uq_model_performance_rollup'),
+        db.Index('idx_model_performance_rollup', 'period', 'model_name', 'period_start'),
+    )
+    
+    def __repr__(self):
+        return f'<ModelPerformanceRollup {self.model_name} {self.period} {self.period_start}>'
+    
+    @staticmethod
+    def _mean(total, count):
+        return float(total) / count if total is not None and count else None
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'model_name': self.model_name,
+            'period': self.period,
+            'period_start': self.period_start.isoformat() if self.period_start else None,
+            'n_runs': self.n_runs,
+            'mae_min': self.mae_min,
+            'mae_mean': self._mean(self.mae_sum, self.n_runs),
+            'mae_max': self.mae_max,
+            'rmse_min': self.rmse_min,
+            'rmse_mean': self._mean(self.rmse_sum, self.rmse_count),
+            'rmse_max': self.rmse_max,
+            'r2_min': self.r2_min,
+            'r2_mean': self._mean(self.r2_sum, self.r2_count),
+            'r2_max': self.r2_max
+        }
+
+class ModelBacktestHorizon(db.Model):
+    """Metrik backtest per horizon (1..H langkah ke depan) untuk satu batch backtest"""
+    __tablename__ = 'model_backtest_horizon'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model_name = db.Column(db.String(100), nullable=False, index=True)
+    batch_id = db.Column(db.String(200), nullable=False)
+    horizon = db.Column(db.Integer, nullable=False)
+    
+    mae = db.Column(db.Float, nullable=False)
+    rmse = db.Column(db.Float)
+    mape = db.Column(db.Float)
+    r2_score = db.Column(db.Float)
+    n_samples = db.Column(db.Integer)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('batch_id', 'model_name', 'horizon', name='uq_model_backtest_horizon'),
+    )
+    
+    def __repr__(self):
+        return f'<ModelBacktestHorizon {self.model_name} h={self.horizon}: MAE {self.mae:.4f}>'
+    
+    def to_dict(self):
+        """Convert to dictionary"""
+        return {
+            'model_name': self.model_name,
+            'batch_id': self.batch_id,
+            'horizon': self.horizon,
+            'mae': self.mae,
+            'rmse': self.rmse,
+            'mape': self.mape,
+            'r2_score': self.r2_score,
+            'n_samples': self.n_samples,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
 class AdminUser(db.Model):
     """Model untuk admin users"""
     __tablename__ = 'admin_users'
@@ -423,6 +533,7 @@ def init_db(app):
         print(f"   - {IPHData.__tablename__}")
         print(f"   - {CommodityData.__tablename__}")
         print(f"   - {ModelPerformance.__tablename__}")
+        print(f"   - {ModelPerformanceRollup.__tablename__}")
         print(f"   - {AlertHistory.__tablename__}")
         print(f"   - {AdminUser.__tablename__}")
         print(f"   - {AlertRule.__tablename__}")
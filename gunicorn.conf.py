@@ -0,0 +1,16 @@
+# gunicorn.conf.py
+"""
+Konfigurasi gunicorn, dibaca otomatis dari working directory (Procfile:
+`gunicorn app:app`).
+
+Warm-up (sesi ONNX, cache history, cache forecast default) dimulai di setiap
+worker setelah aplikasi dimuat, bukan saat app.py diimpor, sehingga skrip,
+test, dan benchmark yang mengimpor app tidak ikut menjalankan thread warm-up.
+"""
+
+
+def post_worker_init(worker):
+    from app import app, forecast_service
+    from services.warmup import start_warmup
+
+    start_warmup(app, forecast_service)
@@ -0,0 +1,206 @@
+# models/backtester.py
+"""
+Rolling-origin backtesting untuk model ONNX (inference-only).
+
+Setiap baris historis dengan fitur lengkap dipakai sebagai titik awal (origin).
+Semua origin dijalankan bersamaan: tiap langkah rekursif adalah SATU panggilan
+ONNX berukuran (n_origins, n_features), sehingga backtest 5 model x 12 langkah hanya
+butuh 60 panggilan sesi.
+
+Hasil disimpan sebagai satu baris ModelPerformance per model (rata-rata seluruh
+horizon, batch_id backtest_<waktu>) plus satu baris ModelBacktestHorizon per
+horizon (is_best selalu False). Baris backtest tidak ikut pemilihan model terbaik,
+bobot ensemble, leaderboard, maupun chart history (ModelPerformance.excluding_backtest);
+hasilnya hanya dilayani lewat ModelBacktestHorizon dan /api/models/backtest.
+"""
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from database import db, ModelPerformance, ModelBacktestHorizon
+from .forecasting_engine import ForecastingEngine
+from .feature_spec import FEATURE_SPEC
+from .performance_retention import compact_performance_history, ensure_backtest_table
+from .step_loop import StepRunner
+
+logger = logging.getLogger(__name__)
+
+
+def _horizon_metrics(actual, predicted):
+    """MAE, RMSE, MAPE (%), R2 untuk satu horizon."""
+    errors = actual - predicted
+    mae = float(np.mean(np.abs(errors)))
+    rmse = float(np.sqrt(np.mean(errors ** 2)))
+
+    nonzero = np.abs(actual) > 1e-8
+    mape = float(np.mean(np.abs(errors[nonzero] / actual[nonzero])) * 100) if nonzero.any() else None
+
+    ss_tot = float(np.sum((actual - actual.mean()) ** 2))
+    r2 = float(1 - np.sum(errors ** 2) / ss_tot) if ss_tot > 0 else None
+
+    return {'mae': mae, 'rmse': rmse, 'mape': mape, 'r2_score': r2, 'n_samples': int(len(actual))}
+
+
+class Backtester:
+    """Evaluasi semua model ONNX dari setiap origin historis dan simpan ke ModelPerformance."""
+
+    def __init__(self, engine=None):
+        self.engine = engine or ForecastingEngine(models_path=Config.MODELS_PATH)
+
+    def _load_history(self):
+        from services.data_handler import DataHandler
+        df = DataHandler().load_historical_data()
+        if df.empty:
+            raise ValueError("No historical data found. Please upload data first.")
+
+        df = df[['Tanggal', 'Indikator_Harga']].sort_values('Tanggal', ignore_index=True)
+        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+        return df
+
+    def backtest_model(self, model_session, origin_features, origin_positions, actuals, horizon):
+        """
+        Jalankan forecast rekursif dari semua origin sekaligus.
+
+        Returns: (dict {h: metrics} untuk h = 1..horizon (hanya origin dengan aktual
+                 tersedia), jumlah panggilan sesi yang dijalankan)
+        """
+        input_name, output_name = self.engine._get_io_names(model_session)
+
+        features = FEATURE_SPEC.updater(origin_features)
+        runner = StepRunner(model_session, features.X, input_name, output_name)
+        paths = np.empty((len(origin_features), horizon), dtype=np.float64)
+
+        for step in range(horizon):
+            paths[:, step] = runner.run()
+            features.advance(paths[:, step])
+
+        per_horizon = {}
+        for h in range(1, horizon + 1):
+            target_positions = origin_positions + h
+            valid = target_positions < len(actuals)
+            if not valid.any():
+                continue
+            per_horizon[h] = _horizon_metrics(actuals[target_positions[valid]], paths[valid, h - 1])
+
+        return per_horizon, runner.session_calls
+
+    def run(self, models=None, horizon=None, persist=True):
+        """
+        Backtest model (default: semua .onnx) untuk horizon 1..horizon.
+        Jika persist=True, satu baris ModelPerformance per model (metrik = rata-rata
+        seluruh horizon) dan metrik tiap horizon ditulis secara bulk.
+        """
+        horizon = horizon or Config.FORECAST_MAX_WEEKS
+        if models is None:
+            models = [m['name'] for m in self.engine.get_available_models()]
+        if not models:
+            raise ValueError("Tidak ada model .onnx yang tersedia untuk backtest")
+
+        df = self._load_history()
+        actuals = df['Indikator_Harga'].to_numpy(dtype=np.float64)
+
+        # Origin = baris dengan fitur training lengkap (sama dengan prepare_features)
+        features = FEATURE_SPEC.compute(actuals)
+        origin_positions = np.flatnonzero(~np.isnan(features).any(axis=1))
+        if len(origin_positions) == 0:
+            raise ValueError("Tidak ada data valid untuk backtest (fitur tidak lengkap)")
+        origin_features = features[origin_positions].astype(np.float32)
+
+        batch_id = f"{ModelPerformance.BACKTEST_BATCH_PREFIX}{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}"
+        results = {}
+        session_calls = 0
+
+        for model_name in models:
+            start = time.perf_counter()
+            model_session = self.engine._load_model_session(model_name)
+            per_horizon, calls = self.backtest_model(
+                model_session, origin_features, origin_positions, actuals, horizon
+            )
+            session_calls += calls
+            elapsed = time.perf_counter() - start
+
+            if not per_horizon:
+                logger.warning(f"Backtest {model_name}: tidak ada origin dengan data aktual")
+                continue
+
+            summary = {
+                metric: float(np.mean([m[metric] for m in per_horizon.values() if m[metric] is not None]))
+                if any(m[metric] is not None for m in per_horizon.values()) else None
+                for metric in ('mae', 'rmse', 'mape', 'r2_score')
+            }
+
+            results[model_name] = {
+                'summary': summary,
+                'per_horizon': per_horizon,
+                'origins': int(len(origin_positions)),
+                'evaluated_pairs': int(sum(m['n_samples'] for m in per_horizon.values())),
+                'elapsed_seconds': elapsed
+            }
+            logger.info(f"Backtest {model_name}: MAE={summary['mae']:.4f} ({elapsed * 1000:.1f} ms)")
+
+        if persist and results:
+            self._persist(results, batch_id, data_size=len(df))
+
+        return {
+            'success': True,
+            'batch_id': batch_id,
+            'horizon': horizon,
+            'origins': int(len(origin_positions)),
+            'session_calls': session_calls,
+            'results': results
+        }
+
+    def _persist(self, results, batch_id, data_size):
+        """Tulis hasil backtest ke ModelPerformance dan ModelBacktestHorizon dalam satu commit."""
+        trained_at = datetime.utcnow()
+
+        records = [
+            ModelPerformance(
+                model_name=model_name,
+                batch_id=batch_id,
+                mae=result['summary']['mae'],
+                rmse=result['summary']['rmse'],
+                r2_score=result['summary']['r2_score'],
+                mape=result['summary']['mape'],
+                training_time=result['elapsed_seconds'],
+                data_size=data_size,
+                test_size=result['evaluated_pairs'],
+                is_best=False,
+                trained_at=trained_at
+            )
+            for model_name, result in results.items()
+        ]
+        horizons = [
+            ModelBacktestHorizon(
+                model_name=model_name,
+                batch_id=batch_id,
+                horizon=h,
+                mae=metrics['mae'],
+                rmse=metrics['rmse'],
+                mape=metrics['mape'],
+                r2_score=metrics['r2_score'],
+                n_samples=metrics['n_samples'],
+                created_at=trained_at
+            )
+            for model_name, result in results.items()
+            for h, metrics in result['per_horizon'].items()
+        ]
+
+        try:
+            ensure_backtest_table()
+            db.session.add_all(records + horizons)
+            db.session.commit()
+            logger.info(
+                f"Backtest {batch_id}: {len(records)} baris ModelPerformance, "
+                f"{len(horizons)} baris per horizon tersimpan"
+            )
+        except Exception:
+            db.session.rollback()
+            raise
+
+        # Jaga history tetap dalam batas MAX_PERFORMANCE_HISTORY_PER_MODEL
+        compact_performance_history()
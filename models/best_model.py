@@ -0,0 +1,62 @@
+# models/best_model.py
+"""
+Record in-memory "model terbaik saat ini" (dan bobot ensemble) dengan
+invalidasi write-through.
+
+Pilihan model terbaik dan bobot ensemble dihitung ulang hanya jika:
+- ada baris ModelPerformance yang ditulis (event ORM / ModelPerformanceREST.log
+  / backtester memanggil invalidate_best_model),
+- isi folder models berubah (versi ModelRegistry), atau
+- TTL habis (jaring pengaman untuk penulisan dari proses lain, mis. skrip training).
+Pembaca lain mendapat jawaban O(1) dari memori.
+"""
+import copy
+import time
+import threading
+
+from config import Config
+
+
+class BestModelRecord:
+    """Nilai model terbaik + penanda validitas (generation, versi registry, TTL)."""
+
+    def __init__(self, ttl=None):
+        self.ttl = Config.BEST_MODEL_CACHE_TTL if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._value = None
+        self._state = None  # (generation, registry_version, computed_at)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._state = None
+
+    def get(self, compute, registry_version=None):
+        """Ambil nilai dari memori; panggil compute() hanya jika record tidak valid."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state
+            if (state is not None and state[0] == self._generation
+                    and state[1] == registry_version and now - state[2] < self.ttl):
+                return copy.deepcopy(self._value)
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # Jangan simpan hasil jika ada penulisan baru selama compute()
+            if generation == self._generation:
+                self._value = value
+                self._state = (generation, registry_version, time.monotonic())
+        return copy.deepcopy(value)
+
+
+best_model_record = BestModelRecord()
+ensemble_weights_record = BestModelRecord()
+
+
+def invalidate_best_model():
+    """Tandai model terbaik & bobot ensemble perlu dihitung ulang (setelah menulis ModelPerformance)."""
+    best_model_record.invalidate()
+    ensemble_weights_record.invalidate()
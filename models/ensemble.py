@@ -0,0 +1,100 @@
+# models/ensemble.py
+"""
+Ensemble berbobot dari beberapa sesi ONNX.
+
+EnsembleSession meniru antarmuka onnxruntime.InferenceSession (get_inputs,
+get_outputs, run) sehingga bisa dipakai langsung oleh semua jalur forecast di
+ForecastingEngine (deterministic, simulation, residual). Setiap panggilan run()
+menjalankan semua anggota secara paralel di thread pool (onnxruntime melepas
+GIL selama inference), lalu menggabungkan prediksi dengan bobot.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+ENSEMBLE_MODEL_NAME = 'Ensemble'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Thread pool bersama untuk semua EnsembleSession di proses ini."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.ENSEMBLE_MAX_WORKERS,
+                thread_name_prefix='ensemble'
+            )
+        return _executor
+
+
+def inverse_mae_weights(model_names, latest_mae):
+    """
+    Bobot ternormalisasi 1/MAE per model.
+    Model tanpa MAE valid mendapat rata-rata bobot model lain; jika tidak ada
+    MAE sama sekali, semua model berbobot sama.
+    """
+    raw = {}
+    for name in model_names:
+        mae = latest_mae.get(name)
+        if mae is not None and np.isfinite(mae) and mae > 0:
+            raw[name] = 1.0 / mae
+
+    if not raw:
+        return {name: 1.0 / len(model_names) for name in model_names}
+
+    fallback = float(np.mean(list(raw.values())))
+    raw = {name: raw.get(name, fallback) for name in model_names}
+    total = sum(raw.values())
+    return {name: value / total for name, value in raw.items()}
+
+
+class EnsembleSession:
+    """Sesi gabungan: rata-rata berbobot prediksi semua sesi anggota."""
+
+    def __init__(self, sessions, weights):
+        if not sessions:
+            raise ValueError("Ensemble membutuhkan minimal satu model anggota")
+
+        self.member_names = list(sessions.keys())
+        self._members = []
+        for name in self.member_names:
+            session = sessions[name]
+            self._members.append((
+                session,
+                session.get_inputs()[0].name,
+                session.get_outputs()[0].name
+            ))
+        self.weights = np.array([weights[name] for name in self.member_names], dtype=np.float64)
+
+    def get_inputs(self):
+        return self._members[0][0].get_inputs()
+
+    def get_outputs(self):
+        return self._members[0][0].get_outputs()
+
+    def _run_member(self, member, X):
+        session, input_name, output_name = member
+        preds = session.run([output_name], {input_name: X})[0]
+        return np.asarray(preds, dtype=np.float32).reshape(-1)
+
+    def run(self, output_names, input_feed, run_options=None):
+        X = next(iter(input_feed.values()))
+
+        if len(self._members) == 1:
+            member_preds = [self._run_member(self._members[0], X)]
+        else:
+            executor = _get_executor()
+            futures = [executor.submit(self._run_member, member, X) for member in self._members]
+            member_preds = [future.result() for future in futures]
+
+        combined = self.weights @ np.vstack(member_preds).astype(np.float64)
+        return [combined.astype(np.float32).reshape(-1, 1)]
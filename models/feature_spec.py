@@ -0,0 +1,208 @@
+# models/feature_spec.py
+"""
+Definisi fitur model (lag & moving average) yang dipakai bersama oleh training,
+feature store (iph_data), backtest, dan forecast rekursif.
+
+FeatureSpec mendeskripsikan fitur sekali (lags, windows) lalu menyediakan:
+- compute(values): featurization bulk tervektorisasi (sliding_window_view),
+  definisi versi training: Lag_k[t] = v[t-k], MA_w[t] = mean(v[t-w+1..t])
+  (min_periods=1, NaN diabaikan seperti pandas rolling).
+- updater(origin, batch): IncrementalFeatures untuk forecast rekursif, dimulai
+  dari baris fitur training posisi terakhir (compute()[-1] atau feature store).
+  Setiap prediksi memperbarui baris fitur berikutnya in-place dengan biaya per
+  langkah yang tidak bergantung pada panjang deret.
+
+Aturan rekursi (lihat IncrementalFeatures) adalah aturan yang dipakai model
+.onnx yang sudah dikirim; hasilnya identik bit dengan helper referensi
+loop lama di tests/test_feature_spec.py (dicek oleh test tersebut dan
+benchmarks/check_feature_spec.py). Menambah fitur (mis. MA_14 atau
+lag musiman 52) cukup dengan mengubah FEATURE_SPEC; model harus dilatih ulang
+dengan fitur yang sama.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _sequential_sum(windows):
+    """Jumlah tiap baris (n, w) berurutan dari kolom pertama."""
+    total = windows[:, 0].copy()
+    for column in range(1, windows.shape[1]):
+        total += windows[:, column]
+    return total
+
+
+class FeatureSpec:
+    """Lag dan jendela moving average yang membentuk vektor fitur model."""
+
+    def __init__(self, lags=(1, 2, 3, 4), windows=(3, 7)):
+        self.lags = tuple(int(lag) for lag in lags)
+        self.windows = tuple(int(window) for window in windows)
+        if not self.lags or not self.windows or min(self.lags + self.windows) < 1:
+            raise ValueError("FeatureSpec membutuhkan lag dan jendela >= 1")
+
+    @property
+    def columns(self):
+        """Nama fitur sesuai urutan input model (Lag_1, ..., MA_3, ...)."""
+        return [f'Lag_{lag}' for lag in self.lags] + [f'MA_{window}' for window in self.windows]
+
+    @property
+    def store_columns(self):
+        """Nama kolom feature store di iph_data."""
+        return [column.lower() for column in self.columns]
+
+    @property
+    def n_features(self):
+        return len(self.lags) + len(self.windows)
+
+    @property
+    def history_rows(self):
+        """Jumlah nilai terakhir yang menentukan satu baris fitur (lag/jendela terpanjang)."""
+        return max(self.lags + self.windows)
+
+    def compute(self, values):
+        """Fitur training untuk deret terurut: (n, n_features) float64, NaN jika lag belum tersedia."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        n_rows = len(values)
+        out = np.full((n_rows, self.n_features), np.nan)
+
+        for i, lag in enumerate(self.lags):
+            if lag < n_rows:
+                out[lag:, i] = values[:n_rows - lag]
+
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        counts = valid.astype(np.float64)
+        for j, window in enumerate(self.windows):
+            pad = np.zeros(window - 1)
+            sums = _sequential_sum(sliding_window_view(np.concatenate([pad, filled]), window))
+            n_valid = _sequential_sum(sliding_window_view(np.concatenate([pad, counts]), window))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                out[:, len(self.lags) + j] = np.where(n_valid > 0, sums / n_valid, np.nan)
+        return out
+
+    def updater(self, origin, batch=None, history=None):
+        """
+        IncrementalFeatures dari baris fitur `origin` (1D, atau 2D satu baris per path).
+        `history` (opsional): nilai mentah sampai dengan posisi origin, hanya
+        diperlukan untuk lag yang tidak berurutan (mis. lag musiman).
+        """
+        return IncrementalFeatures(self, origin, batch, history)
+
+
+FEATURE_SPEC = FeatureSpec()
+
+
+class IncrementalFeatures:
+    """
+    Baris fitur forecast rekursif yang diperbarui setiap ada prediksi baru.
+
+    X adalah buffer (batch, n_features) float32 yang diumpankan langsung ke sesi
+    (lihat step_loop.StepRunner). Dimulai dari baris training posisi T, lalu
+    setelah prediksi p_0, p_1, ...:
+    - lag: prediksi terbaru menjadi Lag_1 dan lag lain bergeser, yaitu lag
+      dibaca dari deret y[..T-1], p_0, p_1, ... (nilai sebelum T diambil dari
+      lag origin, atau dari `history` untuk posisi yang tidak ada di origin),
+    - MA langkah pertama: mean(p_0, Lag_1..Lag_{w-1} origin) jika jumlah lag
+      cukup, selain itu mean(semua lag origin),
+    - MA langkah berikutnya: mean(min(w, jumlah prediksi) prediksi terakhir).
+    Aturan ini mengikuti model .onnx yang sudah dilatih; mengubahnya mengubah
+    nilai forecast dan harus disertai model baru.
+    """
+
+    def __init__(self, spec, origin, batch=None, history=None):
+        origin = np.asarray(origin, dtype=np.float64)
+        if origin.ndim == 1:
+            origin = np.broadcast_to(origin, (batch or 1, len(origin)))
+        if origin.shape[1] != spec.n_features:
+            raise ValueError(f"Baris origin harus memiliki {spec.n_features} fitur, bukan {origin.shape[1]}")
+
+        self.spec = spec
+        self.step = 0
+        self._size = size = spec.history_rows
+        self._n_lags = n_lags = len(spec.lags)
+        n_rows = len(origin)
+        self.X = np.empty((n_rows, spec.n_features), dtype=np.float32)
+        self.X[:] = origin
+
+        # Deret y[T-size..T-1] (nilai terlama di kiri); posisi yang tidak diketahui = NaN
+        ring = np.full((n_rows, size), np.nan)
+        if history is not None:
+            history = np.asarray(history, dtype=np.float64)
+            if history.ndim == 1:
+                history = np.broadcast_to(history, (n_rows, len(history)))
+            before = history[:, :-1][:, -size:]
+            ring[:, size - before.shape[1]:] = before
+        for i, lag in enumerate(spec.lags):
+            ring[:, size - lag] = self.X[:, i]
+        self._pos = size - 1  # indeks nilai terbaru
+
+        # Sumber MA langkah pertama: (pakai prediksi?, jumlah lag origin)
+        self._first_windows = [
+            (window - 1 <= n_lags, window - 1 if window - 1 <= n_lags else n_lags)
+            for window in spec.windows
+        ]
+
+        if n_rows == 1:
+            # Satu path (forecast deterministik): float Python lebih murah daripada
+            # satu panggilan ufunc per kolom.
+            self._row = self.X[0]
+            self._values = ring[0].tolist()
+            self._origin_lags = [float(v) for v in self._row[:n_lags]]
+        else:
+            self._row = None
+            self._acc = np.empty(n_rows)
+            # View kolom dibuat sekali agar langkah rekursif tidak membuat objek array baru
+            self._x_cols = [self.X[:, j] for j in range(spec.n_features)]
+            self._ring_cols = [ring[:, j] for j in range(size)]
+            self._origin_cols = [self.X[:, i].astype(np.float64) for i in range(n_lags)]
+
+    def _window(self, window):
+        """Indeks ring untuk min(window, jumlah prediksi) prediksi terakhir, urut dari yang terlama."""
+        count = min(window, self.step + 1)
+        return [(self._pos - offset) % self._size for offset in range(count - 1, -1, -1)]
+
+    def _advance_row(self, pred):
+        values, row, spec = self._values, self._row, self.spec
+        values[self._pos] = pred
+
+        for j, window in enumerate(spec.windows):
+            if self.step == 0:
+                with_pred, n_origin = self._first_windows[j]
+                terms = ([pred] if with_pred else []) + self._origin_lags[:n_origin]
+            else:
+                terms = [values[index] for index in self._window(window)]
+            total = terms[0]
+            for value in terms[1:]:
+                total += value
+            row[self._n_lags + j] = total / len(terms)
+
+        for i, lag in enumerate(spec.lags):
+            row[i] = values[(self._pos - lag + 1) % self._size]
+
+    def _advance_batch(self, preds):
+        x, cols, acc, spec = self._x_cols, self._ring_cols, self._acc, self.spec
+        np.copyto(cols[self._pos], preds)
+
+        for j, window in enumerate(spec.windows):
+            if self.step == 0:
+                with_pred, n_origin = self._first_windows[j]
+                terms = ([cols[self._pos]] if with_pred else []) + self._origin_cols[:n_origin]
+            else:
+                terms = [cols[index] for index in self._window(window)]
+            np.copyto(acc, terms[0])
+            for term in terms[1:]:
+                np.add(acc, term, out=acc)
+            np.divide(acc, len(terms), out=acc)
+            np.copyto(x[self._n_lags + j], acc, casting='same_kind')
+
+        for i, lag in enumerate(spec.lags):
+            np.copyto(x[i], cols[(self._pos - lag + 1) % self._size], casting='same_kind')
+
+    def advance(self, preds):
+        """Masukkan prediksi langkah ini (batch,) lalu perbarui X in-place untuk langkah berikutnya."""
+        self._pos = (self._pos + 1) % self._size
+        if self._row is not None:
+            self._advance_row(float(preds[0]))
+        else:
+            self._advance_batch(preds)
+        self.step += 1
@@ -6,7 +6,11 @@ import os
 from datetime import datetime, timedelta
 import warnings
 import logging
-import onnxruntime as rt
+from config import Config
+from .ensemble import ENSEMBLE_MODEL_NAME, EnsembleSession
+from .model_registry import get_registry, model_filename
+from .feature_spec import FEATURE_SPEC
+from .step_loop import StepRunner
 
 logger = logging.getLogger(__name__)
 warnings.filterwarnings('ignore')
@@ -38,39 +42,62 @@ class ForecastingEngine:
         else:
             self.models_path = models_path
         
-        self.model_sessions = {}
         os.makedirs(self.models_path, exist_ok=True)
+        # Sesi & metadata model dibagi per proses (hot reload + LRU)
+        self.registry = get_registry(self.models_path)
         
         # Initialize other attributes
-        self.feature_cols = None
+        self.feature_cols = FEATURE_SPEC.columns
         self.scaler = None
         logger.debug("[OK] ForecastingEngine initialized")
         
+    def _model_filepath(self, model_name):
+        """Path file .onnx untuk nama model (spasi/slash diganti underscore)."""
+        return os.path.join(self.models_path, model_filename(model_name))
+
+    def get_model_fingerprint(self, model_name):
+        """Hash isi file .onnx (dari registry in-memory), untuk key cache forecast."""
+        if model_name == ENSEMBLE_MODEL_NAME:
+            # Ensemble berubah jika salah satu anggota berubah
+            return '|'.join(
+                f"{m['name']}:{self.get_model_fingerprint(m['name'])}"
+                for m in sorted(self.get_available_models(), key=lambda m: m['name'])
+            )
+        return self.registry.fingerprint(model_name)
+
     def _load_model_session(self, model_name):
-        """Memuat atau mengambil sesi inference ONNX dari cache."""
-        if model_name in self.model_sessions:
-            return self.model_sessions[model_name]
-        
-        # Ganti .pkl dengan .onnx
-        safe_name = model_name.replace(' ', '_').replace('/', '_')
-        filepath = os.path.join(self.models_path, f"{safe_name}.onnx")
-        
-        if not os.path.exists(filepath):
+        """Ambil sesi inference ONNX dari registry (dimuat ulang otomatis jika file berubah)."""
+        try:
+            return self.registry.get_session(model_name)
+        except FileNotFoundError:
+            filepath = self._model_filepath(model_name)
             logger.error(f"Model file ONNX tidak ditemukan: {filepath}")
             raise FileNotFoundError(f"Model file ONNX tidak ditemukan: {filepath}. Harap latih model secara lokal, konversi ke .onnx, dan unggah ke data/models/.")
-            
-        try:
-            # Muat sesi inference
-            # Paksa penggunaan CPUExecutionProvider agar ringan
-            logger.info(f"Mencoba memuat model ONNX: {filepath}")
-            sess = rt.InferenceSession(filepath, providers=['CPUExecutionProvider'])
-            self.model_sessions[model_name] = sess
-            logger.info(f"Model ONNX berhasil dimuat: {filepath}")
-            return sess
         except Exception as e:
             logger.error(f"Gagal memuat model ONNX {model_name}: {e}")
             raise
 
+    def build_ensemble_session(self, weights=None, models=None):
+        """
+        Sesi ensemble dari semua model .onnx yang tersedia (atau `models`).
+        weights: {model_name: bobot}; default bobot sama rata.
+        """
+        if models is None:
+            models = [m['name'] for m in self.get_available_models()]
+        if not models:
+            raise ValueError("Tidak ada model .onnx yang tersedia untuk ensemble")
+        
+        weighted = [name for name in models if (weights or {}).get(name, 0) > 0]
+        if weighted:
+            total = sum(weights[name] for name in weighted)
+            models = weighted
+            weights = {name: weights[name] / total for name in models}
+        else:
+            weights = {name: 1.0 / len(models) for name in models}
+        
+        sessions = {name: self._load_model_session(name) for name in models}
+        return EnsembleSession(sessions, weights)
+
     def prepare_features(self, df):
         """Mempersiapkan fitur (HARUS SAMA DENGAN VERSI TRAINING)"""
         logger.debug("Preparing features...")
@@ -81,102 +108,106 @@ class ForecastingEngine:
         
         df_copy = df_copy.sort_values('Tanggal').reset_index(drop=True)
         
-        for lag in [1, 2, 3, 4]:
-            df_copy[f'Lag_{lag}'] = df_copy['Indikator_Harga'].shift(lag)
-        
-        df_copy['MA_3'] = df_copy['Indikator_Harga'].rolling(window=3, min_periods=1).mean()
-        df_copy['MA_7'] = df_copy['Indikator_Harga'].rolling(window=7, min_periods=1).mean()
-        
-        self.feature_cols = ['Lag_1', 'Lag_2', 'Lag_3', 'Lag_4', 'MA_3', 'MA_7']
+        # Definisi fitur tunggal (lihat feature_spec.py), tanpa shift/rolling pandas
+        self.feature_cols = FEATURE_SPEC.columns
+        df_copy[self.feature_cols] = FEATURE_SPEC.compute(df_copy['Indikator_Harga'].to_numpy(dtype=np.float64))
 
         df_clean = df_copy.dropna(subset=self.feature_cols)
         
         logger.debug(f"Features prepared: {len(df_clean)} samples ready.")
         return df_clean
 
-    def _update_features_deterministic(self, current_features, new_pred, all_predictions, step):
-        """Update fitur secara deterministik (6 FITUR) - (Harus sama dengan versi training)"""
+    def compute_residuals(self, model_session, df_features):
+        """Residual one-step in-sample (aktual - prediksi) dalam satu panggilan batch ONNX."""
+        input_name, output_name = self._get_io_names(model_session)
+        X = df_features[self.feature_cols].values.astype(np.float32)
+        preds = np.asarray(model_session.run([output_name], {input_name: X})[0], dtype=np.float64).reshape(-1)
+        residuals = df_features['Indikator_Harga'].values.astype(np.float64) - preds
+        return residuals[np.isfinite(residuals)]
+
+    def forecast_multistep_simulation(self, model_session, last_features, n_steps, residuals,
+                                      n_paths=1000, confidence=0.95, seed=42):
+        """
+        Forecast multistep dengan prediction interval Monte-Carlo.
         
-        expected_features = 6  # Lag_1, Lag_2, Lag_3, Lag_4, MA_3, MA_7
+        Semua path disimulasikan bersama: setiap langkah rekursif menjalankan SATU
+        panggilan ONNX berukuran (n_paths + 1, 6). Baris 0 adalah path tanpa noise
+        (identik dengan forecast deterministik), baris lainnya menambahkan residual
+        historis (bootstrap) pada prediksi sebelum diumpankan kembali ke fitur.
+        """
+        logger.debug(f"Generating {n_steps}-step SIMULATION forecast (ONNX, {n_paths} paths)...")
         
-        # Pastikan tipe data adalah float32 untuk ONNX
-        new_features = np.zeros(expected_features, dtype=np.float32) 
+        input_name, output_name = self._get_io_names(model_session)
         
-        new_features[0] = float(new_pred)  # Lag_1
+        residuals = np.asarray(residuals, dtype=np.float64)
+        if residuals.size == 0:
+            raise ValueError("Residual historis kosong, simulasi tidak dapat dijalankan")
         
-        for i in range(1, 4):  # Lag_2, Lag_3, Lag_4
-            if i < len(current_features):
-                new_features[i] = float(current_features[i-1])
-            else:
-                new_features[i] = 0.0
-        
-        # Update Moving Averages (indices 4-5)
-        if step == 0:
-            ma3_values = [
-                float(new_pred),
-                float(current_features[0]) if len(current_features) > 0 else 0.0,
-                float(current_features[1]) if len(current_features) > 1 else 0.0
-            ]
-            new_features[4] = float(np.mean(ma3_values))  # MA_3
-            
-            ma7_values = [float(f) for f in current_features[:4]]
-            new_features[5] = float(np.mean(ma7_values)) if ma7_values else 0.0  # MA_7
-        else:
-            recent_preds_3 = all_predictions[-min(3, len(all_predictions)):]
-            new_features[4] = float(np.mean(recent_preds_3))
-            
-            recent_preds_7 = all_predictions[-min(7, len(all_predictions)):]
-            new_features[5] = float(np.mean(recent_preds_7))
+        rng = np.random.default_rng(seed)
+        noise = rng.choice(residuals, size=(n_paths + 1, n_steps), replace=True)
+        noise[0, :] = 0.0
         
-        return new_features
+        features = FEATURE_SPEC.updater(self._prepare_last_features(last_features), batch=n_paths + 1)
+        runner = StepRunner(model_session, features.X, input_name, output_name)
+        paths = np.empty((n_paths + 1, n_steps), dtype=np.float64)
+        
+        for step in range(n_steps):
+            np.add(runner.run(), noise[:, step], out=paths[:, step])
+            features.advance(paths[:, step])
+        
+        alpha = (1.0 - confidence) / 2.0
+        lower_bounds, upper_bounds = np.quantile(paths[1:], [alpha, 1.0 - alpha], axis=0)
+        predictions_array = paths[0]
+        
+        return {
+            'predictions': predictions_array,
+            'lower_bound': np.minimum(lower_bounds, predictions_array),
+            'upper_bound': np.maximum(upper_bounds, predictions_array),
+            'confidence_width': float(np.mean(upper_bounds - lower_bounds)),
+        }
 
     def forecast_multistep_deterministic(self, model_session, last_features, n_steps):
         """Menjalankan forecast multistep menggunakan sesi ONNX."""
         logger.debug(f"Generating {n_steps}-step DETERMINISTIC forecast (ONNX)...")
         
+        input_name, output_name = self._get_io_names(model_session)
+        
+        # Pastikan tipe data adalah float32 dan jumlah fitur sesuai FEATURE_SPEC
+        current_features = self._prepare_last_features(last_features)
+        historical_volatility = np.std(current_features[:len(FEATURE_SPEC.lags)])
+        
+        # Buffer input/output dipakai ulang di setiap langkah (lihat step_loop.py)
+        features = FEATURE_SPEC.updater(current_features)
+        runner = StepRunner(model_session, features.X, input_name, output_name)
+        predictions = np.empty(n_steps, dtype=np.float64)
+        
+        for step in range(n_steps):
+            preds = runner.run()
+            predictions[step] = preds[0]
+            features.advance(preds)
+        
+        return self._build_confidence_bounds(predictions, historical_volatility)
+
+    def _get_io_names(self, model_session):
+        """Ambil nama input/output pertama dari sesi ONNX."""
         try:
-            input_name = model_session.get_inputs()[0].name
-            output_name = model_session.get_outputs()[0].name
+            return model_session.get_inputs()[0].name, model_session.get_outputs()[0].name
         except IndexError:
             logger.error("Model ONNX tidak memiliki input/output. Model korup?")
             raise ValueError("Model ONNX tidak valid.")
-        
-        # Pastikan tipe data adalah float32 dan 6 fitur
-        expected_features = len(self.feature_cols)
-        if len(last_features) != expected_features:
-            if len(last_features) > expected_features:
-                current_features = last_features[:expected_features].astype(np.float32)
-            else:
-                current_features = np.pad(last_features, (0, expected_features - len(last_features)), 'constant').astype(np.float32)
-        else:
-            current_features = last_features.astype(np.float32)
 
-        predictions = []
-        historical_volatility = np.std(current_features[:4])
-        
-        for step in range(n_steps):
-            X_pred = current_features.reshape(1, -1)
-            
-            # Jalankan inference ONNX
-            pred_result = model_session.run([output_name], {input_name: X_pred})
-            
-            if isinstance(pred_result[0], (list, np.ndarray)):
-                pred = pred_result[0][0]
-                if isinstance(pred, (list, np.ndarray)):
-                     pred = pred[0]
-            else:
-                pred = pred_result[0]
+    def _prepare_last_features(self, last_features):
+        """Pastikan vektor fitur awal bertipe float32 dengan panjang sesuai feature_cols."""
+        expected_features = len(self.feature_cols)
+        if len(last_features) > expected_features:
+            return last_features[:expected_features].astype(np.float32)
+        if len(last_features) < expected_features:
+            return np.pad(last_features, (0, expected_features - len(last_features)), 'constant').astype(np.float32)
+        return last_features.astype(np.float32)
 
-            pred = float(pred) 
-            predictions.append(pred)
-            
-            current_features = self._update_features_deterministic(
-                current_features, pred, predictions, step
-            )
-        
-        predictions_array = np.array(predictions)
-        
-        # (Logika confidence interval tetap sama)
+    def _build_confidence_bounds(self, predictions_array, historical_volatility):
+        """Hitung confidence interval heuristik untuk deret prediksi."""
+        n_steps = len(predictions_array)
         confidence_widths = []
         for step in range(n_steps):
             base_uncertainty = historical_volatility * 0.1
@@ -196,45 +227,46 @@ class ForecastingEngine:
             'confidence_width': float(np.mean(upper_bounds - lower_bounds)),
         }
 
-    def generate_forecast(self, model_name, forecast_weeks=8):
-        """Generate forecast menggunakan model ONNX yang dimuat."""
-        logger.debug(f"Forecasting engine (ONNX) - Generate forecast: model='{model_name}'")
-        
-        if not (4 <= forecast_weeks <= 12):
-            raise ValueError("Forecast weeks must be between 4 and 12")
-        
-        # Load data historis untuk fitur
-        # Di Vercel, kita asumsikan data_handler akan memuat dari DB
+    def _recent_feature_rows(self, n):
+        """
+        n baris fitur training terakhir yang lengkap (Tanggal, Indikator_Harga, feature_cols).
+        Hanya n + konteks nilai terbaru yang dibaca (ORDER BY tanggal DESC LIMIT),
+        lalu fitur dihitung dengan FEATURE_SPEC.compute seperti prepare_features.
+        """
         from services.data_handler import DataHandler
-        df = DataHandler().load_historical_data() 
-        
-        if df.empty:
-             raise ValueError("No historical data found. Please upload data first.")
+        dates, values = DataHandler().load_recent(n + FEATURE_SPEC.history_rows - 1)
+        if len(values) == 0:
+            raise ValueError("No historical data found. Please upload data first.")
+        
+        df = pd.DataFrame(FEATURE_SPEC.compute(values), columns=self.feature_cols)
+        df.insert(0, 'Tanggal', pd.to_datetime(dates))
+        df.insert(1, 'Indikator_Harga', values)
+        return df.iloc[-n:].dropna(subset=self.feature_cols).reset_index(drop=True)
+
+    def _load_forecast_origin(self):
+        """
+        Titik awal forecast: (vektor fitur baris terakhir, tanggal terakhir).
+        Dibaca dari feature store di iph_data (satu baris); jika belum terisi,
+        dihitung dari nilai terbaru lalu feature store di-backfill.
+        """
+        from services.data_handler import DataHandler
+        data_handler = DataHandler()
         
-        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-        df = df.sort_values('Tanggal').reset_index(drop=True)
+        latest = data_handler.load_latest_features()
+        if latest is not None:
+            last_date, last_features = latest
+            return last_features, last_date
         
-        df_features = self.prepare_features(df)
+        df_features = self._recent_feature_rows(1)
         if df_features.empty:
-            raise ValueError("Tidak ada data valid untuk forecasting (setelah prepare_features)")
+            raise ValueError("Tidak ada data valid untuk forecasting (fitur belum lengkap)")
         
-        # Muat sesi model ONNX
-        try:
-            model_session = self._load_model_session(model_name)
-        except FileNotFoundError:
-            logger.error(f"Model {model_name}.onnx tidak ditemukan. Latih dan unggah model terlebih dahulu.")
-            raise
-        except Exception as e:
-            logger.error(f"Gagal memuat model {model_name}.onnx: {e}")
-            raise
+        logger.info("Feature store belum lengkap, backfill kolom fitur iph_data")
+        data_handler.refresh_features()
+        return df_features[self.feature_cols].iloc[-1].values, df_features['Tanggal'].iloc[-1]
 
-        last_features = df_features[self.feature_cols].iloc[-1].values
-        
-        forecast_result = self.forecast_multistep_deterministic(
-            model_session, last_features, forecast_weeks
-        )
-        
-        last_date = df_features['Tanggal'].max()
+    def _build_forecast_output(self, model_name, forecast_result, last_date, forecast_weeks, generated_at=None):
+        """Susun DataFrame forecast dan ringkasannya dari hasil multistep."""
         forecast_dates = pd.date_range(
             start=last_date + timedelta(days=7), 
             periods=forecast_weeks, 
@@ -248,7 +280,7 @@ class ForecastingEngine:
             'Batas_Atas': [float(upper) for upper in forecast_result['upper_bound']],
             'Model': model_name,
             'Confidence_Width': float(forecast_result['confidence_width']),
-            'Generated_At': datetime.now().isoformat()
+            'Generated_At': generated_at or datetime.now().isoformat()
         })
         
         forecast_summary = {
@@ -260,31 +292,163 @@ class ForecastingEngine:
             'max_prediction': float(forecast_result['predictions'].max())
         }
         
+        return forecast_df, forecast_summary
+
+    def generate_forecast_path(self, model_name, interval_method='heuristic', ensemble_weights=None):
+        """
+        Forecast penuh sepanjang FORECAST_MAX_WEEKS langkah untuk satu model.
+        Horizon yang lebih pendek adalah prefix dari jalur ini (lihat slice_forecast),
+        sehingga cukup dihitung sekali per model dan versi data.
+        
+        interval_method:
+            'heuristic'  - confidence band berbasis volatilitas (default, cepat)
+            'simulation' - prediction interval Monte-Carlo dari residual historis
+        
+        model_name == 'Ensemble' menggabungkan semua model .onnx dengan
+        `ensemble_weights` ({model_name: bobot}, default bobot sama rata).
+        """
+        logger.debug(f"Forecasting engine (ONNX) - Generate forecast path: model='{model_name}', interval={interval_method}")
+        
+        if interval_method not in ('heuristic', 'simulation'):
+            raise ValueError("interval_method must be 'heuristic' or 'simulation'")
+        
+        n_steps = Config.FORECAST_MAX_WEEKS
+        
+        # Vektor fitur terakhir dari feature store
+        last_features, last_date = self._load_forecast_origin()
+        
+        # Muat sesi model ONNX
+        try:
+            if model_name == ENSEMBLE_MODEL_NAME:
+                model_session = self.build_ensemble_session(ensemble_weights)
+            else:
+                model_session = self._load_model_session(model_name)
+        except FileNotFoundError:
+            logger.error(f"Model {model_name}.onnx tidak ditemukan. Latih dan unggah model terlebih dahulu.")
+            raise
+        except Exception as e:
+            logger.error(f"Gagal memuat model {model_name}.onnx: {e}")
+            raise
+
+        if interval_method == 'simulation':
+            from services.data_handler import DataHandler
+            df_residual = DataHandler().load_feature_rows(Config.FORECAST_RESIDUAL_WINDOW)
+            forecast_result = self.forecast_multistep_simulation(
+                model_session, last_features, n_steps,
+                residuals=self.compute_residuals(model_session, df_residual),
+                n_paths=Config.FORECAST_SIMULATION_PATHS
+            )
+        else:
+            forecast_result = self.forecast_multistep_deterministic(
+                model_session, last_features, n_steps
+            )
+        
         # 'model_performance' sekarang adalah dummy
         model_performance = {
             'mae': 0.0, 'rmse': 0.0, 'r2_score': 0.0, 'training_time': 0.0
         }
+        if isinstance(model_session, EnsembleSession):
+            model_performance['ensemble_weights'] = dict(
+                zip(model_session.member_names, model_session.weights.tolist())
+            )
         
-        return forecast_df, model_performance, forecast_summary
+        return {
+            'model_name': model_name,
+            'result': forecast_result,
+            'last_date': last_date,
+            'model_performance': model_performance,
+            'generated_at': datetime.now().isoformat()
+        }
 
-    def get_available_models(self):
-        """Mencari file .onnx di folder models."""
-        if not os.path.exists(self.models_path):
-            return []
-        
-        model_files = [f for f in os.listdir(self.models_path) if f.endswith('.onnx')]
-        available_models = []
-        
-        for file in model_files:
-            # Ambil nama model dari nama file .onnx
-            model_name = os.path.splitext(file)[0].replace('_', ' ')
-            filepath = os.path.join(self.models_path, file)
-            stat = os.stat(filepath)
-            available_models.append({
+    def slice_forecast(self, forecast_path, forecast_weeks):
+        """
+        Potong jalur forecast penuh menjadi `forecast_weeks` langkah pertama.
+        Ringkasan (trend, volatilitas, min/max, confidence) dihitung pada potongan.
+        """
+        full_result = forecast_path['result']
+        max_weeks = len(full_result['predictions'])
+        if not (4 <= forecast_weeks <= max_weeks):
+            raise ValueError(f"Forecast weeks must be between 4 and {max_weeks}")
+        
+        forecast_result = {
+            key: np.asarray(full_result[key])[:forecast_weeks]
+            for key in ('predictions', 'lower_bound', 'upper_bound')
+        }
+        forecast_result['confidence_width'] = float(
+            np.mean(forecast_result['upper_bound'] - forecast_result['lower_bound'])
+        )
+        
+        forecast_df, forecast_summary = self._build_forecast_output(
+            forecast_path['model_name'], forecast_result, forecast_path['last_date'],
+            forecast_weeks, generated_at=forecast_path['generated_at']
+        )
+        return forecast_df, dict(forecast_path['model_performance']), forecast_summary
+
+    def generate_forecast(self, model_name, forecast_weeks=8, interval_method='heuristic', ensemble_weights=None):
+        """
+        Generate forecast menggunakan model ONNX yang dimuat
+        (jalur penuh FORECAST_MAX_WEEKS lalu dipotong ke `forecast_weeks`).
+        """
+        if not (4 <= forecast_weeks <= 12):
+            raise ValueError("Forecast weeks must be between 4 and 12")
+        
+        forecast_path = self.generate_forecast_path(model_name, interval_method, ensemble_weights)
+        return self.slice_forecast(forecast_path, forecast_weeks)
+
+    def generate_forecast_all(self, models=None, forecast_weeks=8):
+        """
+        Generate forecast untuk banyak model sekaligus.
+        Vektor fitur awal dimuat SEKALI (feature store), lalu semua sesi ONNX
+        dijalankan bersamaan (lockstep) per langkah rekursif.
+        
+        Returns:
+            dict {model_name: forecast_df}
+        """
+        if not (4 <= forecast_weeks <= 12):
+            raise ValueError("Forecast weeks must be between 4 and 12")
+        
+        if models is None:
+            models = [m['name'] for m in self.get_available_models()]
+        if not models:
+            raise ValueError("Tidak ada model .onnx yang tersedia untuk forecasting")
+        
+        logger.debug(f"Forecasting engine (ONNX) - Generate forecast for {len(models)} models (lockstep)")
+        
+        last_features, last_date = self._load_forecast_origin()
+        last_features = self._prepare_last_features(last_features)
+        historical_volatility = np.std(last_features[:len(FEATURE_SPEC.lags)])
+        
+        # Satu state rekursif (buffer fitur + runner) per model
+        states = []
+        for model_name in models:
+            model_session = self._load_model_session(model_name)
+            input_name, output_name = self._get_io_names(model_session)
+            features = FEATURE_SPEC.updater(last_features)
+            states.append({
                 'name': model_name,
-                'filename': file,
-                'size_mb': stat.st_size / (1024 * 1024),
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                'features': features,
+                'runner': StepRunner(model_session, features.X, input_name, output_name),
+                'predictions': np.empty(forecast_weeks, dtype=np.float64)
             })
         
-        return available_models
\ No newline at end of file
+        for step in range(forecast_weeks):
+            for state in states:
+                preds = state['runner'].run()
+                state['predictions'][step] = preds[0]
+                state['features'].advance(preds)
+        
+        forecasts = {}
+        for state in states:
+            forecast_result = self._build_confidence_bounds(
+                state['predictions'], historical_volatility
+            )
+            forecast_df, _ = self._build_forecast_output(
+                state['name'], forecast_result, last_date, forecast_weeks
+            )
+            forecasts[state['name']] = forecast_df
+        
+        return forecasts
+
+    def get_available_models(self):
+        """Daftar model .onnx di folder models (metadata dari registry in-memory)."""
+        return self.registry.list_models()
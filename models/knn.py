@@ -0,0 +1,191 @@
+# models/knn.py
+"""
+Backend NumPy untuk graph ONNX KNeighborsRegressor (keluaran skl2onnx).
+
+Graph ONNX menghitung jarak ke seluruh data latih lewat Scan pada setiap
+panggilan. Di sini data latih (initializer Scan), k (TopK), target
+(ArrayFeatureExtractor) dan konstanta bobot diambil sekali saat load menjadi
+array float64 kontigu. Query dijawab per blok: jarak kuadrat via
+||q||^2 - 2 q.t + ||t||^2 (satu GEMM per blok) lalu argpartition untuk k
+tetangga terdekat. Data latih besar (>= Config.KNN_KDTREE_MIN_POINTS) memakai
+KD-tree scipy bila scipy terpasang.
+
+KNNSession meniru antarmuka InferenceSession seperti TreeEnsembleSession.
+Paritas dengan onnxruntime dicek oleh benchmarks/bench_knn_backend.py.
+"""
+import logging
+
+import numpy as np
+
+from config import Config
+from .onnx_proto import load_onnx_graph
+from .tree_ensemble import NodeArg
+
+logger = logging.getLogger(__name__)
+
+# Op yang dihasilkan skl2onnx untuk KNeighborsRegressor (metric euclidean)
+_KNN_OPS = {
+    'Scan', 'Transpose', 'Sqrt', 'TopK', 'Flatten', 'ArrayFeatureExtractor', 'Reshape',
+    'Cast', 'Mul', 'Max', 'Reciprocal', 'ReduceSum', 'ReduceMean', 'Shape', 'Div',
+}
+
+# Batas elemen matriks jarak per blok query (float64, ~32 MB)
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _find_node(graph, op_type, first_input=None):
+    for node in graph.nodes:
+        if node['op_type'] == op_type and (first_input is None or node['inputs'][0] == first_input):
+            return node
+    return None
+
+
+class KNNIndex:
+    """Data latih + parameter prediksi satu KNeighborsRegressor."""
+
+    def __init__(self, train, targets, k, weight_scale=None, weight_floor=None):
+        self.train = np.ascontiguousarray(train, dtype=np.float64)
+        self.targets = np.ascontiguousarray(targets, dtype=np.float32)
+        self.n_train, self.n_features = self.train.shape
+        if len(self.targets) != self.n_train:
+            raise ValueError("Jumlah target KNN tidak sama dengan jumlah data latih")
+        self.k = min(int(k), self.n_train)
+
+        # weights='distance': w = 1 / max(jarak * scale, floor); None = rata-rata biasa
+        self.weight_scale = weight_scale
+        self.weight_floor = weight_floor
+
+        self._train_sq = np.einsum('ij,ij->i', self.train, self.train)
+        self._block_rows = max(1, _BLOCK_ELEMENTS // self.n_train)
+        self._kdtree = self._build_kdtree()
+
+    def _build_kdtree(self):
+        if self.n_train < Config.KNN_KDTREE_MIN_POINTS:
+            return None
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            logger.debug("scipy tidak terpasang, KNN memakai pencarian brute force")
+            return None
+        return cKDTree(self.train)
+
+    @property
+    def method(self):
+        return 'kdtree' if self._kdtree is not None else 'brute'
+
+    def _brute_neighbors(self, X):
+        n_rows, k = len(X), self.k
+        distances = np.empty((n_rows, k), dtype=np.float64)
+        indices = np.empty((n_rows, k), dtype=np.intp)
+
+        for start in range(0, n_rows, self._block_rows):
+            q = X[start:start + self._block_rows]
+            d2 = q @ self.train.T
+            d2 *= -2.0
+            d2 += np.einsum('ij,ij->i', q, q)[:, None]
+            d2 += self._train_sq
+            np.maximum(d2, 0.0, out=d2)
+
+            if k < self.n_train:
+                candidates = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.broadcast_to(np.arange(self.n_train), d2.shape)
+            # Urut indeks dulu agar jarak yang sama mengikuti urutan data latih (seperti TopK)
+            candidates = np.sort(candidates, axis=1)
+            candidate_d2 = np.take_along_axis(d2, candidates, axis=1)
+            order = np.argsort(candidate_d2, axis=1, kind='stable')
+
+            stop = start + len(q)
+            indices[start:stop] = np.take_along_axis(candidates, order, axis=1)
+            distances[start:stop] = np.sqrt(np.take_along_axis(candidate_d2, order, axis=1))
+        return distances, indices
+
+    def neighbors(self, X):
+        """(jarak, indeks) k tetangga terdekat, masing-masing (n_rows, k), urut naik."""
+        X = np.asarray(X, dtype=np.float64)[:, :self.n_features]
+        if self._kdtree is not None:
+            distances, indices = self._kdtree.query(X, k=self.k)
+            return distances.reshape(len(X), self.k), indices.reshape(len(X), self.k)
+        return self._brute_neighbors(X)
+
+    def predict(self, X):
+        """Prediksi (n_rows,) float32."""
+        distances, indices = self.neighbors(X)
+        values = self.targets.take(indices)
+        if self.weight_scale is None:
+            return values.mean(axis=1, dtype=np.float32)
+
+        weights = np.reciprocal(
+            np.maximum(distances.astype(np.float32) * self.weight_scale, self.weight_floor)
+        )
+        return (values * weights).sum(axis=1) / weights.sum(axis=1)
+
+
+class KNNSession:
+    """Pengganti InferenceSession berbasis NumPy untuk graph KNeighborsRegressor."""
+
+    def __init__(self, index, input_name, output_name):
+        self.index = index
+        self._inputs = [NodeArg(input_name, 'tensor(float)', [None, index.n_features])]
+        self._outputs = [NodeArg(output_name, 'tensor(float)', [None, 1])]
+
+    def get_inputs(self):
+        return self._inputs
+
+    def get_outputs(self):
+        return self._outputs
+
+    def run(self, output_names, input_feed, run_options=None):
+        X = input_feed[self._inputs[0].name]
+        prediction = self.index.predict(X).astype(np.float32).reshape(-1, 1)
+        return [prediction for _ in (output_names or self._outputs)]
+
+
+def is_knn_graph(graph):
+    if not graph.nodes or graph.nodes[0]['op_type'] != 'Scan':
+        return False
+    body = graph.nodes[0]['attributes'].get('body')
+    return (
+        body is not None
+        and set(body.op_types) <= {'Identity', 'Sub', 'ReduceSumSquare'}
+        and 'ReduceSumSquare' in body.op_types
+        and set(graph.op_types) <= _KNN_OPS
+        and 'TopK' in graph.op_types
+        and 'ArrayFeatureExtractor' in graph.op_types
+    )
+
+
+def load_knn_session(onnx_path, graph=None):
+    """Bangun KNNSession dari file .onnx; ValueError jika graph bukan KNN euclidean skl2onnx."""
+    graph = graph or load_onnx_graph(onnx_path)
+    if not is_knn_graph(graph):
+        raise ValueError(f"Graph {onnx_path} bukan KNeighborsRegressor euclidean: {graph.op_types}")
+
+    init = graph.initializers
+    scan = graph.nodes[0]
+    topk = _find_node(graph, 'TopK')
+    extractor = _find_node(graph, 'ArrayFeatureExtractor')
+    if (scan['inputs'][0] not in graph.inputs or scan['inputs'][1] not in init
+            or topk['inputs'][1] not in init or extractor['inputs'][0] not in init
+            or topk['attributes'].get('largest', 1) != 0):
+        raise ValueError(f"Struktur graph KNN tidak dikenali: {onnx_path}")
+
+    targets = init[extractor['inputs'][0]]
+    if targets.ndim != 1:
+        raise ValueError("Hanya KNeighborsRegressor satu target yang didukung")
+
+    weight_scale = weight_floor = None
+    if 'Reciprocal' in graph.op_types:
+        # weights='distance': Reciprocal(Max(Mul(jarak, scale), floor))
+        mul = _find_node(graph, 'Mul', topk['outputs'][0])
+        floor = _find_node(graph, 'Max', mul['outputs'][0]) if mul else None
+        if floor is None or mul['inputs'][1] not in init or floor['inputs'][1] not in init:
+            raise ValueError(f"Pembobotan jarak KNN tidak dikenali: {onnx_path}")
+        weight_scale = np.float32(init[mul['inputs'][1]].reshape(-1)[0])
+        weight_floor = np.float32(init[floor['inputs'][1]].reshape(-1)[0])
+
+    index = KNNIndex(
+        init[scan['inputs'][1]], targets, int(init[topk['inputs'][1]].reshape(-1)[0]),
+        weight_scale, weight_floor
+    )
+    return KNNSession(index, graph.inputs[0], graph.outputs[0])
@@ -0,0 +1,147 @@
+# models/micro_batcher.py
+"""
+Micro-batching inference untuk panggilan predict yang bersamaan.
+
+Panggilan untuk sesi yang sama dikumpulkan paling lama max_wait_ms atau
+sampai max_rows baris, dijalankan sebagai satu tensor bertumpuk, lalu hasilnya
+dibagikan kembali ke Future masing-masing pemanggil. Jendela tunggu hanya
+dipakai selama sesi tersebut sedang menjalankan batch lain, sehingga pemanggil
+tunggal tidak pernah menunggu.
+
+Tanpa thread latar: pemanggil pertama yang menemukan antrean kosong menjadi
+"leader" yang menunggu jendela batch lalu menjalankan sesi; pemanggil lain
+hanya menunggu Future-nya. Aktif per model lewat Config.INFERENCE_MICROBATCH_MODELS:
+model yang inference-nya murah (model pohon, ~15 us per baris) lebih lambat
+jika diantrekan, jadi hanya model mahal seperti KNN yang layak dimasukkan.
+"""
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def micro_batch_enabled(model_name):
+    """True jika model ada di daftar Config.INFERENCE_MICROBATCH_MODELS (dipisah koma)."""
+    allowed = {
+        name.strip().replace('_', ' ')
+        for name in Config.INFERENCE_MICROBATCH_MODELS.split(',') if name.strip()
+    }
+    return model_name.replace('_', ' ') in allowed
+
+
+def get_micro_batcher():
+    """MicroBatcher bersama untuk proses ini."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher()
+        return _batcher
+
+
+class _Batch:
+    """Antrean satu sesi: baris yang menunggu + status leader."""
+
+    def __init__(self, session):
+        self.session = session
+        self.cond = threading.Condition()
+        self.pending = []  # [(X, Future)]
+        self.rows = 0
+        self.leader_active = False
+        self.running = 0  # batch yang sedang dijalankan untuk sesi ini
+
+
+class MicroBatcher:
+    """Gabungkan panggilan session.run bersamaan per (model, sesi)."""
+
+    def __init__(self, max_wait_ms=None, max_rows=None):
+        self.max_wait = (Config.INFERENCE_MICROBATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms) / 1000.0
+        self.max_rows = max_rows or Config.INFERENCE_MICROBATCH_MAX_ROWS
+        self._batches = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'session_runs': 0}
+
+    def _get_batch(self, model_name, session):
+        key = (model_name, id(session))
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is None or batch.session is not session:
+                # Sesi baru untuk model ini (hot reload): buang antrean lama yang kosong
+                for old_key in [k for k, b in self._batches.items() if k[0] == model_name and not b.pending]:
+                    del self._batches[old_key]
+                batch = _Batch(session)
+                self._batches[key] = batch
+            return batch
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def submit(self, model_name, session, X):
+        """Masukkan X (n_rows, n_features) ke antrean; Future berisi prediksi n_rows."""
+        X = np.asarray(X, dtype=np.float32)
+        future = Future()
+        batch = self._get_batch(model_name, session)
+        self._count('calls')
+
+        with batch.cond:
+            batch.pending.append((X, future))
+            batch.rows += len(X)
+            if batch.leader_active:
+                if batch.rows >= self.max_rows:
+                    batch.cond.notify_all()
+                return future
+            batch.leader_active = True
+
+        self._lead(batch)
+        return future
+
+    def predict(self, model_name, session, X):
+        return self.submit(model_name, session, X).result()
+
+    def _lead(self, batch):
+        """Tunggu jendela batch, ambil antrean, jalankan satu session.run."""
+        deadline = time.monotonic() + self.max_wait
+        with batch.cond:
+            while batch.running and batch.rows < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.cond.wait(remaining)
+
+            pending, batch.pending = batch.pending, []
+            batch.rows = 0
+            batch.leader_active = False
+            batch.running += 1
+
+        try:
+            self._run(batch.session, pending)
+        finally:
+            with batch.cond:
+                batch.running -= 1
+                batch.cond.notify_all()
+
+    def _run(self, session, pending):
+        try:
+            stacked = pending[0][0] if len(pending) == 1 else np.concatenate([x for x, _ in pending])
+            input_name = session.get_inputs()[0].name
+            output_name = session.get_outputs()[0].name
+            predictions = session.run([output_name], {input_name: stacked})[0]
+            self._count('session_runs')
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        offset = 0
+        for x, future in pending:
+            future.set_result(predictions[offset:offset + len(x)])
+            offset += len(x)
@@ -3,17 +3,43 @@ import os
 import json
 import pandas as pd
 import numpy as np  
-import pickle
 from datetime import datetime
 from database import db, ModelPerformance
-from sqlalchemy import and_, func
+from sqlalchemy import and_, case, event, func
+from sqlalchemy.orm import Session, object_session
 from .forecasting_engine import ForecastingEngine # Import engine baru (inference-only)
-import onnxruntime as rt
+from .session_factory import create_model_session
+from .ensemble import inverse_mae_weights
+from .model_metadata import load_model_metadata
+from .best_model import best_model_record, ensemble_weights_record, invalidate_best_model
+from .micro_batcher import get_micro_batcher, micro_batch_enabled
+from .performance_series import load_performance_series, series_to_lists
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+# Write-through: setiap perubahan baris ModelPerformance via ORM membuat
+# record model terbaik dihitung ulang pada pembacaan berikutnya. Invalidasi
+# diulang setelah commit agar pembaca yang menghitung ulang di antara flush dan
+# commit tidak menyimpan hasil lama.
+def _on_model_performance_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info['best_model_dirty'] = True
+    invalidate_best_model()
+
+
+def _on_session_commit(session):
+    if session.info.pop('best_model_dirty', False):
+        invalidate_best_model()
+
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(ModelPerformance, _event_name, _on_model_performance_write)
+event.listen(Session, 'after_commit', _on_session_commit)
+
 class ModelManager:
     """ 
     Model manager yang dimodifikasi untuk HANYA menjalankan inference.
@@ -24,7 +50,7 @@ class ModelManager:
             self.engine = ForecastingEngine(data_path, models_path)
             self.models_path = models_path
             self.loaded_models = {}  # {model_name: onnx_session}
-            self.model_metadata = {}  # {model_name: {scaler, features}}
+            self.model_metadata = {}  # {model_name: ModelMetadata}
             
             os.makedirs(models_path, exist_ok=True)
             logger.info("ModelManager initialized (Inference-Only Mode)")
@@ -58,20 +84,16 @@ class ModelManager:
                     
                     # Load ONNX session (TIDAK perlu sklearn!)
                     logger.debug(f"  Loading {model_name}...")
-                    session = rt.InferenceSession(
-                        onnx_path, 
-                        providers=['CPUExecutionProvider']
-                    )
+                    session = create_model_session(onnx_path, model_name)
                     
                     self.loaded_models[model_name] = session
                     logger.info(f"  [OK] Loaded {model_name} (ONNX)")
                     
-                    # Coba load metadata (scaler, features) dari .pkl.meta
-                    # meta_path = onnx_path.replace('.onnx', '.pkl.meta')
-                    # if os.path.exists(meta_path):
-                    #     with open(meta_path, 'rb') as f:
-                    #         self.model_metadata[model_name] = pickle.load(f)
-                    #     logger.debug(f"  [OK] Loaded metadata for {model_name}")
+                    # Metadata (scaler, features) dari sidecar .meta.json (tanpa pickle/sklearn)
+                    metadata = load_model_metadata(onnx_path)
+                    if metadata is not None:
+                        self.model_metadata[model_name] = metadata
+                        logger.debug(f"  [OK] Loaded metadata for {model_name}")
                     
                 except Exception as e:
                     logger.error(f"  [ERROR] Load {onnx_file}: {e}", exc_info=True)
@@ -79,35 +101,41 @@ class ModelManager:
         except Exception as e:
             logger.error(f"[ERROR] Failed to load ONNX models: {e}", exc_info=True)
 
-    def predict(self, X):
+    def predict(self, X, model_name=None):
         """
         Make prediction dengan ONNX Runtime.
         
         Args:
             X: numpy array dengan shape (n_samples, n_features)
+            model_name: model yang dipakai (default: model terbaik saat ini)
             
         Returns:
             predictions: numpy array
         """
         try:
-            model_name, session = self.get_best_model()
+            if model_name is None:
+                best_model = self.get_current_best_model()
+                if not best_model:
+                    raise Exception("No model loaded")
+                model_name = best_model['model_name']
             
-            if session is None:
-                raise Exception("No model loaded")
+            # Sesi dari registry sudah menerapkan scaler metadata (ScaledSession)
+            session = self.engine._load_model_session(model_name)
             
-            # Scale input jika ada metadata
-            if model_name in self.model_metadata:
-                scaler = self.model_metadata[model_name]['scaler']
-                X_scaled = scaler.transform(X).astype(np.float32)
-            else:
-                X_scaled = X.astype(np.float32)
+            X = np.asarray(X, dtype=np.float32)
+            if X.ndim == 1:
+                X = X.reshape(1, -1)
+            
+            # Panggilan bersamaan digabung menjadi satu session.run (model terpilih saja)
+            if micro_batch_enabled(model_name):
+                return get_micro_batcher().predict(model_name, session, X)
             
             # Get input/output names dari session
             input_name = session.get_inputs()[0].name
             output_name = session.get_outputs()[0].name
             
             # Run inference
-            predictions = session.run([output_name], {input_name: X_scaled})
+            predictions = session.run([output_name], {input_name: X})
             
             return predictions[0]
             
@@ -115,95 +143,230 @@ class ModelManager:
             logger.error(f"[ERROR] Prediction failed: {e}", exc_info=True)
             raise
 
-    def load_performance_history(self):
-        """ Load performance history from database (TETAP SAMA)"""
+    def get_current_best_model(self):
+        """ 
+        Get current best model (record in-memory, O(1) untuk pembaca).
+        Dihitung ulang dari database hanya setelah ModelPerformance ditulis,
+        folder models berubah, atau TTL habis.
+        """
         try:
-            records = ModelPerformance.query.order_by(
-                ModelPerformance.trained_at.asc()
-            ).all()
-            history = [record.to_dict() for record in records]
-            return history
+            registry = self.engine.registry
+            registry.refresh()
+            return best_model_record.get(self._compute_current_best_model, registry.version)
         except Exception as e:
-            print(f"Error loading performance history: {str(e)}")
-            return []
+            print(f"Error getting best model: {str(e)}")
+            return None
     
-    def get_current_best_model(self):
+    def _compute_current_best_model(self):
         """ 
-        Get current best model from database.
+        Hitung model terbaik dari database.
         Ini akan membaca data performa yang di-upload dari lokal.
-        (TETAP SAMA, DENGAN FALLBACK)
+        (DENGAN FALLBACK ke file .onnx)
         """
-        try:
-            # 1. Coba baca dari Database (diisi oleh skrip lokal)
-            subquery = db.session.query(
-                ModelPerformance.model_name,
-                func.max(ModelPerformance.trained_at).label('max_trained_at')
-            ).group_by(ModelPerformance.model_name).subquery()
-            
-            latest_models = db.session.query(ModelPerformance).join(
-                subquery,
-                and_(
-                    ModelPerformance.model_name == subquery.c.model_name,
-                    ModelPerformance.trained_at == subquery.c.max_trained_at
-                )
-            ).all()
-            
-            if latest_models:
-                valid_models = [m for m in latest_models if m.mae is not None and not np.isnan(m.mae)]
-                if valid_models:
-                    best_model = min(valid_models, key=lambda x: x.mae)
-                    print(f"Current best model (from DB): {best_model.model_name} (MAE: {best_model.mae:.4f})")
-                    return best_model.to_dict()
+        # 1. Coba baca dari Database (diisi oleh skrip lokal; baris backtest diabaikan)
+        training_rows = ModelPerformance.excluding_backtest()
+        subquery = db.session.query(
+            ModelPerformance.model_name,
+            func.max(ModelPerformance.trained_at).label('max_trained_at')
+        ).filter(training_rows).group_by(ModelPerformance.model_name).subquery()
+        
+        latest_models = db.session.query(ModelPerformance).join(
+            subquery,
+            and_(
+                ModelPerformance.model_name == subquery.c.model_name,
+                ModelPerformance.trained_at == subquery.c.max_trained_at
+            )
+        ).filter(training_rows).all()
+        
+        if latest_models:
+            valid_models = [m for m in latest_models if m.mae is not None and not np.isnan(m.mae)]
+            if valid_models:
+                best_model = min(valid_models, key=lambda x: x.mae)
+                print(f"Current best model (from DB): {best_model.model_name} (MAE: {best_model.mae:.4f})")
+                return best_model.to_dict()
 
-            # 2. Fallback: Jika DB kosong, baca dari file .onnx
-            print("No performance data in DB, falling back to .onnx files...")
-            onnx_models = self.engine.get_available_models()
-            if not onnx_models:
-                print("No .onnx model files found.")
-                return None
-            
-            # Ambil model pertama yang ditemukan
-            best_onnx = onnx_models[0]
-            print(f"Using fallback .onnx model: {best_onnx['name']}")
-            # Kembalikan dict dummy
-            return {'model_name': best_onnx['name'], 'mae': 0, 'rmse': 0, 'r2_score': 0}
-            
-        except Exception as e:
-            print(f"Error getting best model: {str(e)}")
+        # 2. Fallback: Jika DB kosong, baca dari file .onnx
+        print("No performance data in DB, falling back to .onnx files...")
+        onnx_models = self.engine.get_available_models()
+        if not onnx_models:
+            print("No .onnx model files found.")
             return None
+        
+        # Ambil model pertama yang ditemukan
+        best_onnx = onnx_models[0]
+        print(f"Using fallback .onnx model: {best_onnx['name']}")
+        # Kembalikan dict dummy
+        return {'model_name': best_onnx['name'], 'mae': 0, 'rmse': 0, 'r2_score': 0}
     
-    def get_model_performance_summary(self):
-        """ Get performance summary from database (TETAP SAMA, DENGAN FALLBACK)"""
+    def get_ensemble_weights(self, model_names=None):
+        """
+        Bobot ensemble inverse-MAE dari ModelPerformance terbaru tiap model.
+        Fallback ke bobot sama rata jika belum ada data performa.
+        Untuk semua model (model_names=None) MAE terbaru disimpan in-memory
+        (ensemble_weights_record) dan dibaca ulang dari database hanya setelah
+        ModelPerformance ditulis, folder models berubah, atau TTL habis.
+        """
+        registry = self.engine.registry
+        names = list(model_names) if model_names is not None else [
+            m['name'] for m in self.engine.get_available_models()
+        ]
+        if not names:
+            return {}
+
+        try:
+            if model_names is None:
+                latest_mae = ensemble_weights_record.get(lambda: self._latest_mae(names), registry.version)
+            else:
+                latest_mae = self._latest_mae(names)
+        except Exception as e:
+            logger.warning(f"Cannot read ensemble weights from DB, using equal weights: {e}")
+            latest_mae = {}
+
+        return inverse_mae_weights(names, latest_mae)
+
+    def _latest_mae(self, model_names):
+        """{model_name: MAE ModelPerformance terbaru (tanpa baris backtest)} untuk model_names."""
+        training_rows = ModelPerformance.excluding_backtest()
+        subquery = db.session.query(
+            ModelPerformance.model_name,
+            func.max(ModelPerformance.trained_at).label('max_trained_at')
+        ).filter(
+            ModelPerformance.model_name.in_(model_names),
+            training_rows
+        ).group_by(ModelPerformance.model_name).subquery()
+
+        rows = db.session.query(ModelPerformance.model_name, ModelPerformance.mae).join(
+            subquery,
+            and_(
+                ModelPerformance.model_name == subquery.c.model_name,
+                ModelPerformance.trained_at == subquery.c.max_trained_at
+            )
+        ).filter(training_rows).all()
+        return {name: mae for name, mae in rows}
+
+    def _query_performance_leaderboard(self):
+        """
+        Satu query (window function, kompatibel SQLite >= 3.25 & PostgreSQL):
+        metrik terbaru, best_mae, training_count, avg_training_time, dan jumlahan
+        regresi linier untuk slope MAE 5 record terakhir per model. Baris backtest
+        tidak ikut (sama dengan get_current_best_model).
+        """
+        MP = ModelPerformance
+        partition = {'partition_by': MP.model_name}
+        ranked = db.session.query(
+            MP.id, MP.model_name, MP.batch_id, MP.mae, MP.rmse, MP.r2_score, MP.cv_score,
+            MP.mape, MP.training_time, MP.data_size, MP.test_size, MP.is_best,
+            MP.trained_at, MP.created_at,
+            func.row_number().over(
+                order_by=(MP.trained_at.desc(), MP.id.desc()), **partition
+            ).label('rn'),
+            func.min(MP.mae).over(**partition).label('best_mae'),
+            func.count(MP.id).over(**partition).label('training_count'),
+            func.avg(MP.training_time).over(**partition).label('avg_training_time'),
+        ).filter(MP.excluding_backtest()).subquery()
+
+        latest = ranked.c.rn == 1
+        # x = -rn: urutan kronologis untuk 5 record terakhir
+        x = -ranked.c.rn
+        y = ranked.c.mae
+
+        def latest_value(column, name):
+            return func.max(case((latest, column))).label(name)
+
+        return db.session.query(
+            ranked.c.model_name,
+            func.max(ranked.c.best_mae).label('best_mae'),
+            func.max(ranked.c.training_count).label('training_count'),
+            func.max(ranked.c.avg_training_time).label('avg_training_time'),
+            latest_value(ranked.c.id, 'id'),
+            latest_value(ranked.c.batch_id, 'batch_id'),
+            latest_value(ranked.c.mae, 'mae'),
+            latest_value(ranked.c.rmse, 'rmse'),
+            latest_value(ranked.c.r2_score, 'r2_score'),
+            latest_value(ranked.c.cv_score, 'cv_score'),
+            latest_value(ranked.c.mape, 'mape'),
+            latest_value(ranked.c.training_time, 'training_time'),
+            latest_value(ranked.c.data_size, 'data_size'),
+            latest_value(ranked.c.test_size, 'test_size'),
+            latest_value(ranked.c.is_best, 'is_best'),
+            latest_value(ranked.c.trained_at, 'trained_at'),
+            latest_value(ranked.c.created_at, 'created_at'),
+            func.count(y).label('trend_n'),
+            func.sum(x).label('trend_sx'),
+            func.sum(y).label('trend_sy'),
+            func.sum(x * y).label('trend_sxy'),
+            func.sum(x * x).label('trend_sxx'),
+        ).filter(
+            ranked.c.rn <= 5
+        ).group_by(ranked.c.model_name).all()
+
+    @staticmethod
+    def _trend_slope(row):
+        """Slope least-squares MAE vs waktu dari jumlahan hasil query."""
+        n = row.trend_n or 0
+        denominator = n * (row.trend_sxx or 0) - (row.trend_sx or 0) ** 2
+        if n < 2 or denominator == 0:
+            return None
+        return (n * row.trend_sxy - row.trend_sx * row.trend_sy) / denominator
+
+    def _load_performance_histories(self):
+        """Semua record per model (urut waktu) - hanya jika diminta eksplisit."""
+        histories = {}
+        records = ModelPerformance.query.filter(
+            ModelPerformance.excluding_backtest()
+        ).order_by(
+            ModelPerformance.model_name, ModelPerformance.trained_at.asc()
+        ).all()
+        for record in records:
+            histories.setdefault(record.model_name, []).append(record.to_dict())
+        return histories
+
+    def get_model_performance_summary(self, include_history=False):
+        """
+        Get performance summary (leaderboard) dari database dalam satu query.
+        include_history=True menambahkan 'performances' (semua record per model).
+        Fallback ke file .onnx jika tabel kosong.
+        """
         try:
-            model_names_db = db.session.query(ModelPerformance.model_name).distinct().all()
             model_summary = {}
             
-            for (model_name,) in model_names_db:
-                performances = ModelPerformance.query.filter_by(
-                    model_name=model_name
-                ).order_by(ModelPerformance.trained_at.asc()).all()
-                
-                if not performances: continue
-                
-                latest = performances[-1]
-                
-                model_summary[model_name] = {
-                    'name': model_name,
-                    'performances': [p.to_dict() for p in performances],
-                    'best_mae': min(p.mae for p in performances if p.mae is not None),
-                    'latest_mae': latest.mae,
-                    'latest_r2': latest.r2_score,
-                    'training_count': len(performances),
-                    'avg_training_time': np.mean([p.training_time for p in performances if p.training_time is not None]),
-                    'latest_perf_obj': latest.to_dict() # Untuk admin/models
+            for row in self._query_performance_leaderboard():
+                latest = {
+                    'id': row.id,
+                    'model_name': row.model_name,
+                    'batch_id': row.batch_id,
+                    'mae': float(row.mae) if row.mae is not None else None,
+                    'rmse': float(row.rmse) if row.rmse is not None else None,
+                    'r2_score': float(row.r2_score) if row.r2_score is not None else None,
+                    'cv_score': float(row.cv_score) if row.cv_score is not None else None,
+                    'mape': float(row.mape) if row.mape is not None else None,
+                    'training_time': float(row.training_time) if row.training_time is not None else None,
+                    'data_size': row.data_size,
+                    'test_size': row.test_size,
+                    'is_best': bool(row.is_best),
+                    'trained_at': row.trained_at.isoformat() if row.trained_at else None,
+                    'created_at': row.created_at.isoformat() if row.created_at else None
                 }
+                slope = self._trend_slope(row)
                 
-                recent_maes = [p.mae for p in performances[-5:] if p.mae is not None]
-                if len(recent_maes) > 1:
-                    trend = np.polyfit(range(len(recent_maes)), recent_maes, 1)[0]
-                    model_summary[model_name]['trend_direction'] = 'improving' if trend < 0 else 'declining'
-                else:
-                    model_summary[model_name]['trend_direction'] = 'stable'
+                model_summary[row.model_name] = {
+                    'name': row.model_name,
+                    'best_mae': row.best_mae,
+                    'latest_mae': latest['mae'],
+                    'latest_r2': latest['r2_score'],
+                    'latest_rmse': latest['rmse'],
+                    'latest_mape': latest['mape'],
+                    'training_count': row.training_count,
+                    'avg_training_time': float(row.avg_training_time) if row.avg_training_time is not None else None,
+                    'mae_slope': slope,
+                    'trend_direction': 'stable' if slope is None else ('improving' if slope < 0 else 'declining'),
+                    'latest_perf_obj': latest # Untuk admin/models
+                }
+            
+            if include_history and model_summary:
+                histories = self._load_performance_histories()
+                for model_name, summary in model_summary.items():
+                    summary['performances'] = histories.get(model_name, [])
             
             # Jika DB kosong, isi dari file .onnx
             if not model_summary:
@@ -213,13 +376,15 @@ class ModelManager:
                     model_name = model_info['name']
                     model_summary[model_name] = {
                         'name': model_name,
-                        'performances': [], 'best_mae': 0, 'latest_mae': 0, 'latest_r2': 0,
+                        'best_mae': 0, 'latest_mae': 0, 'latest_r2': 0, 'latest_rmse': 0, 'latest_mape': 0,
                         'training_count': 1, 'avg_training_time': 0, 'trend_direction': 'stable',
                         'latest_perf_obj': { # Buat dummy object
                             'name': model_name, 'mae': 0, 'rmse': 0, 'r2_score': 0, 'mape': 0,
                             'trained_at': model_info['modified'], 'data_size': 0, 'is_best': False
                         }
                     }
+                    if include_history:
+                        model_summary[model_name]['performances'] = []
                 # Tandai yang pertama sebagai 'best' (fallback)
                 if model_summary:
                     first_key = list(model_summary.keys())[0]
@@ -227,7 +392,10 @@ class ModelManager:
 
             # Pastikan ada 'is_best'
             if model_summary and not any(v['latest_perf_obj'].get('is_best') for v in model_summary.values()):
-                 best_model_name = min(model_summary.keys(), key=lambda k: model_summary[k]['latest_mae'] or float('inf'))
+                 best_model_name = min(
+                     model_summary.keys(),
+                     key=lambda k: float('inf') if model_summary[k]['latest_mae'] is None else model_summary[k]['latest_mae']
+                 )
                  if best_model_name in model_summary:
                      model_summary[best_model_name]['latest_perf_obj']['is_best'] = True
 
@@ -237,23 +405,23 @@ class ModelManager:
             print(f"Error getting model summary: {str(e)}")
             return {}
     
-    def get_training_history_chart_data(self):
-        """ Get training history from database (TETAP SAMA)"""
+    def get_training_history_chart_data(self, bucket=None, max_points=None):
+        """
+        Training history per model untuk chart (kolumnar, dibatasi max_points).
+
+        Args:
+            bucket: None (per training) atau 'day' | 'week' | 'month'
+        """
         try:
-            history = self.load_performance_history()
-            chart_data = {}
-            for entry in history:
-                model_name = entry['model_name']
-                if model_name not in chart_data:
-                    chart_data[model_name] = {
-                        'timestamps': [],
-                        'mae_values': [],
-                        'r2_values': []
-                    }
-                chart_data[model_name]['timestamps'].append(entry['trained_at'])
-                chart_data[model_name]['mae_values'].append(entry['mae'])
-                chart_data[model_name]['r2_values'].append(entry['r2_score'])
-            return chart_data
+            series = series_to_lists(load_performance_series(bucket=bucket, max_points=max_points))
+            return {
+                model_name: {
+                    'timestamps': data['timestamps'],
+                    'mae_values': data['mae'],
+                    'r2_values': data['r2']
+                }
+                for model_name, data in series.items()
+            }
         except Exception as e:
             print(f"Error getting training history: {str(e)}")
             return {}
\ No newline at end of file
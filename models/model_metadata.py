@@ -0,0 +1,129 @@
+# models/model_metadata.py
+"""
+Metadata model ringkas (tanpa pickle/sklearn) yang disimpan di samping file .onnx
+sebagai `<Model>.meta.json`:
+
+    {
+        "format_version": 1,
+        "features": ["lag_1", ..., "ma_7"],
+        "input_dtype": "float32",
+        "scaler": {"mean": [...], "scale": [...]},
+        ...
+    }
+
+Sidecar dibuat dari `.pkl.meta` lama dengan scripts/convert_model_meta.py.
+Scaler diterapkan sebagai transformasi affine float32 tervektorisasi tepat
+sebelum sesi ONNX dijalankan (ScaledSession).
+"""
+import os
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+METADATA_SUFFIX = '.meta.json'
+METADATA_FORMAT_VERSION = 1
+
+
+def metadata_path(onnx_path):
+    """Path sidecar metadata untuk file .onnx (Model.onnx -> Model.meta.json)."""
+    return os.path.splitext(onnx_path)[0] + METADATA_SUFFIX
+
+
+class ModelMetadata:
+    """Fitur, dtype input, dan parameter StandardScaler (mean_, scale_) satu model."""
+
+    def __init__(self, features, input_dtype='float32', mean=None, scale=None, extra=None):
+        self.features = list(features)
+        self.input_dtype = np.dtype(input_dtype)
+        self.extra = extra or {}
+
+        self.scaler_params = None  # (mean_, scale_) float64 asli
+        self.mean = None
+        self.inv_scale = None
+        if mean is not None and scale is not None:
+            mean = np.asarray(mean, dtype=np.float64)
+            scale = np.asarray(scale, dtype=np.float64)
+            self.scaler_params = (mean, scale)
+            self.mean = mean.astype(self.input_dtype)
+            # Sama dengan sklearn: skala 0 diperlakukan sebagai 1
+            self.inv_scale = (1.0 / np.where(scale == 0, 1.0, scale)).astype(self.input_dtype)
+
+            if len(self.mean) != len(self.features) or len(self.inv_scale) != len(self.features):
+                raise ValueError("Panjang mean/scale tidak sama dengan jumlah fitur")
+
+    @property
+    def has_scaler(self):
+        return self.mean is not None
+
+    @classmethod
+    def from_dict(cls, data):
+        version = data.get('format_version')
+        if version != METADATA_FORMAT_VERSION:
+            raise ValueError(f"Versi format metadata tidak didukung: {version}")
+
+        scaler = data.get('scaler') or {}
+        extra = {k: v for k, v in data.items() if k not in ('format_version', 'features', 'input_dtype', 'scaler')}
+        return cls(
+            features=data['features'],
+            input_dtype=data.get('input_dtype', 'float32'),
+            mean=scaler.get('mean'),
+            scale=scaler.get('scale'),
+            extra=extra
+        )
+
+    def to_dict(self):
+        data = {
+            'format_version': METADATA_FORMAT_VERSION,
+            'features': self.features,
+            'input_dtype': self.input_dtype.name,
+        }
+        if self.has_scaler:
+            mean, scale = self.scaler_params
+            data['scaler'] = {'mean': mean.tolist(), 'scale': scale.tolist()}
+        data.update(self.extra)
+        return data
+
+    def transform(self, X):
+        """Affine (X - mean) * (1 / scale) dalam dtype input model."""
+        X = np.asarray(X, dtype=self.input_dtype)
+        if not self.has_scaler:
+            return X
+        return (X - self.mean) * self.inv_scale
+
+    def check_features(self, feature_cols):
+        """Peringatan jika urutan fitur model berbeda dari fitur engine."""
+        if [f.lower() for f in self.features] != [f.lower() for f in feature_cols]:
+            logger.warning(f"Urutan fitur metadata {self.features} berbeda dengan engine {list(feature_cols)}")
+            return False
+        return True
+
+
+def load_model_metadata(onnx_path):
+    """Baca sidecar `.meta.json` untuk model; None jika tidak ada."""
+    path = metadata_path(onnx_path)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return ModelMetadata.from_dict(json.load(f))
+
+
+class ScaledSession:
+    """Sesi ONNX yang menerapkan scaler metadata ke input sebelum inference."""
+
+    def __init__(self, session, metadata):
+        self.session = session
+        self.metadata = metadata
+
+    def get_inputs(self):
+        return self.session.get_inputs()
+
+    def get_outputs(self):
+        return self.session.get_outputs()
+
+    def run(self, output_names, input_feed, run_options=None):
+        scaled_feed = {name: self.metadata.transform(value) for name, value in input_feed.items()}
+        return self.session.run(output_names, scaled_feed, run_options)
@@ -0,0 +1,211 @@
+# models/model_registry.py
+"""
+Registry model ONNX per folder models (satu instance per proses).
+
+- Metadata (.onnx yang tersedia) dipindai sekali lalu dilayani dari memori;
+  pemindaian ulang (scandir + stat) paling sering setiap poll_interval detik.
+- Perubahan file dideteksi lewat (mtime, size); hash isi dihitung ulang hanya
+  jika salah satu berubah. Sesi lama diganti secara atomik tanpa restart.
+- Sesi yang hidup dibatasi LRU max_sessions agar RSS tetap terkendali.
+- Sidecar `<Model>.meta.json` (scaler) ikut dipantau dan di-parse sekali per
+  perubahan; sesi model ber-scaler dibungkus ScaledSession.
+- Sesi dibuat sesuai backend model (onnxruntime atau numpy, lihat session_factory).
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from config import Config
+from .session_factory import create_model_session, file_digest
+from .model_metadata import ScaledSession, load_model_metadata, metadata_path
+
+logger = logging.getLogger(__name__)
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def model_filename(model_name):
+    """Nama file .onnx untuk nama model (spasi/slash diganti underscore)."""
+    safe_name = model_name.replace(' ', '_').replace('/', '_')
+    return f"{safe_name}.onnx"
+
+
+def get_registry(models_path):
+    """Registry bersama untuk folder models (dibagi semua ForecastingEngine di proses ini)."""
+    key = os.path.abspath(models_path)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = ModelRegistry(models_path)
+            _registries[key] = registry
+        return registry
+
+
+class ModelRegistry:
+    """Metadata model in-memory + LRU sesi ONNX dengan hot reload berbasis mtime/hash."""
+
+    def __init__(self, models_path, max_sessions=None, poll_interval=None):
+        self.models_path = models_path
+        self.max_sessions = max_sessions or Config.MODEL_REGISTRY_MAX_SESSIONS
+        self.poll_interval = Config.MODEL_REGISTRY_POLL_INTERVAL if poll_interval is None else poll_interval
+
+        self._entries = {}  # {filename: info file + ModelMetadata}
+        self._sessions = OrderedDict()  # {filename: (digest, session)}
+        self._lock = threading.RLock()
+        self._last_scan = None
+        self.version = 0  # naik setiap ada model ditambah/diganti/dihapus
+
+    def _load_metadata(self, onnx_path):
+        """Parse sidecar .meta.json sekali per perubahan file (tanpa pickle)."""
+        from services.data_handler import FEATURE_COLUMNS
+        try:
+            metadata = load_model_metadata(onnx_path)
+        except Exception as e:
+            logger.warning(f"Model registry: metadata {metadata_path(onnx_path)} tidak valid: {e}")
+            return None
+        if metadata is not None:
+            metadata.check_features(FEATURE_COLUMNS)
+        return metadata
+
+    def _scan(self):
+        """Pindai folder models; hitung hash hanya untuk file baru/berubah."""
+        if not os.path.isdir(self.models_path):
+            return {}
+
+        entries = {}
+        with os.scandir(self.models_path) as it:
+            for item in it:
+                if not item.name.endswith('.onnx') or not item.is_file():
+                    continue
+
+                stat = item.stat()
+                meta_file = metadata_path(item.path)
+                try:
+                    meta_stat = os.stat(meta_file)
+                    meta_signature = (meta_stat.st_mtime_ns, meta_stat.st_size)
+                except OSError:
+                    meta_signature = None
+
+                signature = (stat.st_mtime_ns, stat.st_size, meta_signature)
+                previous = self._entries.get(item.name)
+                if previous and previous['signature'] == signature:
+                    entries[item.name] = previous
+                    continue
+
+                digest = file_digest(item.path)
+                if meta_signature is not None:
+                    digest = f"{digest}:{file_digest(meta_file)[:16]}"
+
+                entries[item.name] = {
+                    'name': os.path.splitext(item.name)[0].replace('_', ' '),
+                    'filename': item.name,
+                    'path': item.path,
+                    'signature': signature,
+                    'size_mb': stat.st_size / (1024 * 1024),
+                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                    'digest': digest,
+                    'metadata': self._load_metadata(item.path)
+                }
+        return entries
+
+    def refresh(self, force=False):
+        """Sinkronkan metadata dengan disk (dibatasi poll_interval kecuali force)."""
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last_scan is not None and now - self._last_scan < self.poll_interval:
+                return False
+
+            entries = self._scan()
+            changed = entries.keys() != self._entries.keys() or any(
+                entries[name]['digest'] != self._entries[name]['digest'] for name in entries
+            )
+
+            # Buang sesi yang file-nya hilang atau isinya berubah
+            for filename, (digest, _) in list(self._sessions.items()):
+                entry = entries.get(filename)
+                if entry is None or entry['digest'] != digest:
+                    del self._sessions[filename]
+                    logger.info(f"Model registry: sesi {filename} dilepas (file berubah/dihapus)")
+
+            self._entries = entries
+            self._last_scan = now
+            if changed:
+                self.version += 1
+            return changed
+
+    def list_models(self):
+        """Metadata model yang tersedia (format sama dengan get_available_models)."""
+        self.refresh()
+        with self._lock:
+            return [
+                {
+                    'name': entry['name'],
+                    'filename': entry['filename'],
+                    'size_mb': entry['size_mb'],
+                    'modified': entry['modified']
+                }
+                for entry in self._entries.values()
+            ]
+
+    def _get_entry(self, model_name):
+        self.refresh()
+        filename = model_filename(model_name)
+        with self._lock:
+            entry = self._entries.get(filename)
+        if entry is None:
+            raise FileNotFoundError(
+                f"Model file ONNX tidak ditemukan: {os.path.join(self.models_path, filename)}"
+            )
+        return entry
+
+    def fingerprint(self, model_name):
+        """Hash isi file .onnx model (dari metadata in-memory)."""
+        return self._get_entry(model_name)['digest']
+
+    def get_session(self, model_name):
+        """Sesi ONNX untuk model; dibuat saat pertama dipakai lalu disimpan di LRU."""
+        entry = self._get_entry(model_name)
+        filename = entry['filename']
+
+        with self._lock:
+            cached = self._sessions.get(filename)
+            if cached and cached[0] == entry['digest']:
+                self._sessions.move_to_end(filename)
+                return cached[1]
+
+        # Buat sesi di luar lock agar model lain tetap bisa dilayani
+        session = create_model_session(entry['path'], entry['name'])
+        if entry['metadata'] is not None and entry['metadata'].has_scaler:
+            session = ScaledSession(session, entry['metadata'])
+
+        with self._lock:
+            cached = self._sessions.get(filename)
+            if cached and cached[0] == entry['digest']:
+                session = cached[1]
+            else:
+                self._sessions[filename] = (entry['digest'], session)
+            self._sessions.move_to_end(filename)
+
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                logger.debug(f"Model registry: sesi {evicted} dikeluarkan dari LRU")
+
+        return session
+
+    def get_metadata(self, model_name):
+        """Metadata sidecar model (ModelMetadata) atau None."""
+        return self._get_entry(model_name)['metadata']
+
+    def loaded_sessions(self):
+        with self._lock:
+            return list(self._sessions.keys())
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._entries = {}
+            self._last_scan = None
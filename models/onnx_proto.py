@@ -0,0 +1,283 @@
+# models/onnx_proto.py
+"""
+Pembaca minimal file .onnx (protobuf wire format) tanpa paket onnx/onnxruntime.
+
+Hanya bagian yang dibutuhkan backend NumPy yang di-decode: node graph
+(op_type, domain, input, output, atribut; atribut graph seperti body Scan
+menjadi OnnxGraph), initializer (TensorProto -> ndarray), serta nama
+input/output graph. Nomor field mengikuti onnx.proto.
+"""
+import struct
+
+import numpy as np
+
+# AttributeProto.AttributeType
+_ATTR_FLOAT, _ATTR_INT, _ATTR_STRING, _ATTR_TENSOR, _ATTR_GRAPH = 1, 2, 3, 4, 5
+_ATTR_FLOATS, _ATTR_INTS, _ATTR_STRINGS = 6, 7, 8
+
+# TensorProto.DataType -> dtype NumPy
+_TENSOR_DTYPES = {
+    1: np.float32, 2: np.uint8, 3: np.int8, 5: np.int16, 6: np.int32,
+    7: np.int64, 9: np.bool_, 10: np.float16, 11: np.float64,
+}
+
+
+class OnnxGraph:
+    """Isi graph hasil decode: nodes, initializers, input/output names."""
+
+    def __init__(self, nodes, initializers, inputs, outputs):
+        self.nodes = nodes
+        self.initializers = initializers
+        self.inputs = inputs
+        self.outputs = outputs
+
+    @property
+    def op_types(self):
+        return [node['op_type'] for node in self.nodes]
+
+
+def _read_varint(buf, pos):
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _to_int64(value):
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _read_field(buf, pos):
+    key, pos = _read_varint(buf, pos)
+    field, wire = key >> 3, key & 0x7
+    if wire == 0:
+        value, pos = _read_varint(buf, pos)
+    elif wire == 1:
+        value, pos = buf[pos:pos + 8], pos + 8
+    elif wire == 2:
+        length, pos = _read_varint(buf, pos)
+        value, pos = buf[pos:pos + length], pos + length
+    elif wire == 5:
+        value, pos = buf[pos:pos + 4], pos + 4
+    else:
+        raise ValueError(f"Wire type protobuf tidak didukung: {wire}")
+    return field, wire, value, pos
+
+
+def _fields(buf):
+    """Iterasi (field_number, wire_type, value) dari satu pesan protobuf."""
+    pos, end = 0, len(buf)
+    while pos < end:
+        field, wire, value, pos = _read_field(buf, pos)
+        yield field, wire, value
+
+
+def _decode_varints(data):
+    """Decode deretan varint (uint8 array) secara tervektorisasi -> (uint64 values, end offsets)."""
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    group = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shift = (np.arange(ends[-1] + 1) - starts[group]).astype(np.uint64) * np.uint64(7)
+    parts = (data[:ends[-1] + 1] & 0x7F).astype(np.uint64) << shift
+    return np.add.reduceat(parts, starts), ends
+
+
+def _packed_varints(buf):
+    """Decode varint packed secara tervektorisasi (int64, two's complement)."""
+    data = np.frombuffer(bytes(buf), dtype=np.uint8)
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    return _decode_varints(data)[0].view(np.int64)
+
+
+def _varint_run(data, pos, key):
+    """
+    Field varint berulang tidak-packed yang berurutan (key, value, key, value, ...)
+    mulai dari pos: decode sekaligus; kembalikan (int64 values, posisi setelah run).
+    """
+    values, ends = _decode_varints(data[pos:])
+    keys = values[0::2]
+    stop = np.flatnonzero(keys != key)
+    count = int(stop[0]) if len(stop) else len(values) // 2
+    return values[1:2 * count:2].view(np.int64), pos + int(ends[2 * count - 1]) + 1
+
+
+def _fixed32_run(data, pos, key):
+    """Field fixed32 berulang tidak-packed yang berurutan -> (float32 values, posisi setelah run)."""
+    n_max = (len(data) - pos) // 5
+    records = data[pos:pos + 5 * n_max].reshape(n_max, 5)
+    stop = np.flatnonzero(records[:, 0] != key)
+    count = int(stop[0]) if len(stop) else n_max
+    values = np.ascontiguousarray(records[:count, 1:]).view('<f4').reshape(-1)
+    return values, pos + 5 * count
+
+
+def _repeated_ints(chunks, wire, value):
+    # Packed (wire 2) atau satu varint per field (wire 0)
+    chunks.append(_packed_varints(value) if wire == 2 else np.array([_to_int64(value)], dtype=np.int64))
+
+
+def _concat(chunks, dtype):
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+
+def _repeated_floats(chunks, wire, value, fmt='<f4'):
+    # Packed (wire 2) atau satu nilai per field (wire 5/1)
+    chunks.append(np.frombuffer(bytes(value), dtype=fmt))
+
+
+def _parse_tensor(buf):
+    dims, data_type, name, raw = [], 1, '', None
+    floats, doubles, ints = [], [], []
+    for field, wire, value in _fields(buf):
+        if field == 1:
+            _repeated_ints(dims, wire, value)
+        elif field == 2:
+            data_type = value
+        elif field == 4:
+            _repeated_floats(floats, wire, value)
+        elif field in (5, 7):
+            _repeated_ints(ints, wire, value)
+        elif field == 8:
+            name = bytes(value).decode('utf-8')
+        elif field == 9:
+            raw = bytes(value)
+        elif field == 10:
+            _repeated_floats(doubles, wire, value, '<f8')
+
+    dtype = _TENSOR_DTYPES.get(data_type)
+    if dtype is None:
+        raise ValueError(f"Tipe tensor ONNX tidak didukung: {data_type} ({name})")
+
+    if raw is not None:
+        array = np.frombuffer(raw, dtype=np.dtype(dtype).newbyteorder('<'))
+    elif floats:
+        array = np.concatenate(floats)
+    elif doubles:
+        array = np.concatenate(doubles)
+    else:
+        array = _concat(ints, np.int64)
+    return name, array.astype(dtype, copy=False).reshape(_concat(dims, np.int64).tolist())
+
+
+_INTS_KEY = (8 << 3) | 0    # AttributeProto.ints, varint tidak-packed
+_FLOATS_KEY = (7 << 3) | 5  # AttributeProto.floats, fixed32 tidak-packed
+
+
+def _parse_attribute(buf):
+    name, attr_type = '', None
+    scalars = {}
+    floats, ints, strings = [], [], []
+    data = np.frombuffer(buf, dtype=np.uint8)
+    pos, end = 0, len(buf)
+    while pos < end:
+        # Ribuan elemen ints/floats tidak-packed (keluaran konverter lama) di-decode sekaligus
+        if buf[pos] == _INTS_KEY:
+            values, pos = _varint_run(data, pos, _INTS_KEY)
+            ints.append(values)
+            continue
+        if buf[pos] == _FLOATS_KEY:
+            values, pos = _fixed32_run(data, pos, _FLOATS_KEY)
+            floats.append(values)
+            continue
+
+        field, wire, value, pos = _read_field(buf, pos)
+        if field == 1:
+            name = bytes(value).decode('utf-8')
+        elif field == 20:
+            attr_type = value
+        elif field == 2:
+            scalars['f'] = struct.unpack('<f', bytes(value))[0]
+        elif field == 3:
+            scalars['i'] = _to_int64(value)
+        elif field == 4:
+            scalars['s'] = bytes(value)
+        elif field == 5:
+            scalars['t'] = _parse_tensor(value)[1]
+        elif field == 6:
+            scalars['g'] = _parse_graph(value)
+        elif field == 7:
+            _repeated_floats(floats, wire, value)
+        elif field == 8:
+            _repeated_ints(ints, wire, value)
+        elif field == 9:
+            strings.append(bytes(value))
+
+    if attr_type == _ATTR_FLOAT:
+        return name, scalars.get('f', 0.0)
+    if attr_type == _ATTR_INT:
+        return name, scalars.get('i', 0)
+    if attr_type == _ATTR_STRING:
+        return name, scalars.get('s', b'')
+    if attr_type == _ATTR_TENSOR:
+        return name, scalars.get('t')
+    if attr_type == _ATTR_GRAPH:
+        return name, scalars.get('g')
+    if attr_type == _ATTR_FLOATS:
+        return name, _concat(floats, np.float32)
+    if attr_type == _ATTR_INTS:
+        return name, _concat(ints, np.int64)
+    if attr_type == _ATTR_STRINGS:
+        return name, strings
+    # Tipe lain (daftar graph, sparse tensor) tidak dipakai backend NumPy
+    return name, None
+
+
+def _parse_node(buf):
+    node = {'op_type': '', 'domain': '', 'inputs': [], 'outputs': [], 'attributes': {}}
+    for field, _, value in _fields(buf):
+        if field == 1:
+            node['inputs'].append(bytes(value).decode('utf-8'))
+        elif field == 2:
+            node['outputs'].append(bytes(value).decode('utf-8'))
+        elif field == 4:
+            node['op_type'] = bytes(value).decode('utf-8')
+        elif field == 7:
+            node['domain'] = bytes(value).decode('utf-8')
+        elif field == 5:
+            name, attr = _parse_attribute(value)
+            node['attributes'][name] = attr
+    return node
+
+
+def _value_info_name(buf):
+    for field, _, value in _fields(buf):
+        if field == 1:
+            return bytes(value).decode('utf-8')
+    return ''
+
+
+def _parse_graph(buf):
+    nodes, initializers, inputs, outputs = [], {}, [], []
+    for field, _, value in _fields(buf):
+        if field == 1:
+            nodes.append(_parse_node(value))
+        elif field == 5:
+            name, array = _parse_tensor(value)
+            initializers[name] = array
+        elif field == 11:
+            inputs.append(_value_info_name(value))
+        elif field == 12:
+            outputs.append(_value_info_name(value))
+
+    # Input graph yang juga initializer bukan input runtime
+    inputs = [name for name in inputs if name not in initializers]
+    return OnnxGraph(nodes, initializers, inputs, outputs)
+
+
+def load_onnx_graph(path):
+    """Decode graph utama file .onnx menjadi OnnxGraph."""
+    with open(path, 'rb') as f:
+        model = memoryview(f.read())
+
+    graph_buf = None
+    for field, _, value in _fields(model):
+        if field == 7:  # ModelProto.graph
+            graph_buf = value
+    if graph_buf is None:
+        raise ValueError(f"File ONNX tanpa graph: {path}")
+    return _parse_graph(graph_buf)
@@ -0,0 +1,189 @@
+# models/performance_retention.py
+"""
+Retensi history ModelPerformance.
+
+Menyimpan MAX_PERFORMANCE_HISTORY_PER_MODEL baris mentah terbaru per model;
+baris training yang lebih lama dilipat ke ModelPerformanceRollup (harian &
+mingguan: min/mean/max MAE, RMSE, R2) lalu dihapus. Baris backtest dihitung
+terpisah (N terbaru per model juga) dan yang lebih lama dihapus tanpa dilipat,
+bersama metrik per horizon (ModelBacktestHorizon)-nya. Aktif jika
+PERFORMANCE_CLEANUP_ENABLED.
+"""
+import logging
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from config import Config
+from database import db, ModelPerformance, ModelPerformanceRollup, ModelBacktestHorizon
+from .best_model import invalidate_best_model
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_PERIODS = ('day', 'week')
+_DELETE_CHUNK = 500  # batas jumlah parameter IN (...) yang aman untuk SQLite
+
+_METRICS = (('mae', 'mae'), ('rmse', 'rmse'), ('r2', 'r2_score'))
+
+
+def ensure_rollup_table():
+    """Buat tabel rollup jika belum ada (database lama tanpa migrasi)."""
+    ModelPerformanceRollup.__table__.create(db.engine, checkfirst=True)
+
+
+def ensure_backtest_table():
+    """Buat tabel metrik backtest per horizon jika belum ada (database lama tanpa migrasi)."""
+    ModelBacktestHorizon.__table__.create(db.engine, checkfirst=True)
+
+
+def _delete_orphan_horizons():
+    """Hapus metrik per horizon yang baris ringkasan ModelPerformance-nya sudah dilipat."""
+    H = ModelBacktestHorizon
+    summary_exists = db.session.query(ModelPerformance.id).filter(
+        ModelPerformance.batch_id == H.batch_id,
+        ModelPerformance.model_name == H.model_name
+    ).exists()
+    return H.query.filter(~summary_exists).delete(synchronize_session=False)
+
+
+def _period_start(dates, period):
+    if period == 'week':
+        return [d - timedelta(days=d.weekday()) for d in dates]
+    return list(dates)
+
+
+def _aggregate(df, period):
+    """Agregat per (model, period_start) dari baris mentah yang akan dilipat."""
+    frame = df.assign(period_start=_period_start(df['day'], period))
+    grouped = frame.groupby(['model_name', 'period_start'])
+
+    agg = grouped['mae'].agg(n_runs='count', mae_min='min', mae_max='max', mae_sum='sum')
+    for name, column in _METRICS[1:]:
+        stats = grouped[column].agg(['min', 'max', 'sum', 'count'])
+        stats.columns = [f'{name}_min', f'{name}_max', f'{name}_sum', f'{name}_count']
+        agg = agg.join(stats)
+    return agg.reset_index()
+
+
+def _nan_to_none(value):
+    return None if value is None or (isinstance(value, float) and np.isnan(value)) else float(value)
+
+
+def _combine(fn, *values):
+    values = [v for v in values if v is not None]
+    return fn(values) if values else None
+
+
+def _merge_rollup(rollup, stats):
+    """Gabungkan agregat baru ke baris rollup (min/max/sum/count)."""
+    rollup.n_runs = (rollup.n_runs or 0) + int(stats['n_runs'])
+
+    for name, _ in _METRICS:
+        for suffix, fn in (('min', min), ('max', max), ('sum', sum)):
+            attr = f'{name}_{suffix}'
+            setattr(rollup, attr, _combine(fn, getattr(rollup, attr), _nan_to_none(stats[attr])))
+
+        if name != 'mae':
+            count_attr = f'{name}_count'
+            setattr(rollup, count_attr, (getattr(rollup, count_attr) or 0) + int(stats[count_attr]))
+
+
+def compact_performance_history(keep_latest=None, periods=ROLLUP_PERIODS):
+    """
+    Lipat baris ModelPerformance di luar N terbaru per model ke rollup.
+
+    Returns: dict ringkasan (success, folded_rows, rollups_written, ...)
+    """
+    if not Config.PERFORMANCE_CLEANUP_ENABLED:
+        return {'success': True, 'skipped': True, 'reason': 'PERFORMANCE_CLEANUP_ENABLED=False'}
+
+    keep = Config.MAX_PERFORMANCE_HISTORY_PER_MODEL if keep_latest is None else keep_latest
+    MP = ModelPerformance
+
+    try:
+        ensure_rollup_table()
+        ensure_backtest_table()
+
+        # Baris backtest diberi peringkat terpisah agar tidak mendorong baris
+        # training keluar dari N terbaru
+        is_backtest = MP.is_backtest()
+        ranked = db.session.query(
+            MP.id, MP.model_name, MP.trained_at, MP.mae, MP.rmse, MP.r2_score,
+            is_backtest.label('is_backtest'),
+            func.row_number().over(
+                partition_by=(MP.model_name, is_backtest),
+                order_by=(MP.trained_at.desc(), MP.id.desc())
+            ).label('rn')
+        ).filter(MP.trained_at.isnot(None)).subquery()
+
+        rows = db.session.query(
+            ranked.c.id, ranked.c.model_name, ranked.c.trained_at,
+            ranked.c.mae, ranked.c.rmse, ranked.c.r2_score, ranked.c.is_backtest
+        ).filter(ranked.c.rn > keep).all()
+
+        if not rows:
+            return {'success': True, 'folded_rows': 0, 'rollups_written': 0, 'keep_latest': keep}
+
+        df = pd.DataFrame(rows, columns=['id', 'model_name', 'trained_at', 'mae', 'rmse', 'r2_score', 'is_backtest'])
+        # Baris backtest lama dihapus tanpa dilipat: rollup hanya berisi hasil training
+        backtest = df['is_backtest'] == 1
+        df, backtest_ids = df[~backtest].copy(), df.loc[backtest, 'id'].tolist()
+        df['day'] = pd.to_datetime(df['trained_at']).dt.date
+        model_names = df['model_name'].unique().tolist()
+
+        rollups_written = 0
+        for period in (periods if not df.empty else ()):
+            agg = _aggregate(df, period)
+
+            existing = {
+                (r.model_name, r.period_start): r
+                for r in ModelPerformanceRollup.query.filter(
+                    ModelPerformanceRollup.period == period,
+                    ModelPerformanceRollup.model_name.in_(model_names),
+                    ModelPerformanceRollup.period_start.between(
+                        agg['period_start'].min(), agg['period_start'].max()
+                    )
+                ).all()
+            }
+
+            for stats in agg.to_dict('records'):
+                key = (stats['model_name'], stats['period_start'])
+                rollup = existing.get(key)
+                if rollup is None:
+                    rollup = ModelPerformanceRollup(
+                        model_name=stats['model_name'], period=period,
+                        period_start=stats['period_start'], n_runs=0
+                    )
+                    db.session.add(rollup)
+                _merge_rollup(rollup, stats)
+                rollups_written += 1
+
+        ids = df['id'].tolist() + backtest_ids
+        for i in range(0, len(ids), _DELETE_CHUNK):
+            MP.query.filter(MP.id.in_(ids[i:i + _DELETE_CHUNK])).delete(synchronize_session=False)
+        horizons_deleted = _delete_orphan_horizons()
+
+        db.session.commit()
+        invalidate_best_model()
+
+        logger.info(
+            f"Performance compaction: {len(df)} baris dilipat ke {rollups_written} rollup, "
+            f"{len(backtest_ids)} baris backtest dihapus (keep={keep})"
+        )
+        return {
+            'success': True,
+            'folded_rows': len(df),
+            'rollups_written': rollups_written,
+            'backtest_rows_deleted': len(backtest_ids),
+            'horizon_rows_deleted': horizons_deleted,
+            'keep_latest': keep,
+            'models': model_names
+        }
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Performance compaction gagal: {e}", exc_info=True)
+        return {'success': False, 'error': str(e)}
+
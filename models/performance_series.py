@@ -0,0 +1,230 @@
+# models/performance_series.py
+"""
+Query kolumnar untuk chart history performa model.
+
+Satu lapisan bersama untuk chart training history (dashboard), analisis
+VisualizationService, dan admin /api/models/performance-history:
+
+- Hanya kolom yang dipakai chart yang diambil (model_name, trained_at, mae,
+  rmse, r2_score) lewat Core select, langsung menjadi array NumPy per model.
+- bucket='day'|'week'|'month' diagregasi di database (GROUP BY) sehingga
+  jumlah baris yang ditransfer dibatasi jumlah bucket, bukan jumlah training.
+- Rollup harian dari compact_performance_history ikut digabung.
+- max_points membatasi titik per model: mode raw mengambil N titik terbaru
+  (window function), mode bucket menggabungkan bucket berurutan.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, literal_column, select
+
+from config import Config
+from database import db, ModelPerformance, ModelPerformanceRollup
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ('day', 'week', 'month')
+SERIES_FIELDS = ('mae', 'rmse', 'r2')
+
+# Kolom agregat yang bisa digabung (sum/count) antar sumber & bucket
+_SUM_COLUMNS = ['mae_sum', 'mae_count', 'rmse_sum', 'rmse_count', 'r2_sum', 'r2_count']
+
+
+def _bucket_expression(column, bucket, dialect):
+    """Ekspresi SQL awal bucket; None jika dialect tidak didukung (fallback pandas)."""
+    if dialect == 'postgresql':
+        # Literal (bukan bind param) agar SELECT dan GROUP BY identik
+        return func.date_trunc(literal_column(f"'{bucket}'"), column)
+    if dialect == 'sqlite':
+        if bucket == 'day':
+            return func.date(column)
+        if bucket == 'week':
+            return func.date(column, 'weekday 0', '-6 days')  # Senin
+        return func.strftime('%Y-%m-01', column)
+    return None
+
+
+def _bucket_start(timestamps, bucket):
+    """Awal bucket untuk Series datetime (pandas, sama dengan ekspresi SQL)."""
+    days = timestamps.dt.normalize()
+    if bucket == 'week':
+        return days - pd.to_timedelta(days.dt.weekday, unit='D')
+    if bucket == 'month':
+        return days - pd.to_timedelta(days.dt.day - 1, unit='D')
+    return days
+
+
+def _raw_frame(since, model_names, max_points):
+    """N baris mentah terbaru per model (hanya kolom chart)."""
+    MP = ModelPerformance
+    rn = func.row_number().over(
+        partition_by=MP.model_name, order_by=(MP.trained_at.desc(), MP.id.desc())
+    ).label('rn')
+    ranked = select(MP.model_name, MP.trained_at, MP.mae, MP.rmse, MP.r2_score, rn)
+    ranked = _filter(ranked, MP.trained_at, MP.model_name, since, model_names).subquery()
+
+    stmt = select(
+        ranked.c.model_name, ranked.c.trained_at, ranked.c.mae, ranked.c.rmse, ranked.c.r2_score
+    ).where(ranked.c.rn <= max_points)
+
+    rows = db.session.execute(stmt).all()
+    df = pd.DataFrame(rows, columns=['model_name', 'timestamp', 'mae', 'rmse', 'r2'])
+    return df.assign(
+        **{f'{f}_sum': df[f] for f in SERIES_FIELDS},
+        **{f'{f}_count': df[f].notna().astype(int) for f in SERIES_FIELDS}
+    )
+
+
+def _bucketed_frame(since, model_names, bucket):
+    """Agregat sum/count per (model, bucket) dihitung di database."""
+    MP = ModelPerformance
+    expr = _bucket_expression(MP.trained_at, bucket, db.engine.dialect.name)
+    time_column = (expr if expr is not None else MP.trained_at).label('timestamp')
+
+    columns = [MP.model_name, time_column]
+    for field, column in zip(SERIES_FIELDS, (MP.mae, MP.rmse, MP.r2_score)):
+        columns += [func.sum(column).label(f'{field}_sum'), func.count(column).label(f'{field}_count')]
+
+    stmt = _filter(select(*columns), MP.trained_at, MP.model_name, since, model_names)
+    if expr is not None:
+        stmt = stmt.group_by(MP.model_name, time_column)
+    else:
+        stmt = stmt.group_by(MP.model_name, MP.trained_at)
+
+    df = pd.DataFrame(db.session.execute(stmt).all(), columns=['model_name', 'timestamp'] + _SUM_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if expr is None:
+        df['timestamp'] = _bucket_start(df['timestamp'], bucket)
+    return df
+
+
+def _rollup_frame(since, model_names):
+    """Rollup harian (hasil kompaksi) dalam bentuk sum/count."""
+    R = ModelPerformanceRollup
+    stmt = select(
+        R.model_name, R.period_start, R.mae_sum, R.n_runs,
+        R.rmse_sum, R.rmse_count, R.r2_sum, R.r2_count
+    ).where(R.period == 'day')
+    if since is not None:
+        stmt = stmt.where(R.period_start >= since.date())
+    if model_names:
+        stmt = stmt.where(R.model_name.in_(model_names))
+
+    try:
+        rows = db.session.execute(stmt).all()
+    except Exception as e:
+        db.session.rollback()
+        logger.debug(f"Rollup history tidak tersedia: {e}")
+        rows = []
+
+    df = pd.DataFrame(rows, columns=['model_name', 'timestamp'] + _SUM_COLUMNS)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+
+def _filter(stmt, time_column, name_column, since, model_names):
+    # Baris backtest hanya dilayani lewat /api/models/backtest
+    stmt = stmt.where(time_column.isnot(None), ModelPerformance.excluding_backtest())
+    if since is not None:
+        stmt = stmt.where(time_column >= since)
+    if model_names:
+        stmt = stmt.where(name_column.in_(model_names))
+    return stmt
+
+
+def _combine(df, group_keys):
+    agg = df.groupby(group_keys, sort=False)[_SUM_COLUMNS].sum(min_count=1)
+    agg[['mae_count', 'rmse_count', 'r2_count']] = agg[['mae_count', 'rmse_count', 'r2_count']].fillna(0)
+    return agg.reset_index()
+
+
+def _to_arrays(df):
+    """Frame satu model (sudah urut waktu) -> dict array NumPy."""
+    series = {'timestamps': df['timestamp'].to_numpy(dtype='datetime64[s]')}
+    for field in SERIES_FIELDS:
+        counts = df[f'{field}_count'].to_numpy(dtype=np.float64)
+        sums = df[f'{field}_sum'].to_numpy(dtype=np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            series[field] = np.where(counts > 0, sums / counts, np.nan)
+    series['n_runs'] = df['mae_count'].to_numpy(dtype=np.int64)
+    return series
+
+
+def _downsample(df, max_points):
+    """Gabungkan bucket berurutan (sum/count) hingga <= max_points titik."""
+    if len(df) <= max_points:
+        return df
+    stride = -(-len(df) // max_points)
+    groups = np.arange(len(df)) // stride
+    merged = df.groupby(groups)[_SUM_COLUMNS].sum(min_count=1)
+    merged.insert(0, 'timestamp', df['timestamp'].to_numpy()[::stride])
+    return merged
+
+
+def load_performance_series(bucket=None, since=None, model_names=None, max_points=None, include_rollups=True):
+    """
+    Series history performa per model dalam bentuk kolumnar.
+
+    Args:
+        bucket: None (titik per training) atau 'day' | 'week' | 'month'
+        since: datetime batas bawah trained_at (opsional)
+        model_names: filter nama model (opsional)
+        max_points: batas titik per model (default Config.PERFORMANCE_CHART_MAX_POINTS)
+
+    Returns: {model_name: {'timestamps': datetime64[s], 'mae', 'rmse', 'r2': float64
+              (NaN jika kosong), 'n_runs': int64}}, urut waktu naik.
+    """
+    if bucket is not None and bucket not in BUCKETS:
+        raise ValueError(f"bucket harus salah satu dari {BUCKETS}, bukan {bucket!r}")
+    max_points = max(1, int(max_points or Config.PERFORMANCE_CHART_MAX_POINTS))
+
+    if bucket is None:
+        frames = [_raw_frame(since, model_names, max_points)]
+    else:
+        frames = [_bucketed_frame(since, model_names, bucket)]
+
+    if include_rollups:
+        rollups = _rollup_frame(since, model_names)
+        if not rollups.empty:
+            if bucket is not None:
+                rollups['timestamp'] = _bucket_start(rollups['timestamp'], bucket)
+            frames.append(rollups)
+
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return {}
+
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    if bucket is not None:
+        df = _combine(df, ['model_name', 'timestamp'])
+    df = df.sort_values(['model_name', 'timestamp'], kind='stable')
+
+    series = {}
+    for model_name, group in df.groupby('model_name', sort=False):
+        if bucket is None:
+            group = group.tail(max_points)
+        else:
+            group = _downsample(group, max_points)
+        series[model_name] = _to_arrays(group)
+    return series
+
+
+def series_to_lists(series, date_format=None):
+    """Konversi array series ke list siap-JSON (NaN -> None, tanggal ISO/strftime)."""
+    payload = {}
+    for model_name, arrays in series.items():
+        timestamps = pd.DatetimeIndex(arrays['timestamps'])
+        entry = {
+            'timestamps': (
+                timestamps.strftime(date_format).tolist() if date_format
+                else [ts.isoformat() for ts in timestamps]
+            ),
+            'n_runs': arrays['n_runs'].tolist()
+        }
+        for field in SERIES_FIELDS:
+            values = arrays[field]
+            entry[field] = np.where(np.isnan(values), None, values).tolist()
+        payload[model_name] = entry
+    return payload
@@ -0,0 +1,293 @@
+# models/session_factory.py
+"""
+Pembuatan sesi ONNX Runtime dengan SessionOptions eksplisit dan cache
+model yang sudah dioptimasi (graph-optimized) di disk.
+
+Load pertama menulis model teroptimasi di samping file .onnx
+(`<model>.onnx.<hash>-ort<versi>.opt`). Load berikutnya (termasuk cold start
+serverless) memakai file tersebut dengan optimasi graph dinonaktifkan,
+sehingga ORT tidak perlu mengulang proses optimasi. Hash file sumber juga
+di-memo di disk (`<file>.sha256`, dikunci path/mtime/size) agar cold start
+tidak meng-hash ulang setiap model.
+
+Backend per model (Config.INFERENCE_BACKEND / INFERENCE_BACKEND_OVERRIDES):
+'onnxruntime' atau 'numpy' (evaluator NumPy, lihat tree_ensemble.py dan knn.py).
+onnxruntime baru di-import saat sesi ORT pertama dibuat, sehingga proses yang
+hanya memakai backend numpy tidak memuatnya sama sekali.
+"""
+import os
+import glob
+import hashlib
+import json
+import logging
+import tempfile
+import threading
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('onnxruntime', 'numpy')
+
+_OPTIMIZATION_LEVELS = {
+    'disable': 'ORT_DISABLE_ALL',
+    'basic': 'ORT_ENABLE_BASIC',
+    'extended': 'ORT_ENABLE_EXTENDED',
+    'all': 'ORT_ENABLE_ALL',
+}
+
+_FALLBACK_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'prisma_onnx_cache')
+
+# {path: (mtime_ns, size, sha256)}
+_digest_cache = {}
+_digest_lock = threading.Lock()
+
+
+def _digest_memo_paths(path):
+    """Memo hash di samping file (seperti .opt), fallback ke direktori temp."""
+    filename = f"{os.path.basename(path)}.sha256"
+    return [
+        os.path.join(os.path.dirname(os.path.abspath(path)), filename),
+        os.path.join(_FALLBACK_CACHE_DIR, filename),
+    ]
+
+
+def _read_digest_memo(path, stat):
+    """Hash dari memo di disk jika (path, mtime_ns, size) masih sama, selain itu None."""
+    for memo_path in _digest_memo_paths(path):
+        try:
+            with open(memo_path, 'r', encoding='utf-8') as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (memo.get('path') == os.path.abspath(path)
+                and memo.get('mtime_ns') == stat.st_mtime_ns
+                and memo.get('size') == stat.st_size):
+            return memo.get('sha256')
+    return None
+
+
+def _write_digest_memo(path, stat, digest):
+    memo = json.dumps({
+        'path': os.path.abspath(path),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha256': digest,
+    })
+    for memo_path in _digest_memo_paths(path):
+        tmp_path = f"{memo_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(memo_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(memo)
+            os.replace(tmp_path, memo_path)
+            return
+        except OSError as e:
+            # Filesystem read-only (mis. Vercel) -> coba direktori temp
+            logger.debug(f"Cannot write digest memo to {memo_path}: {e}")
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+def file_digest(path):
+    """
+    SHA-256 isi file, di-memo berdasarkan (path, mtime_ns, size) di memori dan
+    di disk (`<file>.sha256`), sehingga cold start tidak meng-hash ulang file
+    yang tidak berubah.
+    """
+    stat = os.stat(path)
+    with _digest_lock:
+        cached = _digest_cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+    digest = _read_digest_memo(path, stat)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _write_digest_memo(path, stat, digest)
+
+    with _digest_lock:
+        _digest_cache[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def _ort():
+    """Import onnxruntime saat dibutuhkan (tidak dimuat oleh backend numpy)."""
+    import onnxruntime
+    return onnxruntime
+
+
+def build_session_options(optimization_level=None):
+    """SessionOptions eksplisit (thread, level optimasi, memory pattern) dari Config."""
+    rt = _ort()
+    opts = rt.SessionOptions()
+    opts.intra_op_num_threads = Config.ONNX_INTRA_OP_THREADS
+    opts.inter_op_num_threads = Config.ONNX_INTER_OP_THREADS
+    opts.enable_mem_pattern = Config.ONNX_ENABLE_MEM_PATTERN
+    opts.execution_mode = rt.ExecutionMode.ORT_SEQUENTIAL
+
+    level = optimization_level or Config.ONNX_GRAPH_OPTIMIZATION
+    opts.graph_optimization_level = getattr(
+        rt.GraphOptimizationLevel, _OPTIMIZATION_LEVELS.get(level, 'ORT_ENABLE_EXTENDED')
+    )
+    return opts
+
+
+def optimized_cache_path(onnx_path, digest=None, cache_dir=None):
+    """Path file model teroptimasi, dikunci oleh hash file sumber dan versi ORT."""
+    digest = digest or file_digest(onnx_path)
+    filename = f"{os.path.basename(onnx_path)}.{digest[:16]}-ort{_ort().__version__}.opt"
+    return os.path.join(cache_dir or os.path.dirname(os.path.abspath(onnx_path)), filename)
+
+
+def _find_cached_model(onnx_path, digest):
+    for cache_dir in (None, _FALLBACK_CACHE_DIR):
+        candidate = optimized_cache_path(onnx_path, digest, cache_dir)
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def _remove_stale_caches(onnx_path, keep_path):
+    pattern = os.path.join(os.path.dirname(keep_path), f"{glob.escape(os.path.basename(onnx_path))}.*.opt")
+    for stale in glob.glob(pattern):
+        if stale != keep_path:
+            try:
+                os.remove(stale)
+                logger.debug(f"Removed stale optimized model: {stale}")
+            except OSError:
+                pass
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _writable_tmp_path(onnx_path, digest):
+    """(target, tmp_path) di direktori cache pertama yang bisa ditulisi, atau None."""
+    for cache_dir in (None, _FALLBACK_CACHE_DIR):
+        target = optimized_cache_path(onnx_path, digest, cache_dir)
+        tmp_path = f"{target}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(tmp_path, 'wb'):
+                pass
+            return target, tmp_path
+        except OSError as e:
+            # Filesystem read-only (mis. Vercel) -> coba direktori temp
+            logger.debug(f"Cannot write optimized model to {target}: {e}")
+    return None
+
+
+def _write_optimized_model(onnx_path, digest):
+    """
+    Jalankan optimasi graph sekali dan simpan hasilnya (atomic rename).
+    None jika tidak ada direktori cache yang bisa ditulisi; error optimasi/load
+    dari ORT di-log lalu diteruskan (tidak dicoba ulang di direktori lain).
+    """
+    paths = _writable_tmp_path(onnx_path, digest)
+    if paths is None:
+        return None
+    target, tmp_path = paths
+
+    try:
+        opts = build_session_options()
+        opts.optimized_model_filepath = tmp_path
+        session = _ort().InferenceSession(onnx_path, sess_options=opts, providers=['CPUExecutionProvider'])
+    except Exception as e:
+        logger.error(f"Graph optimization failed for {onnx_path}: {e}")
+        _remove_quietly(tmp_path)
+        raise
+
+    try:
+        os.replace(tmp_path, target)
+        _remove_stale_caches(onnx_path, target)
+        logger.info(f"Optimized ONNX model cached: {target}")
+    except OSError as e:
+        logger.warning(f"Cannot store optimized model {target}: {e}")
+        _remove_quietly(tmp_path)
+    return session
+
+
+def create_inference_session(onnx_path):
+    """
+    Buat InferenceSession untuk file .onnx, memakai model teroptimasi dari cache
+    bila tersedia. Fallback ke load biasa jika cache tidak bisa ditulisi;
+    error dari optimasi graph diteruskan ke pemanggil.
+    """
+    rt = _ort()
+    if not Config.ONNX_OPTIMIZED_CACHE_ENABLED:
+        return rt.InferenceSession(onnx_path, sess_options=build_session_options(), providers=['CPUExecutionProvider'])
+
+    digest = file_digest(onnx_path)
+    cached_path = _find_cached_model(onnx_path, digest)
+
+    if cached_path:
+        try:
+            # Graph sudah dioptimasi: lewati optimasi ulang saat load
+            return rt.InferenceSession(
+                cached_path,
+                sess_options=build_session_options('disable'),
+                providers=['CPUExecutionProvider']
+            )
+        except Exception as e:
+            logger.warning(f"Optimized cache unusable ({cached_path}): {e}. Rebuilding.")
+            try:
+                os.remove(cached_path)
+            except OSError:
+                pass
+
+    session = _write_optimized_model(onnx_path, digest)
+    if session is not None:
+        return session
+
+    return rt.InferenceSession(onnx_path, sess_options=build_session_options(), providers=['CPUExecutionProvider'])
+
+
+def inference_backend(model_name):
+    """Backend untuk model: override per model, lalu default Config.INFERENCE_BACKEND."""
+    overrides = {}
+    for item in Config.INFERENCE_BACKEND_OVERRIDES.split(','):
+        if '=' in item:
+            name, backend = item.split('=', 1)
+            overrides[name.strip().replace('_', ' ')] = backend.strip().lower()
+
+    backend = overrides.get(model_name.replace('_', ' '), Config.INFERENCE_BACKEND.lower())
+    if backend not in BACKENDS:
+        logger.warning(f"Backend inference tidak dikenal '{backend}' untuk {model_name}, memakai onnxruntime")
+        return 'onnxruntime'
+    return backend
+
+
+def load_numpy_session(onnx_path):
+    """Sesi NumPy untuk graph yang didukung; ValueError jika graph tidak didukung."""
+    from .onnx_proto import load_onnx_graph
+    from .tree_ensemble import is_tree_ensemble_graph, load_tree_ensemble_session
+    from .knn import is_knn_graph, load_knn_session
+
+    graph = load_onnx_graph(onnx_path)
+    if is_tree_ensemble_graph(graph):
+        return load_tree_ensemble_session(onnx_path, graph)
+    if is_knn_graph(graph):
+        return load_knn_session(onnx_path, graph)
+    raise ValueError(f"Backend numpy belum mendukung graph {graph.op_types}")
+
+
+def create_model_session(onnx_path, model_name):
+    """Sesi untuk model sesuai backend terpilih; fallback ke onnxruntime jika numpy tidak mendukung graph."""
+    if inference_backend(model_name) == 'numpy':
+        try:
+            return load_numpy_session(onnx_path)
+        except ValueError as e:
+            logger.warning(f"{model_name}: {e}. Memakai onnxruntime.")
+    return create_inference_session(onnx_path)
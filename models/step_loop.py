@@ -0,0 +1,88 @@
+# models/step_loop.py
+"""
+Loop forecast rekursif tanpa alokasi array per langkah.
+
+Buffer fitur (batch, n_features) float32 dimiliki IncrementalFeatures
+(feature_spec.py) dan diperbarui in-place setiap langkah. StepRunner mengikat
+buffer input dan output ke sesi satu kali:
+- InferenceSession onnxruntime memakai IO binding (buffer yang sama dibaca dan
+  ditulis ORT setiap langkah, Config.ONNX_IO_BINDING_ENABLED),
+- ScaledSession menskalakan ke buffer kedua in-place lalu menjalankan sesi dalam,
+- sesi lain (EnsembleSession, backend numpy) fallback ke session.run biasa.
+
+StepRunner.session_calls menghitung panggilan sesi yang benar-benar dijalankan
+(run_with_iobinding / session.run), dipakai backtest untuk melaporkan jumlahnya.
+"""
+import logging
+
+import numpy as np
+
+from config import Config
+from .model_metadata import ScaledSession
+
+logger = logging.getLogger(__name__)
+
+
+class StepRunner:
+    """Jalankan sesi pada buffer input tetap; prediksi ditulis ke buffer output (batch,) float32."""
+
+    def __init__(self, session, X, input_name, output_name):
+        self.out = np.empty((len(X), 1), dtype=np.float32)
+        self.predictions = self.out.reshape(-1)
+        self.io_binding = False
+        self.session_calls = 0
+        self._run = self._bind(session, X, input_name, output_name)
+
+    def run(self):
+        self._run()
+        return self.predictions
+
+    def _bind(self, session, X, input_name, output_name):
+        if isinstance(session, ScaledSession) and session.metadata.input_dtype == np.float32:
+            return self._bind_scaled(session, X, input_name, output_name)
+        if Config.ONNX_IO_BINDING_ENABLED and hasattr(session, 'run_with_iobinding'):
+            try:
+                return self._bind_ort(session, X, input_name, output_name)
+            except Exception as e:
+                logger.debug(f"IO binding tidak tersedia, memakai session.run: {e}")
+        return self._bind_plain(session, X, input_name, output_name)
+
+    def _bind_scaled(self, session, X, input_name, output_name):
+        metadata = session.metadata
+        if not metadata.has_scaler:
+            return self._bind(session.session, X, input_name, output_name)
+
+        # Sama dengan ModelMetadata.transform: (X - mean) * inv_scale, ke buffer kedua
+        scaled = np.empty_like(X)
+        inner = self._bind(session.session, scaled, input_name, output_name)
+        mean, inv_scale = metadata.mean, metadata.inv_scale
+
+        def run():
+            np.subtract(X, mean, out=scaled)
+            np.multiply(scaled, inv_scale, out=scaled)
+            inner()
+        return run
+
+    def _bind_ort(self, session, X, input_name, output_name):
+        output = next(o for o in session.get_outputs() if o.name == output_name)
+        if output.type != 'tensor(float)':
+            raise ValueError(f"Output {output_name} bertipe {output.type}")
+
+        binding = session.io_binding()
+        binding.bind_cpu_input(input_name, X)
+        binding.bind_output(output_name, 'cpu', 0, np.float32, list(self.out.shape), self.out.ctypes.data)
+        self.io_binding = True
+
+        def run():
+            session.run_with_iobinding(binding)
+            self.session_calls += 1
+        return run
+
+    def _bind_plain(self, session, X, input_name, output_name):
+        out = self.out
+
+        def run():
+            preds = session.run([output_name], {input_name: X})[0]
+            self.session_calls += 1
+            np.copyto(out, np.asarray(preds, dtype=np.float32).reshape(out.shape))
+        return run
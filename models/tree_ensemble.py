@@ -0,0 +1,189 @@
+# models/tree_ensemble.py
+"""
+Evaluator NumPy untuk graph ONNX TreeEnsembleRegressor (ai.onnx.ml).
+
+Atribut pohon dari protobuf diratakan menjadi array (fitur, threshold, anak
+kiri, nilai daun) dengan anak true/false bersebelahan. Batch dievaluasi level
+demi level secara tervektorisasi untuk semua (baris, pohon) sekaligus: daun
+menunjuk ke dirinya sendiri sehingga traversal cukup diulang sebanyak kedalaman
+maksimum.
+
+TreeEnsembleSession meniru antarmuka InferenceSession (get_inputs, get_outputs,
+run) sehingga dapat dipakai ForecastingEngine, ScaledSession, dan EnsembleSession
+tanpa perubahan. Hasil dicek terhadap onnxruntime (toleransi 1e-5) oleh
+benchmarks/bench_tree_backend.py.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .onnx_proto import load_onnx_graph
+
+NodeArg = namedtuple('NodeArg', ['name', 'type', 'shape'])
+
+TREE_ENSEMBLE_OP = 'TreeEnsembleRegressor'
+
+# Kode mode node: 0 = daun, sisanya perbandingan "x <op> threshold" -> cabang true.
+# Semua node cabang dalam satu ensemble harus memakai mode yang sama.
+_MODES = {
+    b'LEAF': 0, b'BRANCH_LEQ': 1, b'BRANCH_LT': 2, b'BRANCH_GTE': 3, b'BRANCH_GT': 4,
+}
+_COMPARE = {1: np.less_equal, 2: np.less, 3: np.greater_equal, 4: np.greater}
+
+
+class TreeEnsemble:
+    """Array datar satu TreeEnsembleRegressor (satu target)."""
+
+    def __init__(self, attributes):
+        if attributes.get('post_transform', b'NONE') not in (b'NONE', None):
+            raise ValueError(f"post_transform tidak didukung: {attributes['post_transform']}")
+        if int(attributes.get('n_targets', 1)) != 1:
+            raise ValueError("Hanya TreeEnsembleRegressor satu target yang didukung")
+        self.aggregate = attributes.get('aggregate_function', b'SUM')
+        if self.aggregate not in (b'SUM', b'AVERAGE', b'MIN', b'MAX'):
+            raise ValueError(f"aggregate_function tidak didukung: {self.aggregate}")
+
+        tree_ids = np.asarray(attributes['nodes_treeids'], dtype=np.int64)
+        node_ids = np.asarray(attributes['nodes_nodeids'], dtype=np.int64)
+        n_nodes = len(node_ids)
+
+        # (tree, node) -> indeks global
+        stride = node_ids.max() + 1
+        keys = tree_ids * stride + node_ids
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+
+        def lookup(trees, nodes):
+            return order[np.searchsorted(sorted_keys, trees * stride + nodes)]
+
+        modes = np.array([_MODES.get(m, -1) for m in attributes['nodes_modes']], dtype=np.int8)
+        if np.any(modes < 0):
+            raise ValueError("Mode node tidak dikenal")
+        leaf = modes == 0
+
+        true_child = lookup(tree_ids, np.asarray(attributes['nodes_truenodeids'], dtype=np.int64))
+        false_child = lookup(tree_ids, np.asarray(attributes['nodes_falsenodeids'], dtype=np.int64))
+        feature = np.asarray(attributes['nodes_featureids'], dtype=np.int64)
+        threshold = np.asarray(attributes['nodes_values'], dtype=np.float32)
+        missing = attributes.get('nodes_missing_value_tracks_true')
+        missing_true = np.zeros(n_nodes, dtype=bool) if missing is None else np.asarray(missing, dtype=bool)
+
+        leaf_value = np.zeros(n_nodes, dtype=np.float64)
+        np.add.at(
+            leaf_value,
+            lookup(np.asarray(attributes['target_treeids'], dtype=np.int64),
+                   np.asarray(attributes['target_nodeids'], dtype=np.int64)),
+            np.asarray(attributes['target_weights'], dtype=np.float64)
+        )
+
+        # Akar = node yang tidak pernah menjadi anak di pohonnya
+        is_child = np.zeros(n_nodes, dtype=bool)
+        is_child[true_child[~leaf]] = True
+        is_child[false_child[~leaf]] = True
+        roots = np.flatnonzero(~is_child)
+        if len(roots) != len(np.unique(tree_ids)):
+            raise ValueError("Struktur pohon tidak valid (jumlah akar != jumlah pohon)")
+
+        split_modes = np.unique(modes[~leaf])
+        if len(split_modes) != 1 or split_modes[0] not in _COMPARE or split_modes[0] > 4:
+            raise ValueError(f"Kombinasi mode node tidak didukung: {split_modes.tolist()}")
+        self.mode = int(split_modes[0])
+
+        # Susun ulang node level demi level: anak true & false bersebelahan
+        # (false = true + 1) sehingga satu langkah traversal = satu gather.
+        new_order = list(roots)
+        depth = np.zeros(n_nodes, dtype=np.int64)
+        position = 0
+        while position < len(new_order):
+            node = new_order[position]
+            position += 1
+            if not leaf[node]:
+                new_order.extend((true_child[node], false_child[node]))
+                depth[true_child[node]] = depth[false_child[node]] = depth[node] + 1
+        new_order = np.asarray(new_order)
+        if len(new_order) != n_nodes:
+            raise ValueError("Struktur pohon tidak valid (node tak terjangkau/duplikat)")
+        new_index = np.empty(n_nodes, dtype=np.int64)
+        new_index[new_order] = np.arange(n_nodes)
+
+        leaf = leaf[new_order]
+        self.n_features = int(feature[~leaf[np.argsort(new_order)]].max()) + 1 if np.any(~leaf) else 1
+        # Daun membaca kolom konstanta 0 (indeks n_features) dengan threshold yang
+        # selalu lolos perbandingan, lalu "berpindah" ke dirinya sendiri.
+        self.left = np.where(leaf, np.arange(n_nodes), new_index[true_child[new_order]]).astype(np.intp)
+        self.feature = np.where(leaf, self.n_features, feature[new_order]).astype(np.intp)
+        self.threshold = np.where(leaf, np.float32(1 if self.mode <= 2 else -1), threshold[new_order])
+        self.missing_true = missing_true[new_order] | leaf
+        self.leaf_value = leaf_value[new_order]
+        self.roots = new_index[roots].astype(np.intp)
+        self.modes = np.where(leaf, 0, self.mode).astype(np.int8)
+
+        base_values = attributes.get('base_values')
+        self.base_value = float(base_values[0]) if base_values is not None and len(base_values) else 0.0
+        self.max_depth = int(depth.max())
+
+    def predict(self, X):
+        """Prediksi (n_rows,) float64 untuk X (n_rows, >= n_features)."""
+        X = np.asarray(X, dtype=np.float32)[:, :self.n_features]
+        n_rows, width = len(X), self.n_features + 1
+
+        # Kolom konstanta 0 untuk daun; X diratakan agar gather memakai np.take 1D
+        padded = np.zeros((n_rows, width), dtype=np.float32)
+        padded[:, :self.n_features] = X
+        flat = padded.ravel()
+        row_offsets = (np.arange(n_rows, dtype=np.intp) * width)[:, None]
+        has_nan = bool(np.isnan(X).any())
+        compare = _COMPARE[self.mode]
+
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat.take(row_offsets + self.feature.take(nodes))
+            go_true = compare(x, self.threshold.take(nodes))
+            if has_nan:
+                go_true = np.where(np.isnan(x), self.missing_true.take(nodes), go_true)
+            nodes = self.left.take(nodes) + ~go_true
+
+        values = self.leaf_value.take(nodes)
+        if self.aggregate == b'AVERAGE':
+            score = values.mean(axis=1)
+        elif self.aggregate == b'MIN':
+            score = values.min(axis=1)
+        elif self.aggregate == b'MAX':
+            score = values.max(axis=1)
+        else:
+            score = values.sum(axis=1)
+        return score + self.base_value
+
+
+class TreeEnsembleSession:
+    """Pengganti InferenceSession berbasis NumPy untuk graph TreeEnsembleRegressor."""
+
+    def __init__(self, ensemble, input_name, output_name):
+        self.ensemble = ensemble
+        self._inputs = [NodeArg(input_name, 'tensor(float)', [None, ensemble.n_features])]
+        self._outputs = [NodeArg(output_name, 'tensor(float)', [None, 1])]
+
+    def get_inputs(self):
+        return self._inputs
+
+    def get_outputs(self):
+        return self._outputs
+
+    def run(self, output_names, input_feed, run_options=None):
+        X = input_feed[self._inputs[0].name]
+        prediction = self.ensemble.predict(X).astype(np.float32).reshape(-1, 1)
+        return [prediction for _ in (output_names or self._outputs)]
+
+
+def is_tree_ensemble_graph(graph):
+    return len(graph.nodes) == 1 and graph.nodes[0]['op_type'] == TREE_ENSEMBLE_OP
+
+
+def load_tree_ensemble_session(onnx_path, graph=None):
+    """Bangun TreeEnsembleSession dari file .onnx; ValueError jika graph bukan tree ensemble tunggal."""
+    graph = graph or load_onnx_graph(onnx_path)
+    if not is_tree_ensemble_graph(graph):
+        raise ValueError(f"Graph {onnx_path} bukan TreeEnsembleRegressor tunggal: {graph.op_types}")
+
+    node = graph.nodes[0]
+    return TreeEnsembleSession(TreeEnsemble(node['attributes']), node['inputs'][0], node['outputs'][0])
@@ -0,0 +1,94 @@
+"""
+Konversi metadata model lama (`*.pkl.meta`, berisi StandardScaler sklearn
+ter-pickle) menjadi sidecar JSON `*.meta.json` yang bisa dibaca tanpa pickle
+maupun sklearn di production.
+
+Pickle dibaca dengan unpickler terbatas: kelas sklearn diganti objek kosong
+yang hanya menampung atributnya, jadi sklearn tidak perlu terpasang.
+
+Jalankan dari root repo:
+    python scripts/convert_model_meta.py [--models-path data/models] [--force]
+"""
+import argparse
+import glob
+import json
+import os
+import pickle
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from config import Config
+from models.model_metadata import ModelMetadata, metadata_path
+
+
+class _Attributes:
+    """Pengganti kelas sklearn: hanya menyimpan state hasil unpickle."""
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class _RestrictedUnpickler(pickle.Unpickler):
+    _ALLOWED_NUMPY = {
+        ('numpy', 'dtype'), ('numpy', 'ndarray'),
+        ('numpy.core.multiarray', '_reconstruct'), ('numpy.core.multiarray', 'scalar'),
+        ('numpy._core.multiarray', '_reconstruct'), ('numpy._core.multiarray', 'scalar'),
+    }
+
+    def find_class(self, module, name):
+        if module.startswith('sklearn.'):
+            return _Attributes
+        if (module, name) in self._ALLOWED_NUMPY:
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError(f"Global tidak diizinkan: {module}.{name}")
+
+
+def convert(pkl_meta_path):
+    with open(pkl_meta_path, 'rb') as f:
+        legacy = _RestrictedUnpickler(f).load()
+
+    scaler = legacy.get('scaler')
+    features = legacy.get('features') or []
+    mean = getattr(scaler, 'mean_', None) if getattr(scaler, 'with_mean', True) else np.zeros(len(features))
+    scale = getattr(scaler, 'scale_', None) if getattr(scaler, 'with_std', True) else np.ones(len(features))
+
+    metadata = ModelMetadata(
+        features=features,
+        input_dtype='float32',
+        mean=mean,
+        scale=scale,
+        extra={
+            'model_type': legacy.get('model_type'),
+            'saved_at': legacy.get('saved_at'),
+            'source': os.path.basename(pkl_meta_path)
+        }
+    )
+    return metadata.to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models-path', default=Config.MODELS_PATH)
+    parser.add_argument('--force', action='store_true', help='Timpa sidecar yang sudah ada')
+    args = parser.parse_args()
+
+    for pkl_meta_path in sorted(glob.glob(os.path.join(args.models_path, '*.pkl.meta'))):
+        onnx_path = pkl_meta_path[:-len('.pkl.meta')] + '.onnx'
+        target = metadata_path(onnx_path)
+        if os.path.exists(target) and not args.force:
+            print(f"skip   {os.path.basename(target)} (sudah ada)")
+            continue
+
+        data = convert(pkl_meta_path)
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        print(f"wrote  {os.path.basename(target)} ({len(data['features'])} fitur)")
+
+
+if __name__ == '__main__':
+    main()
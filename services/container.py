@@ -0,0 +1,93 @@
+# services/container.py
+"""
+Service container: satu instance per proses untuk setiap service aplikasi.
+
+app.py dan semua blueprint mengambil service dari sini alih-alih membuat
+ForecastService()/CommodityInsightService() per request, sehingga
+ModelManager, ForecastingEngine, sesi ONNX, dan cache service (alerts,
+commodity 5 menit, forecast) dipakai bersama.
+
+Instance dibuat lazily saat pertama diminta (double-checked locking, aman
+dipanggil dari banyak thread worker).
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Registry factory -> singleton per proses."""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        # RLock: factory boleh meminta service lain dari container
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"Service tidak terdaftar: {name}")
+                instance = factory()
+                self._instances[name] = instance
+                logger.debug(f"Service container: {name} dibuat")
+            return instance
+
+    def reset(self, name=None):
+        """Buang instance (semua atau satu) agar dibuat ulang saat diminta lagi."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+
+def _forecast_service():
+    from .forecast_service import ForecastService
+    return ForecastService()
+
+
+def _visualization_service():
+    from .visualization_service import VisualizationService
+    return VisualizationService(get_data_handler())
+
+
+def _commodity_service():
+    from .commodity_insight_service import CommodityInsightService
+    return CommodityInsightService()
+
+
+container = ServiceContainer()
+container.register('forecast_service', _forecast_service)
+container.register('data_handler', lambda: get_forecast_service().data_handler)
+container.register('visualization_service', _visualization_service)
+container.register('commodity_service', _commodity_service)
+
+
+def get_forecast_service():
+    return container.get('forecast_service')
+
+
+def get_data_handler():
+    return container.get('data_handler')
+
+
+def get_visualization_service():
+    return container.get('visualization_service')
+
+
+def get_commodity_service():
+    return container.get('commodity_service')
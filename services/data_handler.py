@@ -6,14 +6,76 @@ import os
 import shutil
 import calendar
 import logging
+import threading
+import time
 from datetime import datetime, timedelta, date
+from config import Config
 from database import db, IPHData, CommodityData
-from sqlalchemy import func, and_, or_
+from models.feature_spec import FEATURE_SPEC
+from sqlalchemy import func, and_, or_, select, insert, update, type_coerce, String
 import warnings
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+# Kolom fitur ML yang disimpan di iph_data (definisi tunggal: models/feature_spec.py)
+FEATURE_COLUMNS = FEATURE_SPEC.store_columns
+# Baris sebelum/sesudah perubahan yang ikut terpengaruh oleh lag & moving average
+_FEATURE_CONTEXT_ROWS = max(max(FEATURE_SPEC.lags), max(FEATURE_SPEC.windows) - 1)
+_FEATURE_TRAILING_ROWS = FEATURE_SPEC.history_rows
+
+# Tanggal per query IN saat prefetch; di bawah batas parameter SQLite/PostgreSQL
+_IN_BATCH_ROWS = 500
+# Kolom iph_data yang ditulis ulang saat tanggal upload sudah ada
+_UPSERT_UPDATE_COLUMNS = ('indikator_harga', 'bulan', 'minggu', 'tahun', 'kab_kota', 'updated_at')
+
+# Versi data historis (iph_data) di proses ini. Dinaikkan setiap kali ada
+# penulisan, dipakai sebagai bagian dari key cache forecast.
+_data_version = 0
+_data_version_lock = threading.Lock()
+# Probe database terakhir: (versi lokal, waktu probe, (count, max updated_at, max tanggal))
+_version_probe = None
+
+
+class HistoryFrameCache:
+    """
+    Satu salinan kolom data historis per proses (array NumPy read-only) untuk
+    load_historical_data.
+
+    Entri valid selama DataHandler.get_data_version() sama: versi lokal
+    (notify_data_changed) dan probe murah ke database yang menangkap
+    penulisan dari proses lain.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # {with_region: (data_version, arrays)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, with_region, load):
+        """Kolom dari memori; panggil load() hanya jika entri tidak valid."""
+        version = DataHandler.get_data_version()
+        with self._lock:
+            entry = self._entries.get(with_region)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        arrays = load()
+        if arrays is not None:
+            for array in arrays.values():
+                array.flags.writeable = False
+            # Jangan simpan hasil jika ada penulisan baru selama load()
+            with self._lock:
+                if version[0] == _data_version:
+                    self._entries[with_region] = (version, arrays)
+        return arrays
+
+
+_history_cache = HistoryFrameCache()
+
 class DataHandler:
     
     def __init__(self, backup_path='data/backups/'):
@@ -21,6 +83,36 @@ class DataHandler:
         self.backup_path = None
         
         logger.debug(f"DataHandler initialized (Database Mode)")
+
+    @staticmethod
+    def get_data_version():
+        """
+        Versi data historis: (versi lokal, probe database). Versi lokal naik
+        setiap notify_data_changed di proses ini; probe (count, max updated_at,
+        max tanggal) menangkap penulisan dari worker lain. Probe dijalankan
+        paling sering sekali per Config.HISTORY_CACHE_PROBE_INTERVAL detik.
+        """
+        global _version_probe
+        version = _data_version
+        cached = _version_probe
+        if (cached is not None and cached[0] == version
+                and time.monotonic() - cached[1] < Config.HISTORY_CACHE_PROBE_INTERVAL):
+            return version, cached[2]
+
+        probe = tuple(db.session.connection().execute(
+            select(func.count(IPHData.id), func.max(IPHData.updated_at), func.max(IPHData.tanggal))
+        ).one())
+        _version_probe = (version, time.monotonic(), probe)
+        return version, probe
+
+    @staticmethod
+    def notify_data_changed():
+        """Tandai iph_data berubah (insert/update/delete) agar cache turunan tidak dipakai lagi."""
+        global _data_version
+        with _data_version_lock:
+            _data_version += 1
+            logger.debug(f"Historical data version bumped to {_data_version}")
+        _history_cache.clear()
     
     def _anchor_date(self, d: date) -> date:
         try:
@@ -32,49 +124,202 @@ class DataHandler:
         except Exception:
             return d
 
-    def load_historical_data(self):
+    @staticmethod
+    def _anchor_dates(dates):
+        """Versi vektor _anchor_date: tanggal 1/8/15/22/29 terdekat dalam bulan yang sama."""
+        days = np.asarray(dates, dtype='datetime64[D]')
+        months = days.astype('datetime64[M]')
+        month_start = months.astype('datetime64[D]')
+        month_length = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+        day = (days - month_start).astype(np.int64) + 1
+        # Anchor berjarak 7 hari sehingga tidak ada jarak seri; 29 hanya jika ada di bulan itu
+        target = (day + 2) // 7 * 7 + 1
+        target = np.where(target > month_length, target - 7, target)
+        return month_start + (target - 1)
+
+    @staticmethod
+    def _fetch_columns(stmt, dtypes):
         """
-        Load historical data from IPHData table and convert to pandas DataFrame.
-        Returns DataFrame with standardized lowercase column names.
+        Jalankan select Core dan isi satu array NumPy per kolom langsung dari
+        cursor, per blok Config.DB_FETCH_CHUNK_ROWS baris (tanpa objek ORM).
         """
-        logger.debug("Loading historical data from database")
-        try:
-            # Query all records from database ordered by date
-            query = IPHData.query.order_by(IPHData.tanggal).all()
-            if not query:
-                logger.warning("No records found in database")
-                return pd.DataFrame()
-            data = [record.to_dict() for record in query]
-            df = pd.DataFrame(data)
+        chunks = [[] for _ in dtypes]
+        # Lewat connection (bukan session.execute) agar baris tidak melewati lapisan ORM
+        result = db.session.connection().execute(
+            stmt.execution_options(yield_per=Config.DB_FETCH_CHUNK_ROWS)
+        )
+        for partition in result.partitions():
+            for i, (chunk, dtype) in enumerate(zip(chunks, dtypes)):
+                chunk.append(np.array([row[i] for row in partition], dtype=dtype))
+        return [
+            np.concatenate(chunk) if chunk else np.empty(0, dtype=dtype)
+            for chunk, dtype in zip(chunks, dtypes)
+        ]
 
-            if df.empty:
-                logger.warning("DataFrame is empty after conversion")
-                return pd.DataFrame()
-            
-            
-            if 'tanggal' not in df.columns or 'indikator_harga' not in df.columns:
-                 logger.error(f"Kolom DB tidak cocok. Ditemukan: {df.columns.tolist()}. Diharapkan 'tanggal' & 'indikator_harga'.")
-                 return pd.DataFrame()
+    @staticmethod
+    def _date_column():
+        # Tanpa konversi date per baris oleh SQLAlchemy: SQLite mengembalikan teks
+        # ISO, driver lain objek date; NumPy mem-parse keduanya ke datetime64[D].
+        return type_coerce(IPHData.tanggal, String).label('tanggal')
 
-            df['tanggal'] = pd.to_datetime(df['tanggal'])
-            df['indikator_harga'] = pd.to_numeric(df['indikator_harga'], errors='coerce')
+    def _load_history_arrays(self, with_region):
+        """Kolom iph_data terurut tanggal sebagai array; None jika tabel kosong."""
+        columns = [self._date_column(), IPHData.indikator_harga]
+        dtypes = ['datetime64[D]', np.float64]
+        if with_region:
+            columns.append(IPHData.kab_kota)
+            dtypes.append(object)
 
-            df = df.rename(columns={
-                'tanggal': 'Tanggal',
-                'indikator_harga': 'Indikator_Harga'
-            }) 
+        arrays = self._fetch_columns(select(*columns).order_by(IPHData.tanggal), dtypes)
+        if len(arrays[0]) == 0:
+            return None
 
-            # Log summary
-            logger.info(f"[OK] Loaded {len(df)} records | "
-                    f"Date range: {df['Tanggal'].min().strftime('%Y-%m-%d')} to {df['Tanggal'].max().strftime('%Y-%m-%d')} | "
-                    f"IPH range: {df['Indikator_Harga'].min():.2f}% to {df['Indikator_Harga'].max():.2f}%")
+        history = {
+            'Tanggal': pd.to_datetime(arrays[0]).astype('datetime64[ns]').to_numpy(),
+            'Indikator_Harga': arrays[1]
+        }
+        if with_region:
+            history['kab_kota'] = arrays[2]
 
-            return df
+        logger.info(f"[OK] Loaded {len(arrays[0])} records | "
+                f"Date range: {arrays[0][0]} to {arrays[0][-1]} | "
+                f"IPH range: {arrays[1].min():.2f}% to {arrays[1].max():.2f}%")
+        return history
+
+    def load_historical_data(self, with_region=False):
+        """
+        Load historical data from IPHData table as pandas DataFrame.
+        Hanya kolom Tanggal (datetime64[ns]) dan Indikator_Harga (float64),
+        plus kab_kota jika with_region=True, terurut naik menurut tanggal.
+        
+        Kolom dibagi bersama lewat HistoryFrameCache: setiap pemanggil mendapat
+        DataFrame baru tanpa salinan di atas array read-only. Menambah/mengganti
+        kolom aman; menulis nilai in-place (df.loc[...] = x) gagal, jadi buat
+        salinan sendiri bila perlu mengubah nilai.
+        """
+        logger.debug("Loading historical data from database")
+        try:
+            if Config.HISTORY_CACHE_ENABLED:
+                history = _history_cache.get(with_region, lambda: self._load_history_arrays(with_region))
+            else:
+                history = self._load_history_arrays(with_region)
+
+            if history is None:
+                logger.warning("No records found in database")
+                return pd.DataFrame()
+            return pd.DataFrame(history, copy=False)
             
         except Exception as e:
+            db.session.rollback()
             logger.error(f"[ERROR] Error loading historical data: {str(e)}", exc_info=True)
             return pd.DataFrame()
               
+    def load_recent(self, n, region=None):
+        """
+        Ambil n rekaman IPH terbaru langsung sebagai array NumPy (terurut naik).
+        ORDER BY tanggal DESC LIMIT n dikerjakan di SQL, jadi biayanya tidak
+        bergantung pada panjang histori.
+        
+        Returns: (dates: datetime64[D] array, values: float64 array)
+        """
+        stmt = select(self._date_column(), IPHData.indikator_harga)
+        if region:
+            stmt = stmt.where(IPHData.kab_kota == region)
+        stmt = stmt.order_by(IPHData.tanggal.desc()).limit(n)
+
+        dates, values = self._fetch_columns(stmt, ['datetime64[D]', np.float64])
+        return np.ascontiguousarray(dates[::-1]), np.ascontiguousarray(values[::-1])
+
+    def load_latest_features(self):
+        """
+        Ambil vektor fitur baris terakhir dari feature store (satu baris).
+        Returns (Timestamp tanggal, np.ndarray[n_features]) atau None jika belum terisi.
+        """
+        stmt = select(self._date_column(), *[getattr(IPHData, col) for col in FEATURE_COLUMNS])
+        arrays = self._fetch_columns(
+            stmt.order_by(IPHData.tanggal.desc()).limit(1),
+            ['datetime64[D]'] + [np.float64] * len(FEATURE_COLUMNS)
+        )
+        if len(arrays[0]) == 0:
+            return None
+
+        features = np.array([column[0] for column in arrays[1:]], dtype=np.float64)
+        if np.isnan(features).any():
+            return None
+        return pd.Timestamp(arrays[0][0]), features
+
+    def load_feature_rows(self, n):
+        """
+        Ambil n baris terakhir yang fiturnya lengkap sebagai DataFrame
+        (Tanggal, Indikator_Harga, FEATURE_SPEC.columns), terurut naik.
+        """
+        feature_attrs = [getattr(IPHData, col) for col in FEATURE_COLUMNS]
+        stmt = select(self._date_column(), IPHData.indikator_harga, *feature_attrs).where(
+            *[attr.isnot(None) for attr in feature_attrs]
+        ).order_by(IPHData.tanggal.desc()).limit(n)
+
+        arrays = self._fetch_columns(stmt, ['datetime64[D]'] + [np.float64] * (len(FEATURE_COLUMNS) + 1))
+        columns = ['Tanggal', 'Indikator_Harga'] + FEATURE_SPEC.columns
+        df = pd.DataFrame({column: values[::-1] for column, values in zip(columns, arrays)})
+        df['Tanggal'] = pd.to_datetime(df['Tanggal'])
+        return df
+
+    @staticmethod
+    def _compute_feature_columns(values):
+        """Hitung lag & moving average untuk deret nilai IPH yang sudah terurut."""
+        return pd.DataFrame(FEATURE_SPEC.compute(values), columns=FEATURE_COLUMNS)
+
+    def refresh_features(self, start_date=None, end_date=None):
+        """
+        Perbarui kolom fitur (FEATURE_COLUMNS) di iph_data secara inkremental.
+        
+        Hanya baris dalam [start_date, end_date] ditambah beberapa baris sesudahnya
+        yang dihitung ulang, memakai beberapa baris sebelumnya sebagai konteks.
+        Tanpa argumen: hitung ulang seluruh tabel (backfill).
+        
+        Returns: jumlah baris yang diperbarui
+        """
+        columns = (IPHData.id, IPHData.tanggal, IPHData.indikator_harga)
+        try:
+            if start_date is None:
+                context = []
+                rows = db.session.query(*columns).order_by(IPHData.tanggal).all()
+            else:
+                end_date = end_date or start_date
+                context = db.session.query(*columns).filter(
+                    IPHData.tanggal < start_date
+                ).order_by(IPHData.tanggal.desc()).limit(_FEATURE_CONTEXT_ROWS).all()[::-1]
+                targets = db.session.query(*columns).filter(
+                    IPHData.tanggal >= start_date, IPHData.tanggal <= end_date
+                ).order_by(IPHData.tanggal).all()
+                trailing = db.session.query(*columns).filter(
+                    IPHData.tanggal > end_date
+                ).order_by(IPHData.tanggal).limit(_FEATURE_TRAILING_ROWS).all()
+                rows = context + targets + trailing
+
+            if len(rows) <= len(context):
+                return 0
+
+            features = self._compute_feature_columns([row.indikator_harga for row in rows])
+            feature_values = features.to_numpy()
+
+            updates = []
+            for i in range(len(context), len(rows)):
+                mapping = {'id': rows[i].id}
+                for col, value in zip(FEATURE_COLUMNS, feature_values[i]):
+                    mapping[col] = None if np.isnan(value) else float(value)
+                updates.append(mapping)
+
+            db.session.bulk_update_mappings(IPHData, updates)
+            db.session.commit()
+            logger.debug(f"Feature store refreshed: {len(updates)} rows (from {start_date or 'beginning'})")
+            return len(updates)
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"[ERROR] Failed to refresh feature columns: {str(e)}", exc_info=True)
+            return 0
+
     def validate_new_data(self, df):
         
         original_size = len(df)
@@ -163,10 +408,120 @@ class DataHandler:
         
         return df
 
+    @staticmethod
+    def _upload_records(validated_df, dates):
+        """Nilai per baris upload (urutan validated_df) tanpa iterrows."""
+        n_rows = len(validated_df)
+
+        def column(name):
+            return validated_df[name].tolist() if name in validated_df.columns else [None] * n_rows
+
+        def optional_str(values):
+            return [str(v) if pd.notna(v) else None for v in values]
+
+        kab_kota = [str(v) for v in validated_df['Kab/Kota'].tolist()] if 'Kab/Kota' in validated_df.columns else ['BATU'] * n_rows
+        andil = column('Komoditas Andil Perubahan Harga')
+        fluktuasi = optional_str(column('Komoditas Fluktuasi Harga Tertinggi'))
+        nilai_fluktuasi = column('Fluktuasi Harga')
+
+        records = []
+        for i, (tanggal, iph, bulan, minggu, tahun) in enumerate(zip(
+                dates, validated_df['Indikator_Harga'].astype(float).tolist(),
+                optional_str(column('Bulan')), optional_str(column('Minggu')), column('Tahun'))):
+            commodity = None
+            if pd.notna(andil[i]):
+                commodity = {
+                    'komoditas_andil': str(andil[i]),
+                    'komoditas_fluktuasi': fluktuasi[i],
+                    'nilai_fluktuasi': float(nilai_fluktuasi[i]) if pd.notna(nilai_fluktuasi[i]) else 0.0
+                }
+            records.append({
+                'tanggal': tanggal, 'indikator_harga': iph, 'bulan': bulan, 'minggu': minggu,
+                'tahun': int(tahun) if pd.notna(tahun) else None, 'kab_kota': kab_kota[i],
+                'commodity': commodity
+            })
+        return records
+
+    @staticmethod
+    def _apply_upload_update(state, record):
+        """Aturan update rekaman yang sudah ada: kolom opsional hanya ditimpa jika terisi."""
+        state['indikator_harga'] = record['indikator_harga']
+        for key in ('bulan', 'minggu', 'kab_kota'):
+            if record[key]:
+                state[key] = record[key]
+        if record['tahun'] is not None:
+            state['tahun'] = record['tahun']
+
+    @staticmethod
+    def _prefetch_existing(dates):
+        """{tanggal: kolom yang bisa diupdate} untuk tanggal yang sudah ada, satu query IN per blok."""
+        columns = (IPHData.id, IPHData.tanggal, IPHData.indikator_harga, IPHData.bulan,
+                   IPHData.minggu, IPHData.tahun, IPHData.kab_kota)
+        existing = {}
+        for i in range(0, len(dates), _IN_BATCH_ROWS):
+            rows = db.session.execute(
+                select(*columns).where(IPHData.tanggal.in_(dates[i:i + _IN_BATCH_ROWS]))
+            ).all()
+            existing.update({row.tanggal: dict(row._mapping) for row in rows})
+        return existing
+
+    @staticmethod
+    def _upsert_iph_rows(rows):
+        """
+        Tulis baris iph_data secara bulk, kembalikan {tanggal: id}.
+        PostgreSQL/SQLite: INSERT ... ON CONFLICT (tanggal) DO UPDATE ... RETURNING.
+        Dialect lain: bulk insert baris baru + bulk update by id, lalu satu query id.
+        """
+        dialect = db.engine.dialect.name
+        ids = {}
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+            stmt = dialect_insert(IPHData)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[IPHData.tanggal],
+                set_={column: stmt.excluded[column] for column in _UPSERT_UPDATE_COLUMNS}
+            ).returning(IPHData.id, IPHData.tanggal)
+            # executemany: statement dikompilasi sekali, SQLAlchemy ("insertmanyvalues")
+            # menggabungkan baris ke beberapa INSERT multi-VALUES. Conflict lewat
+            # tanggal; id tidak ikut VALUES agar kunci semua baris sama.
+            values = [{key: value for key, value in row.items() if key != 'id'} for row in rows]
+            ids.update({row.tanggal: row.id for row in db.session.execute(stmt, values)})
+            return ids
+
+        new_rows = [row for row in rows if 'id' not in row]
+        existing_rows = [
+            {'id': row['id'], **{column: row[column] for column in _UPSERT_UPDATE_COLUMNS}}
+            for row in rows if 'id' in row
+        ]
+        if new_rows:
+            db.session.execute(insert(IPHData), new_rows)
+        if existing_rows:
+            db.session.execute(update(IPHData), existing_rows)
+        ids.update({row['tanggal']: row['id'] for row in rows if 'id' in row})
+
+        new_dates = [row['tanggal'] for row in new_rows]
+        for i in range(0, len(new_dates), _IN_BATCH_ROWS):
+            ids.update(db.session.execute(
+                select(IPHData.tanggal, IPHData.id).where(IPHData.tanggal.in_(new_dates[i:i + _IN_BATCH_ROWS]))
+            ).tuples().all())
+        return ids
+
     def merge_and_save_data(self, new_data_df):
         """ 
         MODIFIED: Hanya memvalidasi dan menyimpan data baru ke database.
         TIDAK memicu training. TIDAK melakukan backup (read-only).
+        
+        Set-based: tanggal di-anchor secara vektor, tanggal yang sudah ada diambil
+        dengan satu query IN, lalu iph_data ditulis lewat bulk upsert dan
+        CommodityData lewat satu insert batch. Baris upload dengan tanggal (anchor)
+        sama digabung berurutan sebelum ditulis: baris terakhir menurut tanggal
+        mentah menang, kolom opsional hanya ditimpa jika terisi. Karena itu tanggal
+        baru yang baris pertamanya tanpa Bulan tetap tersimpan jika baris
+        berikutnya mengisinya (loop per baris lama gagal NOT NULL pada bulan).
         """
         logger.info(f"Menerima {len(new_data_df)} rekaman baru untuk disimpan ke DB...")
         validated_df = self.validate_new_data(new_data_df.copy())
@@ -175,73 +530,72 @@ class DataHandler:
             existing_count = IPHData.query.count()
             logger.debug(f"Existing records: {existing_count}")
             
+            raw_dates = validated_df['Tanggal'].to_numpy(dtype='datetime64[D]')
+            anchored = self._anchor_dates(raw_dates)
+            normalized = int(np.count_nonzero(anchored != raw_dates))
+            if normalized:
+                logger.debug(f"Normalized {normalized} dates to weekly anchors")
+            dates = anchored.astype(object).tolist()
+            
+            records = self._upload_records(validated_df, dates)
+            existing = self._prefetch_existing(sorted(set(dates)))
+            
+            # Terapkan baris upload berurutan per tanggal (dict menjaga urutan kemunculan)
+            now = datetime.utcnow()
+            plan = {}
+            first_records = {}
             new_records = 0
             updated_records = 0
-            duplicate_dates = []
-            
-            with db.session.no_autoflush:
-                for _, row in validated_df.iterrows():
-                    date_value = row['Tanggal'].date()
-                    anchored = self._anchor_date(date_value)
-                    if anchored != date_value:
-                        logger.debug(f"Normalized date {date_value} -> {anchored}")
-                        date_value = anchored
-                    
-                    bulan_val = str(row['Bulan']) if 'Bulan' in row and pd.notna(row['Bulan']) else None
-                    minggu_val = str(row['Minggu']) if 'Minggu' in row and pd.notna(row['Minggu']) else None
-                    kab_kota_val = str(row.get('Kab/Kota', 'BATU'))
-
-                    existing_record = IPHData.query.filter_by(tanggal=date_value).first()
-
-                    if existing_record:
-                        # Update
-                        logger.debug(f"Updating existing record: {date_value}")
-                        existing_record.indikator_harga = float(row['Indikator_Harga'])
-                        existing_record.updated_at = datetime.utcnow()
-                        if bulan_val: existing_record.bulan = bulan_val
-                        if minggu_val: existing_record.minggu = minggu_val
-                        if 'Tahun' in row and pd.notna(row['Tahun']): existing_record.tahun = int(row['Tahun'])
-                        if kab_kota_val: existing_record.kab_kota = kab_kota_val
-                        updated_records += 1
-                        duplicate_dates.append(date_value)
-                    else:
-                        # Insert baru
-                        logger.debug(f"Adding new record: {date_value}")
-                        
-                        tahun_val = int(row['Tahun']) if 'Tahun' in row and pd.notna(row['Tahun']) else date_value.year
-                        
-                        new_record = IPHData(
-                            tanggal=date_value,
-                            indikator_harga=float(row['Indikator_Harga']),
-                            bulan=bulan_val,
-                            minggu=minggu_val,
-                            tahun=tahun_val,
-                            bulan_numerik=date_value.month,
-                            kab_kota=kab_kota_val,
-                            data_source='uploaded'
-                        )
-                        db.session.add(new_record)
-                        db.session.flush() 
-                        
-                        # Create CommodityData record if commodity data exists
-                        if 'Komoditas Andil Perubahan Harga' in row and pd.notna(row['Komoditas Andil Perubahan Harga']):
-                            commodity_record = CommodityData(
-                                tanggal=date_value,
-                                bulan=bulan_val,
-                                minggu=minggu_val,
-                                tahun=tahun_val,
-                                kab_kota=kab_kota_val,
-                                iph_id=new_record.id,
-                                iph_value=float(row['Indikator_Harga']),
-                                komoditas_andil=str(row['Komoditas Andil Perubahan Harga']),
-                                komoditas_fluktuasi=str(row['Komoditas Fluktuasi Harga Tertinggi']) if 'Komoditas Fluktuasi Harga Tertinggi' in row and pd.notna(row['Komoditas Fluktuasi Harga Tertinggi']) else None,
-                                nilai_fluktuasi=float(row['Fluktuasi Harga']) if 'Fluktuasi Harga' in row and pd.notna(row['Fluktuasi Harga']) else 0.0
-                            )
-                            db.session.add(commodity_record)
-                        
-                        new_records += 1
+            for record in records:
+                date_value = record['tanggal']
+                state = plan.get(date_value)
+                if state is None and date_value not in existing:
+                    plan[date_value] = {
+                        'tanggal': date_value,
+                        'indikator_harga': record['indikator_harga'],
+                        'bulan': record['bulan'],
+                        'minggu': record['minggu'],
+                        'tahun': record['tahun'] if record['tahun'] is not None else date_value.year,
+                        'bulan_numerik': date_value.month,
+                        'kab_kota': record['kab_kota'],
+                        'data_source': 'uploaded',
+                        'created_at': now,
+                        'updated_at': now
+                    }
+                    first_records[date_value] = record
+                    new_records += 1
+                    continue
+                if state is None:
+                    state = plan[date_value] = {
+                        **existing[date_value], 'bulan_numerik': date_value.month,
+                        'data_source': 'uploaded', 'created_at': now, 'updated_at': now
+                    }
+                self._apply_upload_update(state, record)
+                updated_records += 1
+            
+            ids = self._upsert_iph_rows(list(plan.values()))
+            
+            # CommodityData hanya untuk rekaman baru (baris pertama tanggal tersebut)
+            commodity_rows = [
+                {
+                    'tanggal': date_value,
+                    'bulan': record['bulan'],
+                    'minggu': record['minggu'],
+                    'tahun': date_value.year if record['tahun'] is None else record['tahun'],
+                    'kab_kota': record['kab_kota'],
+                    'iph_id': ids[date_value],
+                    'iph_value': record['indikator_harga'],
+                    **record['commodity']
+                }
+                for date_value, record in first_records.items() if record['commodity'] is not None
+            ]
+            if commodity_rows:
+                db.session.execute(insert(CommodityData), commodity_rows)
             
             db.session.commit()
+            if plan:
+                self.refresh_features(min(plan), max(plan))
+            self.notify_data_changed()
             logger.info(f"Data tersimpan ke DB: {new_records} baru, {updated_records} diperbarui.")
             
             final_count = IPHData.query.count()
@@ -252,8 +606,8 @@ class DataHandler:
                 'updated_records': updated_records,
                 'total_records': final_count,
                 'duplicates_removed': updated_records, # Ini adalah duplikat yang di-update
-                'date_overlap': len(duplicate_dates) > 0,
-                'overlap_count': len(duplicate_dates),
+                'date_overlap': updated_records > 0,
+                'overlap_count': updated_records,
                 'backup_created': False # Backup tidak lagi dibuat
             }
             
@@ -6,12 +6,25 @@ import os
 from datetime import datetime, timedelta
 
 # Import service/model modules
+from config import Config
+from services.cache import TTLCache
 from services.data_handler import DataHandler
 from models.model_manager import ModelManager
+from models.ensemble import ENSEMBLE_MODEL_NAME
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Cache jalur forecast penuh (FORECAST_MAX_WEEKS) per proses, dibagi oleh semua
+# instance ForecastService; horizon 4..12 dilayani dengan memotong jalur ini.
+# Key: (nama model, hash file model, versi data historis, interval_method)
+# Versi data memuat probe database, jadi penulisan dari worker lain juga
+# membuat entri lama tidak terpakai (paling lambat HISTORY_CACHE_PROBE_INTERVAL).
+_forecast_cache = TTLCache(
+    maxsize=Config.FORECAST_CACHE_MAX_ENTRIES,
+    ttl=Config.FORECAST_CACHE_TTL
+)
+
 class ForecastService:
     """
     Service untuk menangani logika peramalan dan analisis data.
@@ -77,11 +90,12 @@ class ForecastService:
                 'data_summary': {'total_records': 0}
             }
 
-    def get_current_forecast(self, model_name=None, forecast_weeks=8, save_history=False):
+    def get_current_forecast(self, model_name=None, forecast_weeks=8, save_history=False, interval_method='heuristic'):
         """
         Get forecast, save to DB for persistence (optional), and cache in memory.
+        interval_method: 'heuristic' (default) atau 'simulation' (Monte-Carlo).
         """
-        logger.debug(f"Getting current forecast: model={model_name}, weeks={forecast_weeks}")
+        logger.debug(f"Getting current forecast: model={model_name}, weeks={forecast_weeks}, interval={interval_method}")
         
         try:
             if not model_name or model_name.strip() == '':
@@ -96,9 +110,9 @@ class ForecastService:
             if not (4 <= forecast_weeks <= 12):
                 return {'success': False, 'error': 'Forecast weeks must be between 4 and 12'}
             
-            # 1. Generate forecast (Menggunakan Engine ONNX)
-            forecast_df, model_performance, forecast_summary = self.model_manager.engine.generate_forecast(
-                model_name, forecast_weeks
+            # 1. Generate forecast (Menggunakan Engine ONNX), atau ambil dari cache
+            forecast_df, model_performance, forecast_summary = self._generate_forecast_cached(
+                model_name, forecast_weeks, interval_method
             )
             
             # 2. SIMPAN KE DATABASE (Opsional, hanya jika diminta)
@@ -121,7 +135,8 @@ class ForecastService:
                     'model_name': str(model_name),
                     'model_performance': model_performance,
                     'summary': forecast_summary,
-                    'weeks_forecasted': int(forecast_weeks)
+                    'weeks_forecasted': int(forecast_weeks),
+                    'interval_method': interval_method
                 }
             }
             
@@ -139,6 +154,74 @@ class ForecastService:
                 'timestamp': datetime.now().isoformat()
             }
 
+    def _generate_forecast_cached(self, model_name, forecast_weeks, interval_method='heuristic'):
+        """
+        Forecast dengan cache LRU+TTL. Key memakai hash file model dan versi data
+        sehingga model baru atau perubahan iph_data otomatis membuat cache lama tidak terpakai.
+        Jalur penuh dihitung sekali; setiap forecast_weeks hanya memotong jalur tersebut.
+        """
+        engine = self.model_manager.engine
+        cache_key = (
+            model_name,
+            engine.get_model_fingerprint(model_name),
+            DataHandler.get_data_version(),
+            interval_method
+        )
+
+        ensemble_weights = None
+        if model_name == ENSEMBLE_MODEL_NAME:
+            # Bobot ikut key: hasil backtest baru mengubah ensemble. Dibaca dari
+            # record in-memory, database hanya disentuh setelah invalidasi.
+            ensemble_weights = self.model_manager.get_ensemble_weights()
+            cache_key += (tuple(sorted((name, round(w, 12)) for name, w in ensemble_weights.items())),)
+
+        forecast_path = _forecast_cache.get(cache_key)
+        if forecast_path is not None:
+            logger.debug(f"Forecast cache hit: model={model_name}, weeks={forecast_weeks}")
+        else:
+            forecast_path = engine.generate_forecast_path(
+                model_name, interval_method, ensemble_weights=ensemble_weights
+            )
+            _forecast_cache.set(cache_key, forecast_path)
+
+        return engine.slice_forecast(forecast_path, int(forecast_weeks))
+
+    @staticmethod
+    def clear_forecast_cache():
+        """Kosongkan cache forecast proses ini."""
+        _forecast_cache.clear()
+
+    def get_all_forecasts(self, forecast_weeks=8, models=None):
+        """
+        Forecast untuk semua model (perbandingan dashboard) dalam satu pass engine.
+        """
+        logger.debug(f"Getting forecasts for all models: weeks={forecast_weeks}")
+
+        try:
+            if not (4 <= forecast_weeks <= 12):
+                return {'success': False, 'error': 'Forecast weeks must be between 4 and 12'}
+
+            forecasts = self.model_manager.engine.generate_forecast_all(models, forecast_weeks)
+
+            return {
+                'success': True,
+                'timestamp': datetime.now().isoformat(),
+                'weeks_forecasted': int(forecast_weeks),
+                'forecasts': {
+                    str(name): forecast_df.to_dict('records')
+                    for name, forecast_df in forecasts.items()
+                }
+            }
+
+        except Exception as e:
+            error_msg = f"Error generating forecasts: {str(e)}"
+            logger.error(f"Exception in get_all_forecasts: {error_msg}", exc_info=True)
+            return {
+                'success': False,
+                'error': error_msg,
+                'timestamp': datetime.now().isoformat()
+            }
+
     def _save_forecast_to_database(self, forecast_df, model_name, summary, forecast_weeks, model_performance=None):
         """Save forecast to ForecastHistory database"""
         try:
@@ -191,11 +274,11 @@ class ForecastService:
         Menangani: Inflasi Tinggi, Deflasi, Volatilitas, Lonjakan Tiba-tiba, & Dominasi Komoditas.
         """
         try:
-            # 1. Load Data Real dari Database
-            df = self.data_handler.load_historical_data()
+            # 1. Load Data Real dari Database (hanya 4 minggu terakhir yang dipakai)
+            dates, values = self.data_handler.load_recent(4)
             
             # Fallback jika data kosong
-            if df.empty:
+            if len(values) == 0:
                  return {
                     'success': True, 
                     'alerts': [],
@@ -208,25 +291,20 @@ class ForecastService:
                     }
                 }
 
-            # 2. Preprocessing Data
-            df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-            df = df.sort_values('Tanggal').reset_index(drop=True)
-            
-            # Ambil data terbaru & sebelumnya
-            latest_record = df.iloc[-1]
-            latest_val = float(latest_record['Indikator_Harga'])
-            latest_date = latest_record['Tanggal']
+            # 2. Ambil data terbaru & sebelumnya
+            latest_val = float(values[-1])
+            latest_date = pd.Timestamp(dates[-1])
             
             prev_val = 0.0
-            if len(df) >= 2:
-                prev_val = float(df['Indikator_Harga'].iloc[-2])
+            if len(values) >= 2:
+                prev_val = float(values[-2])
             
             change = latest_val - prev_val
             
             # Statistik Window (30 Hari / 4 Minggu terakhir)
-            recent_df = df.tail(4) 
-            std_dev = recent_df['Indikator_Harga'].std() if len(recent_df) > 1 else 0.0
-            avg_val = recent_df['Indikator_Harga'].mean()
+            # nan-aware: satu minggu kosong (NaN) tidak membuat statistik ikut NaN
+            std_dev = float(np.nanstd(values, ddof=1)) if np.count_nonzero(~np.isnan(values)) > 1 else 0.0
+            avg_val = float(np.nanmean(values))
 
             # -----------------------------------------
             # 3. LOGIC GENERATOR (The "Brain")
@@ -282,8 +360,8 @@ class ForecastService:
             
             # D. Analisis Komoditas (Integrasi Commodity Service)
             try:
-                from services.commodity_insight_service import CommodityInsightService
-                comm_service = CommodityInsightService()
+                from services.container import get_commodity_service
+                comm_service = get_commodity_service()
                                 
                 # Gunakan metode get_full_commodity_insights dengan key bulan/tahun
                 key = f"{latest_date.year}-{latest_date.month:02d}"
@@ -51,4 +51,8 @@ class ModelPerformanceREST:
         data = resp.json()
         inserted = data[0] if isinstance(data, list) else data
         logger.info("  [REST][OK] Tersimpan dengan id=%s", inserted.get("id"))
+
+        # Model terbaik di proses ini perlu dihitung ulang
+        from models.best_model import invalidate_best_model
+        invalidate_best_model()
         return inserted
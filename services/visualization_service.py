@@ -37,9 +37,9 @@ class VisualizationService:
     def filter_by_timeframe(self, df, timeframe, start_date_str=None):
         if df.empty: return df, None
         
-        df = df.copy()
+        # sort_values membuat frame baru; frame dari load_historical_data read-only
+        df = df.sort_values('Tanggal', ignore_index=True)
         df['Tanggal'] = pd.to_datetime(df['Tanggal'])
-        df = df.sort_values('Tanggal').reset_index(drop=True)
         
         if timeframe == 'ALL': return df, None
         
@@ -297,33 +297,19 @@ class VisualizationService:
         try:
             print(f" Loading model performance from DATABASE...")
             
-            from database import ModelPerformance
+            from models.performance_series import load_performance_series
             
-            #  LOAD FROM DATABASE
-            perf_records = ModelPerformance.query.order_by(
-                ModelPerformance.trained_at.desc()
-            ).limit(200).all()  # Last 200 training records
+            #  LOAD FROM DATABASE (kolumnar, per model, dibatasi max_points)
+            model_data = load_performance_series()
             
-            if not perf_records:
+            if not model_data:
                 return {
                     'success': False,
                     'message': 'No model performance data in database. Please train models first.'
                 }
             
-            print(f" Found {len(perf_records)} performance records in database")
-            
-            #  GROUP BY MODEL
-            model_data = {}
-            for record in perf_records:
-                model_name = record.model_name
-                if model_name not in model_data:
-                    model_data[model_name] = []
-                model_data[model_name].append({
-                    'mae': record.mae,
-                    'rmse': record.rmse,
-                    'r2': record.r2_score,
-                    'trained_at': record.trained_at
-                })
+            total_records = int(sum(series['n_runs'].sum() for series in model_data.values()))
+            print(f" Found {total_records} performance records in database")
             
             print(f" Models found: {list(model_data.keys())}")
             
@@ -337,14 +323,9 @@ class VisualizationService:
             
             # Chart 1: Accuracy Trends
             accuracy_traces = []
-            for model_name, records in model_data.items():
-                # Sort by date
-                records_sorted = sorted(records, key=lambda x: x['trained_at'])
-                
-                dates = [r['trained_at'].strftime('%Y-%m-%d %H:%M') for r in records_sorted]
-                mae_values = [r['mae'] for r in records_sorted]
-                rmse_values = [r['rmse'] for r in records_sorted]
-                r2_values = [r['r2'] for r in records_sorted]
+            for model_name, series in model_data.items():
+                dates = pd.DatetimeIndex(series['timestamps']).strftime('%Y-%m-%d %H:%M').tolist()
+                mae_values = self._clean_for_json(series['mae'].tolist())
                 
                 # MAE trace
                 accuracy_traces.append({
@@ -359,7 +340,7 @@ class VisualizationService:
             accuracy_chart = {
                 'data': accuracy_traces,
                 'layout': {
-                    'title': f'Model Performance History ({len(perf_records)} trainings)',
+                    'title': f'Model Performance History ({total_records} trainings)',
                     'xaxis': {'title': 'Training Date'},
                     'yaxis': {'title': 'MAE'},
                     'hovermode': 'x unified',
@@ -370,9 +351,10 @@ class VisualizationService:
             
             # Chart 2: Latest Performance Comparison
             latest_perf = {}
-            for model_name, records in model_data.items():
-                latest = records[0]  # Already sorted desc
-                latest_perf[model_name] = latest
+            for model_name, series in model_data.items():
+                latest_perf[model_name] = {
+                    field: self._clean_for_json(series[field][-1].item()) for field in ('mae', 'rmse', 'r2')
+                }
             
             comparison_chart = {
                 'data': [{
@@ -391,12 +373,12 @@ class VisualizationService:
             
             # Chart 3: Model Drift (MAE over time for best model)
             best_model = min(latest_perf.keys(), key=lambda m: latest_perf[m]['mae'])
-            best_records = sorted(model_data[best_model], key=lambda x: x['trained_at'])
+            best_series = model_data[best_model]
             
             drift_chart = {
                 'data': [{
-                    'x': [r['trained_at'].strftime('%Y-%m-%d') for r in best_records],
-                    'y': [r['mae'] for r in best_records],
+                    'x': pd.DatetimeIndex(best_series['timestamps']).strftime('%Y-%m-%d').tolist(),
+                    'y': self._clean_for_json(best_series['mae'].tolist()),
                     'mode': 'lines+markers',
                     'name': f'{best_model} MAE',
                     'line': {'color': '#ef4444', 'width': 3}
@@ -423,8 +405,8 @@ class VisualizationService:
                     'rank': i + 1,
                     'model': model_name,
                     'current_mae': round(perf['mae'], 4),
-                    'current_rmse': round(perf['rmse'], 4),
-                    'current_r2': round(perf['r2'], 3),
+                    'current_rmse': round(perf['rmse'], 4) if perf['rmse'] is not None else None,
+                    'current_r2': round(perf['r2'], 3) if perf['r2'] is not None else None,
                     'accuracy_pct': round(accuracy_pct, 1),
                     'grade': grade,
                     'grade_color': 'success' if grade == 'EXCELLENT' else 'primary' if grade == 'GOOD' else 'warning',
@@ -437,13 +419,13 @@ class VisualizationService:
                 'current_r2': round(best_r2, 3),
                 'forecast_accuracy': f"{max(0, (1 - best_mae) * 100):.1f}%",
                 'model_stability': 'STABIL',
-                'total_data_points': len(perf_records),
+                'total_data_points': total_records,
                 'last_updated': datetime.now().strftime('%d/%m/%Y %H:%M'),
                 'model_comparison_table': comparison_table,
                 'insights': {
                     'best_performer': f"{best_model} dengan MAE {best_mae:.4f}",
                     'stability_status': 'Semua model stabil',
-                    'data_characteristics': f'{len(perf_records)} training records'
+                    'data_characteristics': f'{total_records} training records'
                 }
             }
             
@@ -0,0 +1,162 @@
+# services/warmup.py
+"""
+Warm-up worker: memuat semua sesi ONNX, menjalankan satu inference dummy per
+sesi, mengisi HistoryFrameCache, dan mengisi cache forecast default sebelum
+request pertama datang.
+
+Dijalankan di background thread, sekali per proses worker: dimulai oleh hook
+post_worker_init gunicorn (gunicorn.conf.py) atau oleh server dev di app.py,
+tidak saat app.py diimpor. Status readiness dilaporkan oleh /ping dan
+/health/detailed; proses yang tidak menjalankan warm-up (skrip, test, flask run)
+langsung dilaporkan siap.
+"""
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_state = {
+    'ready': False,
+    'started_at': None,
+    'finished_at': None,
+    'duration_ms': None,
+    'models': {},  # {model_name: ms load + first run}
+    'errors': []
+}
+_state_lock = threading.Lock()
+_started_pid = None
+
+
+def _ready():
+    # Tanpa warm-up di proses ini tidak ada yang ditunggu
+    return _state['ready'] or _started_pid != os.getpid()
+
+
+def get_warmup_status():
+    """Salinan status warm-up untuk endpoint health."""
+    with _state_lock:
+        return {
+            'ready': _ready(),
+            'started_at': _state['started_at'],
+            'finished_at': _state['finished_at'],
+            'duration_ms': _state['duration_ms'],
+            'models': dict(_state['models']),
+            'errors': list(_state['errors'])
+        }
+
+
+def is_ready():
+    with _state_lock:
+        return _ready()
+
+
+def _record_error(message):
+    logger.warning(f"Warm-up: {message}")
+    with _state_lock:
+        _state['errors'].append(message)
+
+
+def _warm_models(engine):
+    """Load + prime setiap sesi ONNX yang terdaftar."""
+    for model in engine.get_available_models():
+        name = model['name']
+        start = time.perf_counter()
+        try:
+            session = engine._load_model_session(name)
+            input_name, output_name = engine._get_io_names(session)
+            dummy = np.zeros((1, len(engine.feature_cols)), dtype=np.float32)
+            session.run([output_name], {input_name: dummy})
+        except Exception as e:
+            _record_error(f"model {name} gagal di-warm-up: {e}")
+            continue
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with _state_lock:
+            _state['models'][name] = round(elapsed_ms, 2)
+        logger.info(f"Warm-up: {name} siap ({elapsed_ms:.1f} ms)")
+
+
+def _warm_history(data_handler):
+    """Isi HistoryFrameCache agar request pertama tidak membaca iph_data."""
+    if not Config.HISTORY_CACHE_ENABLED:
+        return
+
+    start = time.perf_counter()
+    df = data_handler.load_historical_data()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Warm-up: cache history terisi, {len(df)} baris ({elapsed_ms:.1f} ms)")
+
+
+def _warm_data(forecast_service):
+    """Isi cache forecast default (model terbaik) agar dashboard pertama langsung hit cache."""
+    start = time.perf_counter()
+    result = forecast_service.get_current_forecast(None, Config.DEFAULT_FORECAST_WEEKS)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if result.get('success'):
+        logger.info(f"Warm-up: cache forecast default terisi ({elapsed_ms:.1f} ms)")
+    else:
+        _record_error(f"cache forecast tidak terisi: {result.get('error')}")
+
+
+def run_warmup(app, forecast_service):
+    """Jalankan warm-up secara sinkron (dipakai oleh thread background)."""
+    start = time.perf_counter()
+    with _state_lock:
+        _state['started_at'] = datetime.utcnow().isoformat()
+
+    try:
+        with app.app_context():
+            _warm_models(forecast_service.model_manager.engine)
+            try:
+                _warm_history(forecast_service.data_handler)
+            except Exception as e:
+                _record_error(f"cache history tidak terisi: {e}")
+            try:
+                _warm_data(forecast_service)
+            except Exception as e:
+                _record_error(f"cache forecast tidak terisi: {e}")
+    except Exception as e:
+        _record_error(f"warm-up gagal: {e}")
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        with _state_lock:
+            _state['ready'] = True
+            _state['finished_at'] = datetime.utcnow().isoformat()
+            _state['duration_ms'] = round(duration_ms, 2)
+        logger.info(f"Warm-up selesai dalam {duration_ms:.1f} ms")
+
+
+def start_warmup(app, forecast_service):
+    """
+    Mulai warm-up di background thread, sekali per proses (aman dipanggil
+    ulang). Dipanggil dari post_worker_init gunicorn atau server dev app.py.
+    """
+    global _started_pid
+
+    if not Config.WARMUP_ENABLED:
+        with _state_lock:
+            _state['ready'] = True
+        return None
+
+    with _state_lock:
+        if _started_pid == os.getpid():
+            return None
+        _started_pid = os.getpid()
+        _state.update({'ready': False, 'models': {}, 'errors': []})
+
+    thread = threading.Thread(
+        target=run_warmup,
+        args=(app, forecast_service),
+        name='onnx-warmup',
+        daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,60 @@
+# tests/conftest.py
+"""
+Fixture bersama: aplikasi Flask dengan database SQLite sementara.
+
+DATABASE_URL harus diset sebelum config/app diimpor (Config membaca env saat
+kelas didefinisikan), jadi dilakukan di level modul conftest.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+_DB_DIR = tempfile.mkdtemp(prefix='iph-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_DB_DIR, 'test.db')
+os.environ['WARMUP_ENABLED'] = 'false'
+
+BULAN = ['Januari', 'Februari', 'Maret', 'April', 'Mei', 'Juni', 'Juli',
+         'Agustus', 'September', 'Oktober', 'November', 'Desember']
+
+
+def seed_history(n_weeks=60, start=date(2023, 1, 1)):
+    """Isi iph_data dengan deret mingguan sintetis (tanggal Minggu)."""
+    from database import db, IPHData
+    rows = []
+    for i in range(n_weeks):
+        day = start + timedelta(weeks=i)
+        rows.append({
+            'tanggal': day,
+            'indikator_harga': round(((i * 37) % 11 - 5) / 2.0, 2),
+            'bulan': BULAN[day.month - 1],
+            'minggu': f'M{(day.day - 1) // 7 + 1}',
+            'tahun': day.year,
+            'bulan_numerik': day.month,
+        })
+    db.session.bulk_insert_mappings(IPHData, rows)
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import app as flask_app
+    from database import db
+    from services.data_handler import DataHandler
+
+    flask_app.config['TESTING'] = True
+    with flask_app.app_context():
+        db.create_all()
+        seed_history()
+        DataHandler.notify_data_changed()
+        yield flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
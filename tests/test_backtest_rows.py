@@ -0,0 +1,80 @@
+# tests/test_backtest_rows.py
+"""Baris ModelPerformance hasil backtest tidak ikut pemilihan model terbaik & bobot ensemble."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import db, ModelPerformance, ModelBacktestHorizon
+
+
+@pytest.fixture
+def performance_rows(app):
+    trained_at = datetime(2024, 1, 1)
+    rows = [
+        ModelPerformance(model_name='KNN', batch_id='training_20240101', mae=1.0, trained_at=trained_at),
+        ModelPerformance(model_name='LightGBM', batch_id='training_20240101', mae=2.0, trained_at=trained_at),
+        # Backtest yang lebih baru dengan MAE lebih kecil untuk LightGBM
+        ModelPerformance(model_name='LightGBM', batch_id='backtest_20240102_000000', mae=0.1,
+                         trained_at=trained_at + timedelta(days=1)),
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    yield rows
+    ModelPerformance.query.delete()
+    db.session.commit()
+
+
+def test_best_model_ignores_backtest_rows(app, performance_rows):
+    from services.container import get_forecast_service
+
+    best = get_forecast_service().model_manager.get_current_best_model()
+
+    assert best['model_name'] == 'KNN'
+    assert best['mae'] == 1.0
+
+
+def test_ensemble_weights_ignore_backtest_rows(app, performance_rows):
+    from services.container import get_forecast_service
+
+    weights = get_forecast_service().model_manager.get_ensemble_weights(['KNN', 'LightGBM'])
+
+    assert weights['KNN'] == pytest.approx(2 / 3)
+    assert weights['LightGBM'] == pytest.approx(1 / 3)
+
+
+def test_backtest_keeps_summary_and_best_model_in_agreement(app):
+    from models.backtester import Backtester
+    from services.container import get_forecast_service
+
+    manager = get_forecast_service().model_manager
+    model_names = [m['name'] for m in manager.engine.get_available_models()]
+    trained_at = datetime(2024, 1, 1)
+    training_mae = {name: 1.0 + i for i, name in enumerate(model_names)}
+    db.session.add_all([
+        ModelPerformance(model_name=name, batch_id='training_20240101', mae=mae,
+                         is_best=(mae == min(training_mae.values())), trained_at=trained_at)
+        for name, mae in training_mae.items()
+    ])
+    db.session.commit()
+
+    try:
+        result = Backtester(manager.engine).run(horizon=3)
+        assert set(result['results']) == set(model_names)
+        assert ModelPerformance.query.filter(ModelPerformance.is_backtest() == 1).count() == len(model_names)
+        assert not ModelPerformance.query.filter(
+            ModelPerformance.is_backtest() == 1, ModelPerformance.is_best.is_(True)
+        ).count()
+
+        summary = manager.get_model_performance_summary()
+        best = manager.get_current_best_model()
+        summary_best = [name for name, s in summary.items() if s['latest_perf_obj']['is_best']]
+
+        assert summary_best == [best['model_name']] == [model_names[0]]
+        for name, mae in training_mae.items():
+            assert summary[name]['latest_mae'] == mae
+            assert summary[name]['best_mae'] == mae
+            assert summary[name]['training_count'] == 1
+    finally:
+        ModelBacktestHorizon.query.delete()
+        ModelPerformance.query.delete()
+        db.session.commit()
@@ -0,0 +1,20 @@
+# tests/test_economic_alerts.py
+"""get_real_economic_alerts: statistik volatilitas mengabaikan minggu kosong (NaN)."""
+import numpy as np
+import pytest
+
+
+def test_volatility_ignores_nan_rows(app, monkeypatch):
+    from services.container import get_forecast_service
+
+    service = get_forecast_service()
+    dates = np.array(['2024-01-07', '2024-01-14', '2024-01-21', '2024-01-28'], dtype='datetime64[D]')
+    values = np.array([-1.0, np.nan, 1.0, 0.5])
+    monkeypatch.setattr(service.data_handler, 'load_recent', lambda n, region=None: (dates, values))
+
+    result = service.get_real_economic_alerts()
+
+    assert result['success']
+    assert result['statistics']['std'] == pytest.approx(np.std([-1.0, 1.0, 0.5], ddof=1))
+    assert result['statistics']['mean'] == pytest.approx(np.mean([-1.0, 1.0, 0.5]))
+    assert result['insight_narrative']['volatility_status'] == 'Sedang'
@@ -0,0 +1,137 @@
+# tests/test_feature_spec.py
+"""
+Paritas FeatureSpec / IncrementalFeatures / StepRunner terhadap implementasi lama.
+
+Helper referensi di bawah adalah loop forecast rekursif yang dulu ada di
+ForecastingEngine (_update_features_deterministic, _update_features_batch,
+_run_single_step). Aturan rekursinya adalah aturan yang dipakai model .onnx yang
+sudah dikirim, jadi IncrementalFeatures harus identik bit dengannya.
+benchmarks/ mengimpor helper ini sebagai baseline.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.feature_spec import FEATURE_SPEC
+
+
+def update_features_deterministic(current_features, new_pred, all_predictions, step):
+    """Update fitur secara deterministik (6 FITUR) - (Harus sama dengan versi training)"""
+    new_features = np.zeros(6, dtype=np.float32)  # Lag_1..Lag_4, MA_3, MA_7
+
+    new_features[0] = float(new_pred)  # Lag_1
+    for i in range(1, 4):  # Lag_2, Lag_3, Lag_4
+        new_features[i] = float(current_features[i-1]) if i < len(current_features) else 0.0
+
+    if step == 0:
+        ma3_values = [
+            float(new_pred),
+            float(current_features[0]) if len(current_features) > 0 else 0.0,
+            float(current_features[1]) if len(current_features) > 1 else 0.0
+        ]
+        new_features[4] = float(np.mean(ma3_values))  # MA_3
+
+        ma7_values = [float(f) for f in current_features[:4]]
+        new_features[5] = float(np.mean(ma7_values)) if ma7_values else 0.0  # MA_7
+    else:
+        new_features[4] = float(np.mean(all_predictions[-min(3, len(all_predictions)):]))
+        new_features[5] = float(np.mean(all_predictions[-min(7, len(all_predictions)):]))
+
+    return new_features
+
+
+def update_features_batch(current_features, new_preds, pred_history, step):
+    """
+    Versi batch (N, 6) dari `update_features_deterministic`.
+    `pred_history` berisi prediksi setiap path sampai langkah ini, shape (N, step + 1).
+    """
+    new_features = np.empty_like(current_features, dtype=np.float32)
+
+    new_features[:, 0] = new_preds                     # Lag_1
+    new_features[:, 1:4] = current_features[:, 0:3]    # Lag_2..Lag_4
+
+    if step == 0:
+        ma3_values = np.column_stack([
+            new_preds,
+            current_features[:, 0].astype(np.float64),
+            current_features[:, 1].astype(np.float64)
+        ])
+        new_features[:, 4] = ma3_values.mean(axis=1)
+        new_features[:, 5] = current_features[:, :4].astype(np.float64).mean(axis=1)
+    else:
+        new_features[:, 4] = pred_history[:, -3:].mean(axis=1)
+        new_features[:, 5] = pred_history[:, -7:].mean(axis=1)
+
+    return new_features
+
+
+def run_single_step(model_session, input_name, output_name, current_features):
+    """Satu langkah inference ONNX (satu baris) yang mengembalikan prediksi skalar."""
+    pred_result = model_session.run([output_name], {input_name: current_features.reshape(1, -1)})
+
+    if isinstance(pred_result[0], (list, np.ndarray)):
+        pred = pred_result[0][0]
+        if isinstance(pred, (list, np.ndarray)):
+            pred = pred[0]
+    else:
+        pred = pred_result[0]
+
+    return float(pred)
+
+
+def _history_values(n=80, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+
+def test_compute_matches_pandas_definition():
+    values = np.random.default_rng(1).normal(0, 1, 500)
+    values[np.random.default_rng(2).choice(len(values), 25, replace=False)] = np.nan
+    series = pd.Series(values)
+    expected = np.column_stack(
+        [series.shift(lag) for lag in FEATURE_SPEC.lags]
+        + [series.rolling(window=window, min_periods=1).mean() for window in FEATURE_SPEC.windows]
+    )
+
+    np.testing.assert_allclose(FEATURE_SPEC.compute(values), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize('batch', [1, 8])
+def test_incremental_features_match_reference_helpers(batch):
+    rng = np.random.default_rng(batch)
+    origins = np.tile(FEATURE_SPEC.compute(_history_values())[-1].astype(np.float32), (batch, 1))
+    features = FEATURE_SPEC.updater(origins)
+    current = origins.copy()
+    history = np.empty((batch, 0))
+
+    for step in range(12):
+        preds = rng.normal(0, 1, batch)
+        history = np.column_stack([history, preds])
+        if batch == 1:
+            current = update_features_deterministic(current[0], preds[0], list(history[0]), step)[None, :]
+        else:
+            current = update_features_batch(current, preds, history, step)
+        features.advance(preds)
+        np.testing.assert_array_equal(features.X, current)
+
+
+def test_step_runner_forecast_matches_single_step_loop():
+    from config import Config
+    from models.forecasting_engine import ForecastingEngine
+
+    engine = ForecastingEngine(models_path=Config.MODELS_PATH)
+    last_features = FEATURE_SPEC.compute(_history_values())[-1].astype(np.float32)
+    n_steps = 12
+
+    models = engine.get_available_models()
+    assert models
+    for model in models:
+        session = engine._load_model_session(model['name'])
+        input_name, output_name = engine._get_io_names(session)
+
+        features, predictions = last_features.copy(), []
+        for step in range(n_steps):
+            predictions.append(run_single_step(session, input_name, output_name, features))
+            features = update_features_deterministic(features, predictions[-1], predictions, step)
+
+        result = engine.forecast_multistep_deterministic(session, last_features, n_steps)
+        np.testing.assert_array_equal(result['predictions'], np.array(predictions), err_msg=model['name'])
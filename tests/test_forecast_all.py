@@ -0,0 +1,40 @@
+# tests/test_forecast_all.py
+"""generate_forecast_all (lockstep) sama dengan generate_forecast per model."""
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def engine(app):
+    from services.container import get_forecast_service
+    return get_forecast_service().model_manager.engine
+
+
+@pytest.mark.parametrize('weeks', [4, 8, 12])
+def test_forecast_all_matches_single_model_forecast(engine, weeks):
+    model_names = [m['name'] for m in engine.get_available_models()]
+
+    forecasts = engine.generate_forecast_all(forecast_weeks=weeks)
+
+    assert sorted(forecasts) == sorted(model_names)
+    for model_name in model_names:
+        expected, _, _ = engine.generate_forecast(model_name, forecast_weeks=weeks)
+        columns = ['Tanggal', 'Prediksi', 'Batas_Bawah', 'Batas_Atas']
+        pd.testing.assert_frame_equal(
+            forecasts[model_name][columns].reset_index(drop=True),
+            expected[columns].reset_index(drop=True),
+            check_exact=True, obj=model_name
+        )
+
+
+def test_forecast_comparison_returns_one_series_per_model(client, engine):
+    model_names = [m['name'] for m in engine.get_available_models()]
+
+    payload = client.get('/api/forecast-comparison?weeks=6').get_json()
+
+    assert payload['success'], payload
+    assert sorted(payload['forecasts']) == sorted(model_names)
+    assert all(len(series) == 6 for series in payload['forecasts'].values())
+
+    subset = client.get('/api/forecast-comparison?weeks=4&models=' + ','.join(model_names[:2])).get_json()
+    assert sorted(subset['forecasts']) == sorted(model_names[:2])
@@ -0,0 +1,51 @@
+# tests/test_historical_fetch.py
+"""load_historical_data kolumnar: isi sama dengan materialisasi ORM lama."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import Config
+from database import IPHData
+from services.data_handler import DataHandler
+
+
+def _orm_load():
+    """Referensi lewat objek ORM (atribut langsung; to_dict mengubah 0.0 menjadi None)."""
+    records = IPHData.query.order_by(IPHData.tanggal).all()
+    return pd.DataFrame({
+        'Tanggal': pd.to_datetime([record.tanggal for record in records]),
+        'Indikator_Harga': [record.indikator_harga for record in records],
+        'kab_kota': [record.kab_kota for record in records],
+    })
+
+
+@pytest.fixture
+def handler(app, monkeypatch):
+    monkeypatch.setattr(Config, 'HISTORY_CACHE_ENABLED', False)
+    return DataHandler()
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 10000])
+def test_columnar_load_matches_orm(handler, monkeypatch, chunk_rows):
+    monkeypatch.setattr(Config, 'DB_FETCH_CHUNK_ROWS', chunk_rows)
+    expected = _orm_load()
+
+    df = handler.load_historical_data(with_region=True)
+
+    assert list(df.columns) == ['Tanggal', 'Indikator_Harga', 'kab_kota']
+    assert df['Tanggal'].dtype == 'datetime64[ns]'
+    assert df['Indikator_Harga'].dtype == np.float64
+    np.testing.assert_array_equal(df['Tanggal'].to_numpy(), expected['Tanggal'].to_numpy('datetime64[ns]'))
+    np.testing.assert_array_equal(df['Indikator_Harga'].to_numpy(), expected['Indikator_Harga'].to_numpy())
+    assert df['kab_kota'].tolist() == expected['kab_kota'].tolist()
+    # Nilai 0.0 tetap 0.0 (bukan NaN seperti jalur to_dict lama)
+    assert (df['Indikator_Harga'] == 0.0).any()
+
+
+def test_load_recent_matches_history_tail(handler):
+    history = handler.load_historical_data()
+
+    dates, values = handler.load_recent(5)
+
+    np.testing.assert_array_equal(dates, history['Tanggal'].to_numpy('datetime64[D]')[-5:])
+    np.testing.assert_array_equal(values, history['Indikator_Harga'].to_numpy()[-5:])
@@ -0,0 +1,81 @@
+# tests/test_history_cache.py
+"""HistoryFrameCache: satu salinan read-only per proses, divalidasi versi data."""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from config import Config
+from database import db, IPHData
+from services.data_handler import DataHandler
+
+EXTERNAL_DATE = date(2030, 1, 6)
+
+
+@pytest.fixture
+def loads(app, monkeypatch):
+    """Hitung load dari database di balik cache."""
+    monkeypatch.setattr(Config, 'HISTORY_CACHE_ENABLED', True)
+    counts = []
+    original = DataHandler._load_history_arrays
+
+    def counting_load(self, with_region):
+        counts.append(with_region)
+        return original(self, with_region)
+
+    monkeypatch.setattr(DataHandler, '_load_history_arrays', counting_load)
+    DataHandler.notify_data_changed()
+    yield counts
+    IPHData.query.filter_by(tanggal=EXTERNAL_DATE).delete()
+    db.session.commit()
+    DataHandler.notify_data_changed()
+
+
+def test_callers_share_one_read_only_copy(loads):
+    first = DataHandler().load_historical_data()
+    second = DataHandler().load_historical_data()
+
+    assert loads == [False]
+    assert first is not second
+    assert np.shares_memory(first['Indikator_Harga'].to_numpy(), second['Indikator_Harga'].to_numpy())
+    with pytest.raises(ValueError):
+        first['Indikator_Harga'].to_numpy()[0] = 1.0
+    # Menambah kolom tidak memengaruhi pemanggil lain
+    first['Extra'] = 1.0
+    assert 'Extra' not in second.columns
+
+
+def test_region_frames_are_cached_separately(loads):
+    DataHandler().load_historical_data()
+    regional = DataHandler().load_historical_data(with_region=True)
+    DataHandler().load_historical_data(with_region=True)
+
+    assert loads == [False, True]
+    assert 'kab_kota' in regional.columns
+
+
+def test_notify_data_changed_invalidates(loads):
+    DataHandler().load_historical_data()
+    DataHandler.notify_data_changed()
+    DataHandler().load_historical_data()
+
+    assert loads == [False, False]
+
+
+def test_probe_detects_writes_from_other_processes(loads, monkeypatch):
+    monkeypatch.setattr(Config, 'HISTORY_CACHE_PROBE_INTERVAL', 3600)
+    n_rows = len(DataHandler().load_historical_data())
+
+    # Penulisan tanpa notify_data_changed (seperti worker lain)
+    db.session.add(IPHData(tanggal=EXTERNAL_DATE, indikator_harga=1.25, bulan='Januari', minggu='M1'))
+    db.session.commit()
+
+    # Dalam interval probe: salinan lama boleh dipakai
+    assert len(DataHandler().load_historical_data()) == n_rows
+    assert len(loads) == 1
+
+    monkeypatch.setattr(Config, 'HISTORY_CACHE_PROBE_INTERVAL', 0)
+    refreshed = DataHandler().load_historical_data()
+    assert len(refreshed) == n_rows + 1
+    assert refreshed['Indikator_Harga'].iloc[-1] == 1.25
+    assert len(loads) == 2
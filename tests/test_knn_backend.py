@@ -0,0 +1,76 @@
+# tests/test_knn_backend.py
+"""Backend NumPy KNN: output sama dengan onnxruntime, pencarian blok & KD-tree konsisten."""
+import os
+
+import numpy as np
+import onnxruntime as rt
+import pytest
+
+from config import Config
+from conftest import ROOT
+from models.knn import KNNIndex, KNNSession, load_knn_session
+
+TOLERANCE = 1e-5
+KNN_MODEL = os.path.join(ROOT, 'data', 'models', 'KNN.onnx')
+
+
+@pytest.fixture(scope='module')
+def sessions():
+    ort_session = rt.InferenceSession(KNN_MODEL, providers=['CPUExecutionProvider'])
+    return ort_session, load_knn_session(KNN_MODEL), ort_session.get_inputs()[0].name
+
+
+def test_numpy_knn_matches_onnxruntime(sessions):
+    ort_session, np_session, input_name = sessions
+    rng = np.random.default_rng(0)
+    # Input acak dan titik latih sendiri (jarak 0, bobot floor)
+    X = np.concatenate([
+        rng.normal(0, 1.5, (2000, np_session.index.n_features)).astype(np.float32),
+        np_session.index.train.astype(np.float32),
+    ])
+
+    expected = ort_session.run(None, {input_name: X})[0]
+    actual = np_session.run(None, {input_name: X})[0]
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=TOLERANCE)
+    np.testing.assert_allclose(
+        np_session.run(None, {input_name: X[:1]})[0], expected[:1], rtol=0, atol=TOLERANCE
+    )
+
+
+def test_block_size_does_not_change_neighbors(sessions):
+    _, np_session, _ = sessions
+    X = np.random.default_rng(1).normal(0, 1.5, (257, np_session.index.n_features))
+    expected = np_session.index.neighbors(X)
+
+    index = KNNIndex(np_session.index.train, np_session.index.targets, np_session.index.k)
+    index._block_rows = 16
+    distances, indices = index.neighbors(X)
+
+    np.testing.assert_array_equal(indices, expected[1])
+    np.testing.assert_allclose(distances, expected[0], rtol=1e-12)
+
+
+def test_kdtree_matches_brute_force(monkeypatch):
+    pytest.importorskip('scipy')
+    rng = np.random.default_rng(2)
+    train, targets = rng.normal(0, 1, (5000, 6)), rng.normal(0, 1, 5000).astype(np.float32)
+    X = rng.normal(0, 1, (300, 6))
+
+    monkeypatch.setattr(Config, 'KNN_KDTREE_MIN_POINTS', len(train) + 1)
+    brute = KNNIndex(train, targets, 7, np.float32(1), np.float32(1e-6))
+    monkeypatch.setattr(Config, 'KNN_KDTREE_MIN_POINTS', 0)
+    kdtree = KNNIndex(train, targets, 7, np.float32(1), np.float32(1e-6))
+
+    assert (brute.method, kdtree.method) == ('brute', 'kdtree')
+    np.testing.assert_array_equal(np.sort(brute.neighbors(X)[1], axis=1), np.sort(kdtree.neighbors(X)[1], axis=1))
+    np.testing.assert_allclose(brute.predict(X), kdtree.predict(X), rtol=1e-5)
+
+
+def test_backend_override_selects_numpy_session(monkeypatch):
+    from models.session_factory import create_model_session
+
+    monkeypatch.setattr(Config, 'INFERENCE_BACKEND_OVERRIDES', 'KNN=numpy')
+
+    assert isinstance(create_model_session(KNN_MODEL, 'KNN'), KNNSession)
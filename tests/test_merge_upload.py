@@ -0,0 +1,62 @@
+# tests/test_merge_upload.py
+"""merge_and_save_data: baris upload dengan tanggal (anchor) sama, baris terakhir menang."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import seed_history
+from database import db, IPHData, CommodityData
+from services.data_handler import DataHandler
+
+
+@pytest.fixture
+def handler(app):
+    yield DataHandler()
+    CommodityData.query.delete()
+    IPHData.query.delete()
+    db.session.commit()
+    seed_history()
+    DataHandler.notify_data_changed()
+
+
+def _upload(rows):
+    return pd.DataFrame(rows, columns=['Tanggal', 'Indikator_Harga', 'Bulan', 'Minggu'])
+
+
+def test_duplicate_new_date_last_row_wins(handler):
+    # 14, 15, 16 Maret jatuh ke anchor 15 Maret (validate_new_data mengurutkan
+    # menurut tanggal mentah); Bulan hanya ada di baris kedua
+    upload = _upload([
+        ('2030-03-14', 1.0, None, None),
+        ('2030-03-15', 2.0, 'Maret', 'M3'),
+        ('2030-03-16', 3.0, None, None),
+    ])
+
+    _, info = handler.merge_and_save_data(upload)
+
+    row = IPHData.query.filter_by(tanggal=date(2030, 3, 15)).one()
+    assert row.indikator_harga == 3.0
+    assert row.bulan == 'Maret'
+    assert row.minggu == 'M3'
+    assert (info['new_records'], info['updated_records']) == (1, 2)
+
+
+def test_duplicate_existing_date_last_row_wins(handler):
+    before = IPHData.query.count()
+    # 7 dan 9 Januari jatuh ke anchor 8 Januari yang sudah ada
+    upload = _upload([
+        ('2023-01-07', 5.0, None, 'M2'),
+        ('2023-01-09', -5.0, None, None),
+    ])
+
+    _, info = handler.merge_and_save_data(upload)
+
+    row = IPHData.query.filter_by(tanggal=date(2023, 1, 8)).one()
+    assert row.indikator_harga == -5.0
+    assert row.minggu == 'M2'
+    assert row.bulan == 'Januari'
+    assert (info['new_records'], info['updated_records']) == (0, 2)
+    assert IPHData.query.count() == before
+    assert np.isclose(row.lag_1, IPHData.query.filter_by(tanggal=date(2023, 1, 1)).one().indikator_harga)
@@ -0,0 +1,32 @@
+# tests/test_micro_batcher.py
+"""Micro-batching hanya untuk model di INFERENCE_MICROBATCH_MODELS."""
+import numpy as np
+
+from config import Config
+from models.feature_spec import FEATURE_SPEC
+from models.micro_batcher import get_micro_batcher, micro_batch_enabled
+
+
+def test_allowlist_matches_model_names(monkeypatch):
+    monkeypatch.setattr(Config, 'INFERENCE_MICROBATCH_MODELS', 'KNN, Random_Forest')
+
+    assert micro_batch_enabled('KNN')
+    assert micro_batch_enabled('Random Forest')
+    assert not micro_batch_enabled('LightGBM')
+
+
+def test_predict_batches_only_allowlisted_models(app, monkeypatch):
+    from services.container import get_forecast_service
+
+    monkeypatch.setattr(Config, 'INFERENCE_MICROBATCH_MODELS', 'KNN')
+    manager = get_forecast_service().model_manager
+    batcher = get_micro_batcher()
+    X = np.zeros((1, FEATURE_SPEC.n_features), dtype=np.float32)
+
+    calls = batcher.stats['calls']
+    direct = manager.predict(X, 'LightGBM')
+    assert batcher.stats['calls'] == calls
+
+    batched = manager.predict(X, 'KNN')
+    assert batcher.stats['calls'] == calls + 1
+    assert np.asarray(batched).shape == np.asarray(direct).shape
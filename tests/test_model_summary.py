@@ -0,0 +1,24 @@
+# tests/test_model_summary.py
+"""get_model_performance_summary: fallback is_best jika tidak ada baris bertanda is_best."""
+from datetime import datetime
+
+from database import db, ModelPerformance
+
+
+def test_zero_mae_model_is_marked_best(app):
+    from services.container import get_forecast_service
+
+    trained_at = datetime(2024, 1, 1)
+    db.session.add_all([
+        ModelPerformance(model_name='KNN', batch_id='training_20240101', mae=0.0, trained_at=trained_at),
+        ModelPerformance(model_name='LightGBM', batch_id='training_20240101', mae=1.0, trained_at=trained_at),
+    ])
+    db.session.commit()
+
+    try:
+        summary = get_forecast_service().model_manager.get_model_performance_summary()
+        best = [name for name, s in summary.items() if s['latest_perf_obj']['is_best']]
+        assert best == ['KNN']
+    finally:
+        ModelPerformance.query.delete()
+        db.session.commit()
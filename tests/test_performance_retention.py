@@ -0,0 +1,68 @@
+# tests/test_performance_retention.py
+"""compact_performance_history: backtest diperingkat terpisah dari baris training."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from database import db, ModelPerformance, ModelBacktestHorizon, ModelPerformanceRollup
+
+KEEP = 3
+
+
+@pytest.fixture
+def training_rows(app, monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_PERFORMANCE_HISTORY_PER_MODEL', KEEP)
+    trained_at = datetime(2024, 1, 1)
+    rows = [
+        ModelPerformance(model_name='KNN', batch_id=f'training_{i}', mae=1.0 + i,
+                         trained_at=trained_at + timedelta(days=i))
+        for i in range(KEEP)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    yield [row.id for row in rows]
+    ModelBacktestHorizon.query.delete()
+    ModelPerformanceRollup.query.delete()
+    ModelPerformance.query.delete()
+    db.session.commit()
+
+
+def test_backtests_do_not_push_out_training_rows(training_rows):
+    from models.backtester import Backtester
+    from services.container import get_forecast_service
+
+    backtester = Backtester(get_forecast_service().model_manager.engine)
+    batch_ids = [backtester.run(models=['KNN'], horizon=2)['batch_id'] for _ in range(KEEP + 2)]
+
+    training = ModelPerformance.query.filter(ModelPerformance.excluding_backtest()).all()
+    assert sorted(row.id for row in training) == sorted(training_rows)
+
+    # Hanya N backtest terbaru yang tersisa, beserta metrik per horizon-nya
+    backtests = ModelPerformance.query.filter(ModelPerformance.is_backtest() == 1).all()
+    assert sorted(row.batch_id for row in backtests) == sorted(batch_ids[-KEEP:])
+    horizon_batches = {row.batch_id for row in ModelBacktestHorizon.query.all()}
+    assert horizon_batches == set(batch_ids[-KEEP:])
+
+    # Backtest yang dihapus tidak dilipat ke rollup
+    assert ModelPerformanceRollup.query.count() == 0
+
+
+def test_old_training_rows_fold_into_rollups(training_rows):
+    from models.performance_retention import compact_performance_history
+
+    older = datetime(2023, 12, 1)
+    db.session.add_all([
+        ModelPerformance(model_name='KNN', batch_id='training_old', mae=mae, trained_at=older)
+        for mae in (4.0, 6.0)
+    ])
+    db.session.commit()
+
+    result = compact_performance_history()
+
+    assert result['folded_rows'] == 2
+    assert result['backtest_rows_deleted'] == 0
+    assert sorted(row.id for row in ModelPerformance.query.all()) == sorted(training_rows)
+    rollup = ModelPerformanceRollup.query.filter_by(model_name='KNN', period='day').one()
+    assert rollup.n_runs == 2
+    assert rollup.mae_sum == pytest.approx(10.0)
@@ -0,0 +1,91 @@
+# tests/test_performance_series.py
+"""load_performance_series: bucket di SQL vs pandas, penggabungan rollup, batas titik."""
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+
+from database import db, ModelPerformance, ModelPerformanceRollup
+from models import performance_series
+from models.performance_series import load_performance_series
+
+
+@pytest.fixture
+def history(app):
+    rows = [
+        ('training_1', datetime(2024, 1, 1, 10), 1.0, 0.5),   # Senin
+        ('training_2', datetime(2024, 1, 1, 15), 3.0, None),
+        ('training_3', datetime(2024, 1, 3, 9), 2.0, 0.7),
+        ('training_4', datetime(2024, 1, 9, 9), 4.0, 0.9),
+        ('backtest_20240110_000000_000000', datetime(2024, 1, 10), 0.1, 0.99),
+    ]
+    db.session.add_all([
+        ModelPerformance(model_name='KNN', batch_id=batch_id, trained_at=trained_at, mae=mae, r2_score=r2)
+        for batch_id, trained_at, mae, r2 in rows
+    ])
+    db.session.add(ModelPerformanceRollup(
+        model_name='KNN', period='day', period_start=date(2024, 1, 3), n_runs=2,
+        mae_sum=6.0, rmse_count=0, r2_sum=1.0, r2_count=2
+    ))
+    db.session.commit()
+    yield
+    ModelPerformanceRollup.query.delete()
+    ModelPerformance.query.delete()
+    db.session.commit()
+
+
+def _days(series):
+    return [str(ts)[:10] for ts in series['timestamps']]
+
+
+def test_raw_series_excludes_backtests_and_limits_points(history):
+    series = load_performance_series(include_rollups=False)['KNN']
+    assert series['mae'].tolist() == [1.0, 3.0, 2.0, 4.0]
+    assert np.isnan(series['r2'][1])
+
+    latest = load_performance_series(max_points=2, include_rollups=False)['KNN']
+    assert latest['mae'].tolist() == [2.0, 4.0]
+
+
+def test_day_buckets_merge_rollups(history):
+    series = load_performance_series(bucket='day')['KNN']
+
+    assert _days(series) == ['2024-01-01', '2024-01-03', '2024-01-09']
+    assert series['n_runs'].tolist() == [2, 3, 1]
+    np.testing.assert_allclose(series['mae'], [2.0, 8.0 / 3.0, 4.0])
+    np.testing.assert_allclose(series['r2'], [0.5, 1.7 / 3.0, 0.9])
+
+
+def test_week_buckets_start_on_monday(history):
+    series = load_performance_series(bucket='week')['KNN']
+
+    assert _days(series) == ['2024-01-01', '2024-01-08']
+    assert series['n_runs'].tolist() == [5, 1]
+    np.testing.assert_allclose(series['mae'], [12.0 / 5.0, 4.0])
+
+
+@pytest.mark.parametrize('bucket', ['day', 'week', 'month'])
+def test_sql_buckets_match_pandas_fallback(history, monkeypatch, bucket):
+    expected = load_performance_series(bucket=bucket)
+    monkeypatch.setattr(performance_series, '_bucket_expression', lambda *args: None)
+    actual = load_performance_series(bucket=bucket)
+
+    assert actual.keys() == expected.keys()
+    for model_name, series in expected.items():
+        np.testing.assert_array_equal(actual[model_name]['timestamps'], series['timestamps'])
+        np.testing.assert_array_equal(actual[model_name]['n_runs'], series['n_runs'])
+        for field in performance_series.SERIES_FIELDS:
+            np.testing.assert_allclose(actual[model_name][field], series[field])
+
+
+def test_bucket_downsampling_keeps_totals(history):
+    series = load_performance_series(bucket='day', max_points=2)['KNN']
+
+    assert len(series['timestamps']) == 2
+    assert series['n_runs'].sum() == 6
+    np.testing.assert_allclose(series['mae'], [(4.0 + 8.0) / 5.0, 4.0])
+
+
+def test_unknown_bucket_is_rejected(app):
+    with pytest.raises(ValueError):
+        load_performance_series(bucket='year')
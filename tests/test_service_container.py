@@ -0,0 +1,61 @@
+# tests/test_service_container.py
+"""Service dibuat sekali per proses dan dibagi oleh app.py, blueprint, dan container."""
+from collections import Counter
+
+import pytest
+
+from models.model_manager import ModelManager
+from services.commodity_insight_service import CommodityInsightService
+from services.forecast_service import ForecastService
+
+# Endpoint yang dulu membuat ForecastService/CommodityInsightService per request
+ENDPOINTS = [
+    '/api/economic-alerts',
+    '/api/forecast-chart-data',
+]
+
+
+@pytest.fixture
+def constructions(app, monkeypatch):
+    """Hitung konstruksi service setelah app selesai diimpor."""
+    counts = Counter()
+    for cls in (ForecastService, ModelManager, CommodityInsightService):
+        original = cls.__init__
+
+        def counting_init(self, *args, _cls=cls, _original=original, **kwargs):
+            counts[_cls.__name__] += 1
+            _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(cls, '__init__', counting_init)
+    return counts
+
+
+def test_requests_reuse_process_services(client, constructions):
+    for _ in range(3):
+        for url in ENDPOINTS:
+            client.get(url)
+
+    assert constructions == Counter()
+
+
+def test_app_and_blueprints_share_container_instances(app):
+    import app as app_module
+    import admin.routes
+    from services import container
+
+    forecast_service = container.get_forecast_service()
+    assert app_module.forecast_service is forecast_service
+    assert admin.routes.get_forecast_service() is forecast_service
+    assert container.get_data_handler() is forecast_service.data_handler
+    assert container.get_visualization_service().data_handler is forecast_service.data_handler
+    assert app_module.commodity_service is container.get_commodity_service()
+
+
+def test_forecast_chart_data_falls_back_to_history(client):
+    response = client.get('/api/forecast-chart-data')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success'] is True
+    assert body['forecast'] == []
+    assert len(body['historical']) == 60
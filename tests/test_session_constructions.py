@@ -0,0 +1,82 @@
+# tests/test_session_constructions.py
+"""Sesi ONNX dimuat sekali per model per proses, tidak dibuat ulang per request."""
+from collections import Counter
+
+import onnxruntime as rt
+import pytest
+
+from database import db, AdminUser, ForecastHistory
+
+N_REQUESTS = 100
+
+GET_ENDPOINTS = [
+    '/api/economic-alerts',
+    '/api/forecast-chart-data',
+    '/api/forecast-comparison',
+    '/api/dashboard/model-performance',
+]
+POST_ENDPOINTS = [
+    '/api/generate-forecast',
+    '/admin/api/generate-forecast',
+]
+
+
+@pytest.fixture
+def constructions(app, monkeypatch):
+    """Hitung konstruksi InferenceSession mulai dari registry kosong."""
+    from services.container import get_forecast_service
+    from services.forecast_service import ForecastService
+
+    counts = Counter()
+
+    class CountingInferenceSession(rt.InferenceSession):
+        def __init__(self, path_or_bytes, *args, **kwargs):
+            counts[str(path_or_bytes)] += 1
+            super().__init__(path_or_bytes, *args, **kwargs)
+
+    monkeypatch.setattr(rt, 'InferenceSession', CountingInferenceSession)
+    get_forecast_service().model_manager.engine.registry.clear()
+    ForecastService.clear_forecast_cache()
+    yield counts
+    ForecastService.clear_forecast_cache()
+    ForecastHistory.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def admin_client(client):
+    from auth.utils import hash_password
+
+    admin = AdminUser(username='test-admin', password_hash=hash_password('secret'), is_active=True)
+    db.session.add(admin)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+    yield client
+    db.session.delete(admin)
+    db.session.commit()
+
+
+def test_requests_do_not_rebuild_inference_sessions(admin_client, constructions):
+    from services.container import get_forecast_service
+
+    model_names = [m['name'] for m in get_forecast_service().model_manager.engine.get_available_models()]
+    assert model_names
+
+    statuses = Counter()
+    endpoints = GET_ENDPOINTS + POST_ENDPOINTS
+    for i in range(N_REQUESTS):
+        url = endpoints[i % len(endpoints)]
+        if url in POST_ENDPOINTS:
+            response = admin_client.post(url, json={
+                'model_name': model_names[i % len(model_names)], 'weeks': 4 + i % 9
+            })
+            assert response.get_json()['success'], response.get_json()
+        else:
+            response = admin_client.get(url)
+        statuses[(url, response.status_code)] += 1
+
+    assert all(status == 200 for _, status in statuses), statuses
+    assert sum(constructions.values()) <= len(model_names), dict(constructions)
+    assert all(n == 1 for n in constructions.values()), dict(constructions)
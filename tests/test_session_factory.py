@@ -0,0 +1,60 @@
+# tests/test_session_factory.py
+"""session_factory: memo hash di disk dan error optimasi graph tidak disembunyikan."""
+import hashlib
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from models import session_factory
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_factory, '_FALLBACK_CACHE_DIR', str(tmp_path / 'fallback'))
+    monkeypatch.setattr(session_factory, '_digest_cache', {})
+
+
+def test_file_digest_is_persisted_across_cold_starts(tmp_path, monkeypatch):
+    path = tmp_path / 'model.onnx'
+    path.write_bytes(b'abc' * 1000)
+    expected = hashlib.sha256(path.read_bytes()).hexdigest()
+
+    assert session_factory.file_digest(str(path)) == expected
+    assert os.path.exists(f"{path}.sha256")
+
+    # Cold start: memo in-memory kosong, file tidak di-hash ulang
+    monkeypatch.setattr(session_factory, '_digest_cache', {})
+    monkeypatch.setattr(session_factory.hashlib, 'sha256', None)
+    assert session_factory.file_digest(str(path)) == expected
+
+    # Isi berubah (size berbeda) -> hash dihitung ulang
+    monkeypatch.undo()
+    monkeypatch.setattr(session_factory, '_digest_cache', {})
+    path.write_bytes(b'xyz' * 999)
+    assert session_factory.file_digest(str(path)) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_optimizer_errors_are_raised(tmp_path, caplog):
+    path = tmp_path / 'broken.onnx'
+    path.write_bytes(b'not an onnx model')
+
+    with pytest.raises(Exception):
+        session_factory.create_inference_session(str(path))
+
+    assert 'Graph optimization failed' in caplog.text
+    assert not [f for f in os.listdir(tmp_path) if f.endswith(('.opt', '.tmp'))]
+    assert not os.path.exists(tmp_path / 'fallback')
+
+
+def test_optimized_model_is_cached_next_to_source(tmp_path):
+    path = tmp_path / 'KNN.onnx'
+    shutil.copy(os.path.join(ROOT, 'data', 'models', 'KNN.onnx'), path)
+
+    session = session_factory.create_inference_session(str(path))
+
+    assert session.get_inputs()
+    assert os.path.exists(session_factory.optimized_cache_path(str(path)))
+    # Load berikutnya memakai file .opt
+    assert session_factory.create_inference_session(str(path)).get_inputs()
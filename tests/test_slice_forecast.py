@@ -0,0 +1,42 @@
+# tests/test_slice_forecast.py
+"""slice_forecast: potongan jalur FORECAST_MAX_WEEKS sama dengan forecast horizon pendek."""
+import numpy as np
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def engine(app):
+    from services.container import get_forecast_service
+    return get_forecast_service().model_manager.engine
+
+
+@pytest.mark.parametrize('weeks', range(4, Config.FORECAST_MAX_WEEKS + 1))
+def test_slice_matches_full_regeneration(engine, weeks):
+    model_name = engine.get_available_models()[0]['name']
+    forecast_path = engine.generate_forecast_path(model_name)
+
+    sliced, _, summary = engine.slice_forecast(forecast_path, weeks)
+
+    # Regenerasi penuh pada horizon `weeks` (tanpa jalur bersama)
+    session = engine._load_model_session(model_name)
+    last_features, last_date = engine._load_forecast_origin()
+    result = engine.forecast_multistep_deterministic(session, last_features, weeks)
+    expected, expected_summary = engine._build_forecast_output(model_name, result, last_date, weeks)
+
+    np.testing.assert_array_equal(sliced['Prediksi'].to_numpy(), expected['Prediksi'].to_numpy())
+    np.testing.assert_array_equal(sliced['Batas_Bawah'].to_numpy(), expected['Batas_Bawah'].to_numpy())
+    np.testing.assert_array_equal(sliced['Batas_Atas'].to_numpy(), expected['Batas_Atas'].to_numpy())
+    assert list(sliced['Tanggal']) == list(expected['Tanggal'])
+    for key in ('avg_prediction', 'trend', 'volatility', 'confidence_avg', 'min_prediction', 'max_prediction'):
+        assert summary[key] == pytest.approx(expected_summary[key]), key
+
+
+def test_slice_rejects_horizon_outside_path(engine):
+    forecast_path = engine.generate_forecast_path(engine.get_available_models()[0]['name'])
+
+    with pytest.raises(ValueError):
+        engine.slice_forecast(forecast_path, Config.FORECAST_MAX_WEEKS + 1)
+    with pytest.raises(ValueError):
+        engine.slice_forecast(forecast_path, 3)
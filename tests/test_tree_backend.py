@@ -0,0 +1,64 @@
+# tests/test_tree_backend.py
+"""Backend NumPy TreeEnsembleRegressor: output sama dengan onnxruntime."""
+import glob
+import os
+
+import numpy as np
+import onnxruntime as rt
+import pytest
+
+from conftest import ROOT
+from models.onnx_proto import load_onnx_graph
+from models.tree_ensemble import TreeEnsembleSession, is_tree_ensemble_graph, load_tree_ensemble_session
+
+TOLERANCE = 1e-5
+
+TREE_MODELS = sorted(
+    path for path in glob.glob(os.path.join(ROOT, 'data', 'models', '*.onnx'))
+    if is_tree_ensemble_graph(load_onnx_graph(path))
+)
+
+
+def _parity_inputs(ensemble, rng):
+    n_features = ensemble.n_features
+    random = rng.normal(0, 1.5, (2000, n_features)).astype(np.float32)
+    random[::37, rng.integers(0, n_features)] = np.nan
+
+    # Nilai tepat di threshold menguji batas <= vs <
+    split = ensemble.modes != 0
+    on_threshold = rng.normal(0, 1.5, (int(split.sum()), n_features)).astype(np.float32)
+    on_threshold[np.arange(len(on_threshold)), ensemble.feature[split]] = ensemble.threshold[split]
+    return np.concatenate([random, on_threshold])
+
+
+def test_tree_models_are_present():
+    assert TREE_MODELS
+
+
+@pytest.mark.parametrize('path', TREE_MODELS, ids=os.path.basename)
+def test_numpy_tree_backend_matches_onnxruntime(path):
+    ort_session = rt.InferenceSession(path, providers=['CPUExecutionProvider'])
+    np_session = load_tree_ensemble_session(path)
+    input_name = ort_session.get_inputs()[0].name
+    X = _parity_inputs(np_session.ensemble, np.random.default_rng(0))
+
+    expected = ort_session.run(None, {input_name: X})[0]
+    actual = np_session.run(None, {input_name: X})[0]
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=0, atol=TOLERANCE)
+    # Batch satu baris (jalur forecast rekursif)
+    np.testing.assert_allclose(
+        np_session.run(None, {input_name: X[:1]})[0], expected[:1], rtol=0, atol=TOLERANCE
+    )
+
+
+def test_backend_override_selects_numpy_session(monkeypatch):
+    from config import Config
+    from models.session_factory import create_model_session
+
+    path = TREE_MODELS[0]
+    model_name = os.path.splitext(os.path.basename(path))[0]
+    monkeypatch.setattr(Config, 'INFERENCE_BACKEND_OVERRIDES', f'{model_name}=numpy')
+
+    assert isinstance(create_model_session(path, model_name), TreeEnsembleSession)
@@ -0,0 +1,51 @@
+# tests/test_warmup.py
+"""Warm-up dimulai oleh gunicorn (post_worker_init), bukan saat app.py diimpor."""
+import os
+import runpy
+import subprocess
+import sys
+import threading
+
+from sqlalchemy import event
+
+from conftest import ROOT
+
+
+def test_importing_app_does_not_start_warmup(tmp_path):
+    env = dict(os.environ, WARMUP_ENABLED='true', DATABASE_URL='sqlite:///' + str(tmp_path / 'warmup.db'))
+    code = "import threading, app; print([t.name for t in threading.enumerate()])"
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=300)
+
+    assert result.returncode == 0, result.stderr
+    assert 'onnx-warmup' not in result.stdout
+
+
+def test_post_worker_init_primes_history_cache(app, monkeypatch):
+    from database import db
+    from services import warmup
+    from services.container import get_data_handler
+
+    monkeypatch.setattr(warmup.Config, 'WARMUP_ENABLED', True)
+    monkeypatch.setattr(warmup, '_started_pid', None)
+
+    hooks = runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
+    hooks['post_worker_init'](None)
+    thread = next(t for t in threading.enumerate() if t.name == 'onnx-warmup')
+    thread.join(timeout=120)
+
+    assert warmup.get_warmup_status()['ready']
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        df = get_data_handler().load_historical_data()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert len(df) == 60
+    assert not [s for s in statements if 'indikator_harga' in s]